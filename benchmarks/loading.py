@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+# Compare loading settings and tutorial files with the round-trip ruamel
+# parser (what read_yaml always used) to the read-only loader.
+#
+# python benchmarks/loading.py --iters 200
+
+import argparse
+import os
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import playground.defaults as defaults  # noqa
+import playground.utils as utils  # noqa
+import playground.utils.fileio as fileio  # noqa
+
+tutorial_file = os.path.join(
+    os.path.dirname(here), "playground", "tests", "testdata", "tutorial.yaml"
+)
+
+
+def timeit(func, iters):
+    start = time.perf_counter()
+    for _ in range(iters):
+        func()
+    return (time.perf_counter() - start) / iters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="yaml loading benchmark")
+    parser.add_argument("--iters", type=int, default=200)
+    args = parser.parse_args()
+
+    backend = "libyaml" if fileio.pyyaml is not None else "ruamel safe"
+    print(f"Read-only backend: {backend}, {args.iters} iterations")
+    for name, filename in [
+        ("settings", defaults.default_settings_file),
+        ("tutorial", tutorial_file),
+    ]:
+        roundtrip = timeit(
+            lambda: utils.read_yaml(filename, roundtrip=True), args.iters
+        )
+        fast = timeit(lambda: utils.read_yaml(filename), args.iters)
+        print(
+            f"{name.ljust(10)} round-trip {roundtrip * 1000:.3f} ms  "
+            f"read-only {fast * 1000:.3f} ms  ({roundtrip / fast:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
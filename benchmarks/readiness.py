@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+# Measure how long it takes to notice a tutorial is ready, from the time its
+# server starts answering to the time we see it. A local server starts after
+# a delay, either refusing connections until then (a container starting) or
+# behind a proxy that answers 503 (e.g., a load balancer). We compare the
+# poller (playground.main.readiness) with the loop it replaced, which slept
+# 2, 4, 6... seconds and took any response but a 404 as ready. A negative
+# lag means a 503 was taken as ready before the server was.
+#
+# python benchmarks/readiness.py --delays 1 5 15 --iters 3 --output readiness.json
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import playground.main.session as session  # noqa
+from playground.main.readiness import Poller  # noqa
+
+
+class SlowStartHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = 503 if time.time() < self.server.ready_at else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(delay, mode):
+    """
+    Start a server ready after delay seconds, returning its url, the time it
+    is ready, and the servers started (to stop).
+
+    With refused nothing listens until then, and with proxy we answer 503.
+    """
+    port = free_port()
+    ready_at = time.time() + delay
+    servers = []
+
+    def serve():
+        server = ThreadingHTTPServer(("127.0.0.1", port), SlowStartHandler)
+        server.ready_at = ready_at
+        servers.append(server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    if mode == "refused":
+        timer = threading.Timer(delay, serve)
+        timer.daemon = True
+        timer.start()
+    else:
+        serve()
+    return f"http://127.0.0.1:{port}", ready_at, servers
+
+
+def previous(url, timeout):
+    """
+    The loop we had before the poller, returning the checks made.
+    """
+    sleep = 2
+    attempts = 0
+    start = time.time()
+    while time.time() - start < timeout:
+        attempts += 1
+        try:
+            response = session.get(url, verify=False)
+            if response.status_code != 404:
+                return attempts
+        except Exception:
+            pass
+        time.sleep(sleep)
+        sleep = sleep + 2
+    return attempts
+
+
+def poller(url, timeout):
+    poller = Poller(url, timeout=timeout)
+    poller.wait()
+    return poller.attempts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="playground readiness benchmark")
+    parser.add_argument("--delays", type=float, nargs="+", default=[1, 5, 15])
+    parser.add_argument("--iters", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", help="write results to this json file")
+    args = parser.parse_args()
+
+    results = []
+    for mode in "refused", "proxy":
+        for delay in args.delays:
+            for name, wait in [("previous", previous), ("poller", poller)]:
+                lags = []
+                attempts = []
+                for _ in range(args.iters):
+                    url, ready_at, servers = start_server(delay, mode)
+                    attempts.append(wait(url, args.timeout))
+                    lags.append(time.time() - ready_at)
+                    for server in servers:
+                        server.shutdown()
+                        server.server_close()
+                result = {
+                    "mode": mode,
+                    "delay": delay,
+                    "poller": name,
+                    "lag": statistics.median(lags),
+                    "max_lag": max(lags),
+                    "attempts": statistics.median(attempts),
+                }
+                results.append(result)
+                print(
+                    f"{mode.ljust(8)} ready after {delay:5.1f}s  {name.ljust(9)} "
+                    f"lag median {result['lag']:6.2f}s max {result['max_lag']:6.2f}s  "
+                    f"checks {result['attempts']:g}"
+                )
+
+    if args.output:
+        with open(args.output, "w") as fd:
+            fd.write(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+# Measure the startup time of common playground commands, run the way the
+# console script runs them (playground.client.run) against a local tutorial
+# file, so there is no network. Each command is run --iters times for the
+# wall time, and once more with -X importtime for where the time goes.
+# Results are written as json, and we exit non-zero if a command is over
+# budget.
+#
+# python benchmarks/startup.py --iters 10 --output startup.json
+# python benchmarks/startup.py --budgets budgets.json
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+root = os.path.dirname(here)
+tutorial_file = os.path.join(root, "playground", "tests", "testdata", "tutorial.yaml")
+settings_file = os.path.join(root, "playground", "settings.yml")
+
+# Commands to time (arguments to playground)
+commands = {
+    "version": ["version"],
+    "list": ["list", tutorial_file],
+    "show": ["show", tutorial_file],
+    "config get": ["config", "get", "backends"],
+    "deploy --dry-run": ["deploy", "--dry-run", tutorial_file],
+}
+
+# Median wall time budgets, in seconds (interpreter startup included)
+budgets = {
+    "version": 0.25,
+    "list": 0.75,
+    "show": 0.75,
+    "config get": 0.75,
+    "deploy --dry-run": 0.75,
+}
+
+# Run the command like the playground entrypoint does
+script = (
+    "import sys; from playground.client import run; sys.argv[0] = 'playground'; run()"
+)
+
+
+def run(args, env, importtime=False):
+    """
+    Run a playground command, returning the wall time and stderr.
+    """
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", script, "--settings-file", env["PLAYGROUND_SETTINGS"]] + args
+    start = time.perf_counter()
+    res = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if res.returncode != 0:
+        sys.exit(f"playground {' '.join(args)} failed:\n{res.stdout}{res.stderr}")
+    return seconds, res.stderr
+
+
+def parse_importtime(stderr, top=10):
+    """
+    Total import time, and the top-level packages that take the most (self) time
+    """
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        selftime, _, name = line[len("import time:") :].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(selftime)
+    ordered = sorted(packages.items(), key=lambda x: x[1], reverse=True)
+    return {
+        "total": sum(packages.values()) / 1e6,
+        "packages": {name: us / 1e6 for name, us in ordered[:top]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="playground startup benchmark")
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--output", help="write results to this json file")
+    parser.add_argument("--budgets", help="json file of budgets (seconds) by command")
+    args = parser.parse_args()
+
+    limits = dict(budgets)
+    if args.budgets:
+        with open(args.budgets, "r") as fd:
+            limits.update(json.load(fd))
+
+    # An isolated home, so user settings and caches don't change results
+    home = tempfile.mkdtemp(prefix="playground-startup-")
+    env = dict(os.environ)
+    env["HOME"] = home
+    env["PYTHONPATH"] = os.pathsep.join([root, env.get("PYTHONPATH", "")])
+    env["PLAYGROUND_SETTINGS"] = os.path.join(home, "settings.yml")
+    shutil.copyfile(settings_file, env["PLAYGROUND_SETTINGS"])
+
+    results = {}
+    over = []
+    try:
+        for name, command in commands.items():
+            # The first run warms caches (settings, snapshots) like repeat use
+            run(command, env)
+            times = [run(command, env)[0] for _ in range(args.iters)]
+            imports = parse_importtime(run(command, env, importtime=True)[1])
+            median = statistics.median(times)
+            results[name] = {
+                "median": median,
+                "min": min(times),
+                "max": max(times),
+                "budget": limits.get(name),
+                "imports": imports,
+            }
+            status = "ok"
+            if limits.get(name) is not None and median > limits[name]:
+                status = "OVER BUDGET"
+                over.append(name)
+            slowest = ", ".join(
+                f"{package} {seconds * 1000:.0f}ms"
+                for package, seconds in list(imports["packages"].items())[:3]
+            )
+            print(
+                f"{name.ljust(18)} median {median * 1000:6.1f} ms  "
+                f"imports {imports['total'] * 1000:6.1f} ms ({slowest})  {status}"
+            )
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as fd:
+            fd.write(json.dumps(results, indent=4))
+    if over:
+        sys.exit(f"Over budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
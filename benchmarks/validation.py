@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+# Compare validating a large catalog with jsonschema.validate (which checks
+# the schema and builds a new validator every call) to the compiled
+# validators in playground.main.schemas.
+#
+# python benchmarks/validation.py --count 10000
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+import jsonschema
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(here))
+
+import playground.main.schemas as schemas  # noqa
+import playground.utils as utils  # noqa
+
+tutorial_file = os.path.join(
+    os.path.dirname(here), "playground", "tests", "testdata", "tutorial.yaml"
+)
+
+
+def get_catalog(count):
+    """
+    Generate a catalog of count tutorials from the test tutorial.
+    """
+    tutorial = utils.read_yaml(tutorial_file)
+    catalog = {}
+    for i in range(count):
+        entry = {"tutorial": copy.deepcopy(tutorial)}
+        entry["tutorial"]["title"] = f"Tutorial {i}"
+        catalog[f"tutorial-{i}"] = entry
+    return catalog
+
+
+def before(catalog):
+    jsonschema.validate(catalog, schema=schemas.tutorials)
+    for tutorial in catalog.values():
+        jsonschema.validate(tutorial, schema=schemas.tutorial_properties)
+
+
+def after(catalog):
+    schemas.validate(catalog, "tutorials")
+    for tutorial in catalog.values():
+        schemas.validate(tutorial, "tutorial_properties")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tutorial validation benchmark")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    catalog = get_catalog(args.count)
+    print(f"Validating a catalog of {args.count} tutorials (best of {args.repeat})")
+    results = {}
+    for name, func in [("jsonschema.validate", before), ("compiled", after)]:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            func(catalog)
+            times.append(time.perf_counter() - start)
+        results[name] = min(times)
+        print(f"{name.ljust(20)} {results[name]:.3f} seconds")
+    speedup = results["jsonschema.validate"] / results["compiled"]
+    print(f"{'speedup'.ljust(20)} {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
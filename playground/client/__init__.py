@@ -45,6 +45,28 @@ def get_parser():
         action="store_true",
     )
 
+    parser.add_argument(
+        "--offline",
+        dest="offline",
+        help="only use cached repository metadata (no network).",
+        default=False,
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--no-server",
+        dest="no_server",
+        help="don't forward commands to a running playground server.",
+        default=False,
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--socket",
+        dest="socket",
+        help="path to the playground server socket (defaults to $PLAYGROUND_SOCKET or ~/.playground/playground.sock).",
+    )
+
     parser.add_argument(
         "--settings-file",
         dest="settings_file",
@@ -94,6 +116,44 @@ playground -c rm:registry:/tmp/registry""",
         default="ipython",
     )
 
+    status = subparsers.add_parser(
+        "status",
+        description="list tutorial instances across backends (settings.backends).",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    status.add_argument(
+        "--backend",
+        dest="backends",
+        help="a backend to list (can be repeated, defaults to settings.backends).",
+        action="append",
+    )
+
+    serve = subparsers.add_parser(
+        "serve",
+        description="run a server that keeps clients warm. deploy, stop and list are sent to it when it is running.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    serve.add_argument(
+        "--socket",
+        dest="socket",
+        help="path to the server socket (the same as playground --socket).",
+        default=argparse.SUPPRESS,
+    )
+    serve.add_argument(
+        "--status",
+        dest="status",
+        help="show the status of a running server.",
+        default=False,
+        action="store_true",
+    )
+    serve.add_argument(
+        "--shutdown",
+        dest="shutdown",
+        help="shut down a running server.",
+        default=False,
+        action="store_true",
+    )
+
     test = subparsers.add_parser(
         "test",
         description="test a playground deployment (if docker/podman will be headless)",
@@ -148,6 +208,17 @@ playground config add backend aws""",
         formatter_class=argparse.RawTextHelpFormatter,
     )
 
+    search = subparsers.add_parser(
+        "search",
+        description="search tutorials in cached tutorial repositories.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    search.add_argument(
+        "query",
+        help="one or more terms to search for (all must match)",
+        nargs="+",
+    )
+
     show = subparsers.add_parser(
         "show",
         description="show metadata for a tutorial repository.",
@@ -169,18 +240,104 @@ playground deploy -o headless:true <args>
             action="append",
         )
 
+    prefetch = subparsers.add_parser(
+        "prefetch",
+        description="pull the containers for tutorials ahead of a deploy.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    prefetch.add_argument(
+        "--tutorial",
+        dest="tutorials",
+        help="a tutorial to pull the container for (can be repeated, defaults to all).",
+        action="append",
+    )
+    prefetch.add_argument(
+        "--parallel",
+        dest="parallel",
+        help="the number of containers to pull at once.",
+        type=int,
+    )
+    prefetch.add_argument(
+        "--force",
+        dest="force",
+        help="pull containers we already have.",
+        default=False,
+        action="store_true",
+    )
+
+    pool = subparsers.add_parser(
+        "pool",
+        description="keep tutorial containers warm (in playground serve) to hand out.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    pool.add_argument(
+        "action",
+        help="fill (or resize), claim, release, drain or status",
+        choices=["fill", "claim", "release", "drain", "status"],
+    )
+    pool.add_argument(
+        "--size",
+        dest="size",
+        help="with fill, the number of containers to keep ready.",
+        type=int,
+    )
+    pool.add_argument(
+        "--ttl",
+        dest="ttl",
+        help="with fill, seconds a ready container can go unclaimed before it is stopped.",
+        type=int,
+    )
+    pool.add_argument(
+        "--env",
+        dest="envars",
+        help="with fill, environment variable key pair key=pair for the containers.",
+        action="append",
+    )
+    pool.add_argument(
+        "--name",
+        dest="name",
+        help="with release, the name of the claimed container to stop.",
+    )
+    pool.add_argument(
+        "--no-wait",
+        dest="no_wait",
+        help="with fill, don't wait for containers to be ready.",
+        default=False,
+        action="store_true",
+    )
+
     stop = subparsers.add_parser(
         "stop",
         description="stop a tutorial.",
         formatter_class=argparse.RawTextHelpFormatter,
     )
-    for command in show, deploy, listing, stop, test:
+    for command in show, deploy, pool, stop, test:
         command.add_argument(
             "repo",
             help="the tutorial repository to target.",
             nargs="?",
             default="tutorial.yaml",
         )
+    for command in listing, prefetch:
+        command.add_argument(
+            "repo",
+            help="one or more tutorial repositories to target.",
+            nargs="*",
+            default="tutorial.yaml",
+        )
+
+    for command in show, deploy, listing, pool, prefetch, stop, test:
+        command.add_argument(
+            "--repo",
+            dest="repos",
+            help="an additional tutorial repository to target (can be repeated).",
+            action="append",
+        )
+        command.add_argument(
+            "--repo-file",
+            dest="repo_file",
+            help="a yaml file with a list of tutorial repositories to target.",
+        )
 
     show.add_argument(
         "--outfile",
@@ -194,7 +351,38 @@ playground deploy -o headless:true <args>
         help="environment variable key pair key=pair to use during deploy.",
         action="append",
     )
-    for command in deploy, stop, show, test:
+    deploy.add_argument(
+        "--count",
+        dest="count",
+        help="deploy this many instances (docker and podman instances get their own host ports).",
+        type=int,
+    )
+    deploy.add_argument(
+        "--manifest",
+        dest="manifest",
+        help="a yaml file listing tutorials (and counts) to deploy together.",
+    )
+    deploy.add_argument(
+        "--parallel",
+        dest="parallel",
+        help="with --manifest, the number of tutorials to deploy at once.",
+        type=int,
+    )
+    deploy.add_argument(
+        "--no-wait",
+        dest="no_wait",
+        help="with --manifest, don't wait for tutorials to be ready.",
+        default=False,
+        action="store_true",
+    )
+    deploy.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        help="show what would be deployed, without using the backend.",
+        default=False,
+        action="store_true",
+    )
+    for command in deploy, pool, stop, show, test:
         command.add_argument(
             "tutorial_name",
             help="the tutorial name to target (required)",
@@ -202,13 +390,16 @@ playground deploy -o headless:true <args>
             default="local",
         )
 
-    for command in deploy, show, listing, shell, stop, test:
+    # Without a tutorial, pool status describes every pool
+    pool.set_defaults(tutorial_name=None)
+
+    for command in deploy, show, listing, pool, prefetch, shell, stop, test:
         command.add_argument(
             "-b",
             "--backend",
             dest="backend",
-            help="the backend to use (defaults to docker)",
-            choices=backends.backend_names,
+            help="the backend to use (defaults to docker): %s, or a plugin"
+            % ", ".join(backends.backend_names),
             default="docker",
         )
 
@@ -265,8 +456,18 @@ def run():
         from .config import main
     elif args.command == "list":
         from .listing import main
+    elif args.command == "pool":
+        from .pool import main
+    elif args.command == "prefetch":
+        from .prefetch import main
+    elif args.command == "status":
+        from .status import main
     elif args.command == "stop":
         from .stop import main
+    elif args.command == "serve":
+        from .serve import main
+    elif args.command == "search":
+        from .search import main
     elif args.command == "show":
         from .show import main
     elif args.command == "test":
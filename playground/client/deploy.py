@@ -3,11 +3,13 @@
 #
 # SPDX-License-Identifier: (MIT)
 
+import json
+import os
+
 import playground.utils as utils
 from playground.logger import logger
-from playground.main import Playground
 
-from .helpers import parse_envars, parse_options
+from .helpers import get_repos, get_request, get_server, parse_envars, parse_options
 
 
 def main(args, parser, extra, subparser):
@@ -16,23 +18,115 @@ def main(args, parser, extra, subparser):
     """
     utils.ensure_no_extra(extra)
 
+    # Parse envars if we have any
+    envars = parse_envars(args.envars)
+
+    # And options
+    options = parse_options(args.deploy_options)
+
+    if args.manifest:
+        return deploy_manifest(args)
+
+    # More than one instance are deployed together (and headless)
+    if args.count and args.count > 1:
+        options["count"] = args.count
+
+    # An interactive deploy needs our terminal, so only others are forwarded
+    server = None
+    if args.dry_run or options.get("headless") or options.get("count"):
+        server = get_server(args)
+    if server:
+        try:
+            result = server.request(
+                "deploy",
+                tutorial=args.tutorial_name,
+                envars=envars,
+                dry_run=args.dry_run,
+                options=options,
+                **get_request(args),
+            )
+        except ValueError as e:
+            logger.exit(f"Issue with deploy: {e}")
+        show_result(args, result)
+        return
+
+    from playground.main import Playground
+
     cli = Playground(
-        args.repo,
+        get_repos(args),
         quiet=args.quiet,
         settings_file=args.settings_file,
+        offline=args.offline,
         backend=args.backend,
     )
 
     # Update config settings on the fly
     cli.settings.update_params(args.config_params)
 
-    # Parse envars if we have any
-    envars = parse_envars(args.envars)
+    try:
+        result = cli.deploy(args.tutorial_name, envars, dry_run=args.dry_run, **options)
+    except Exception as e:
+        logger.exit(f"Issue with deploy: {e}")
+    show_result(args, result)
 
-    # And options
-    options = parse_options(args.deploy_options)
 
+def show_result(args, result):
+    """
+    Show the plan for a dry run, or the instances when we deployed more than one.
+    """
+    if not result:
+        return
+    if args.dry_run:
+        print(json.dumps(result, indent=4))
+    elif "instances" in result:
+        show_instances(result["instances"])
+
+
+def deploy_manifest(args):
+    """
+    playground deploy --manifest fleet.yaml
+    """
+    from playground.main import Playground
+
+    # Tutorials without a repo in the manifest use one given here
+    repo = get_repos(args)
+    if repo == "tutorial.yaml" and not os.path.exists(repo):
+        repo = None
+
+    cli = Playground(
+        repo,
+        quiet=args.quiet,
+        settings_file=args.settings_file,
+        offline=args.offline,
+        backend=args.backend,
+    )
+    cli.settings.update_params(args.config_params)
     try:
-        cli.deploy(args.tutorial_name, envars, **options)
+        results = cli.deploy_manifest(
+            args.manifest, workers=args.parallel, wait=not args.no_wait
+        )
     except Exception as e:
         logger.exit(f"Issue with deploy: {e}")
+    show_instances(results)
+
+
+def show_instances(results):
+    """
+    Show a table of deployed instances, exiting with an error if any failed.
+    """
+    from playground.main.table import Table
+
+    rows = [
+        {
+            "name": x["name"] or x["tutorial"],
+            "backend": x["backend"],
+            "status": x["status"],
+            "url": x["url"] or "",
+            "error": x["error"] or "",
+        }
+        for x in results
+    ]
+    Table(rows).table(title="Deployed Tutorials")
+    failed = [x for x in results if x["status"] == "failed"]
+    if failed:
+        logger.exit(f"{len(failed)} of {len(results)} tutorials failed to deploy.")
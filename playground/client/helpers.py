@@ -3,9 +3,32 @@
 #
 # SPDX-License-Identifier: (MIT)
 
+import os
+
+import playground.utils as utils
 from playground.logger import logger
 
 
+def get_repos(args, default="tutorial.yaml"):
+    """
+    Get one or more repositories from positional arguments, --repo and --repo-file
+    """
+    repos = args.repo if isinstance(args.repo, list) else [args.repo]
+    repos = list(repos) + list(args.repos or [])
+    if args.repo_file:
+        listing = utils.read_yaml(args.repo_file) or []
+        if isinstance(listing, dict):
+            listing = listing.get("repositories") or []
+        repos += listing
+
+    # Only keep the default (tutorial.yaml) if it's alone or exists
+    if len(repos) > 1 and default in repos and not os.path.exists(default):
+        repos.remove(default)
+    if not repos:
+        return default
+    return repos[0] if len(repos) == 1 else repos
+
+
 def parse_envars(listing):
     """
     Parse envars if we have any
@@ -39,3 +62,33 @@ def parse_options(options):
             value = None
         opts[key] = value
     return opts
+
+
+def get_server(args):
+    """
+    Get a client for a running playground server, if we should forward to one.
+
+    Commands that change settings on the fly (-c) always run here.
+    """
+    if getattr(args, "no_server", False) or getattr(args, "config_params", None):
+        return
+    from playground.main.server import Client
+
+    client = Client(getattr(args, "socket", None))
+    if client.is_running():
+        return client
+
+
+def get_request(args):
+    """
+    Arguments shared by forwarded commands. Paths are made absolute, since
+    the server does not run in our working directory.
+    """
+    repos = get_repos(args)
+    repos = repos if isinstance(repos, list) else [repos]
+    return {
+        "repos": [os.path.abspath(x) if os.path.exists(x) else x for x in repos],
+        "settings_file": args.settings_file and os.path.abspath(args.settings_file),
+        "backend": args.backend,
+        "offline": args.offline,
+    }
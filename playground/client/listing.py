@@ -4,7 +4,8 @@
 # SPDX-License-Identifier: (MIT)
 
 import playground.utils as utils
-from playground.main import Playground
+
+from .helpers import get_repos, get_request, get_server
 
 
 def main(args, parser, extra, subparser):
@@ -13,10 +14,20 @@ def main(args, parser, extra, subparser):
     """
     utils.ensure_no_extra(extra)
 
+    # A running server has the client (and repositories) ready
+    server = get_server(args)
+    if server:
+        for name in server.request("list", **get_request(args)):
+            print("🍓 %s\n" % name)
+        return
+
+    from playground.main import Playground
+
     cli = Playground(
-        args.repo,
+        get_repos(args),
         quiet=args.quiet,
         settings_file=args.settings_file,
+        offline=args.offline,
         backend=args.backend,
     )
 
@@ -0,0 +1,52 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import json
+
+import playground.utils as utils
+from playground.logger import logger
+
+from .helpers import get_request, get_server, parse_envars
+
+
+def main(args, parser, extra, subparser):
+    """
+    playground pool fill --size 10 https://github.com/rse-ops/flux-tutorials radiuss-aws-2022
+    playground pool claim https://github.com/rse-ops/flux-tutorials radiuss-aws-2022
+    """
+    utils.ensure_no_extra(extra)
+
+    # Pools (and the containers in them) live in a running server
+    server = get_server(args)
+    if not server:
+        logger.exit(
+            "A warm pool needs a running server, start one with playground serve"
+        )
+
+    request = get_request(args)
+    if args.action == "status" and not args.tutorial_name:
+        request.pop("repos")
+    else:
+        request["tutorial"] = args.tutorial_name or "local"
+    if args.action == "release" and not args.name:
+        logger.exit("Release needs the --name of a claimed container.")
+    request.update(
+        {
+            "action": args.action,
+            "size": args.size,
+            "ttl": args.ttl,
+            "envars": parse_envars(args.envars),
+            "name": args.name,
+            "wait": not args.no_wait,
+        }
+    )
+
+    try:
+        result = server.request("pool", **request)
+    except ValueError as e:
+        logger.exit(f"Issue with pool {args.action}: {e}")
+    if args.action == "claim" and not result:
+        logger.exit("No container in the pool is ready yet, try again soon.")
+    print(json.dumps(result, indent=4))
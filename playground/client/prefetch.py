@@ -0,0 +1,62 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import sys
+import time
+
+import playground.utils as utils
+from playground.logger import logger
+
+from .helpers import get_repos
+
+
+def main(args, parser, extra, subparser):
+    """
+    playground prefetch https://github.com/rse-ops/flux-tutorials --parallel 4
+    """
+    utils.ensure_no_extra(extra)
+
+    from playground.main import Playground
+    from playground.main.table import Table
+
+    cli = Playground(
+        get_repos(args),
+        quiet=args.quiet,
+        settings_file=args.settings_file,
+        offline=args.offline,
+        backend=args.backend,
+    )
+    cli.settings.update_params(args.config_params)
+
+    start = time.time()
+    try:
+        results = cli.prefetch(args.tutorials, workers=args.parallel, force=args.force)
+    except ValueError as e:
+        logger.exit(str(e))
+    seconds = time.time() - start
+
+    rows = []
+    for result in results:
+        size = result["size"]
+        rows.append(
+            {
+                "image": result["image"],
+                "status": result["status"],
+                "size": utils.print_bytes(size) if size is not None else "",
+                "seconds": f"{result['seconds']:.1f}" if result["seconds"] else "",
+                "tutorials": ", ".join(result["tutorials"]),
+            }
+        )
+    Table(rows).table(title="Tutorial Containers")
+
+    pulled = sum(x["size"] or 0 for x in results if x["status"] == "pulled")
+    count = len([x for x in results if x["status"] == "pulled"])
+    logger.info(
+        f"Pulled {count} of {len(results)} containers ({utils.print_bytes(pulled)}) "
+        f"in {seconds:.1f} seconds, {utils.print_bytes(pulled / max(seconds, 0.001))}/s"
+    )
+    # Failures were logged as they happened
+    if any(x["status"] == "failed" for x in results):
+        sys.exit(1)
@@ -0,0 +1,31 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import playground.utils as utils
+from playground.main import Playground
+from playground.main.table import Table
+
+
+def main(args, parser, extra, subparser):
+    """
+    playground search flux jupyter
+    """
+    utils.ensure_no_extra(extra)
+
+    cli = Playground(
+        quiet=args.quiet,
+        settings_file=args.settings_file,
+    )
+    results = cli.search(" ".join(args.query))
+    rows = [
+        {
+            "name": x["name"],
+            "repository": x["repository"],
+            "title": x["title"],
+            "container": x["container"],
+        }
+        for x in results
+    ]
+    Table(rows).table(title="Tutorials")
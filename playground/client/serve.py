@@ -0,0 +1,32 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import json
+
+import playground.utils as utils
+from playground.logger import logger
+from playground.main.server import Client, Server
+
+
+def main(args, parser, extra, subparser):
+    """
+    playground serve
+    """
+    utils.ensure_no_extra(extra)
+
+    client = Client(args.socket)
+    if args.status or args.shutdown:
+        if not client.is_running():
+            logger.exit(f"There is no server listening on {client.socket_path}")
+        command = "status" if args.status else "shutdown"
+        print(json.dumps(client.request(command), indent=4))
+        return
+
+    try:
+        Server(args.socket).serve()
+    except ValueError as e:
+        logger.exit(str(e))
+    except KeyboardInterrupt:
+        pass
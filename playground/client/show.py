@@ -10,6 +10,8 @@ from rich import print_json
 import playground.utils as utils
 from playground.main import Playground
 
+from .helpers import get_repos
+
 
 def main(args, parser, extra, subparser):
     """
@@ -19,9 +21,10 @@ def main(args, parser, extra, subparser):
     utils.ensure_no_extra(extra)
 
     cli = Playground(
-        args.repo,
+        get_repos(args),
         quiet=args.quiet,
         settings_file=args.settings_file,
+        offline=args.offline,
         backend=args.backend,
     )
 
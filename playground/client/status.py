@@ -0,0 +1,69 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import os
+import time
+
+import playground.utils as utils
+from playground.logger import logger
+
+from .helpers import get_server
+
+
+def format_age(created):
+    """
+    A short age (e.g., 2d 3h) for a creation time in seconds since the epoch.
+    """
+    if created is None:
+        return ""
+    seconds = max(0, int(time.time() - created))
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+def main(args, parser, extra, subparser):
+    """
+    playground status
+    """
+    utils.ensure_no_extra(extra)
+
+    # A running server has (authenticated) backend clients ready
+    server = get_server(args)
+    if server:
+        settings_file = args.settings_file and os.path.abspath(args.settings_file)
+        result = server.request(
+            "instances", backends=args.backends, settings_file=settings_file
+        )
+        instances, errors = result["instances"], result["errors"]
+    else:
+        from playground.main import Playground
+
+        cli = Playground(quiet=args.quiet, settings_file=args.settings_file)
+        cli.settings.update_params(args.config_params)
+        instances, errors = cli.status(args.backends)
+
+    from playground.main.table import Table
+
+    for backend, error in errors.items():
+        logger.warning(f"Cannot list instances for {backend}: {error}")
+    rows = [
+        {
+            "name": x["name"],
+            "backend": x["backend"],
+            "state": x["state"] or "",
+            "url": x["url"] or "",
+            "age": format_age(x.get("created")),
+        }
+        for x in instances
+    ]
+    Table(rows).table(title="Tutorial Instances")
@@ -5,7 +5,8 @@
 
 import playground.utils as utils
 from playground.logger import logger
-from playground.main import Playground
+
+from .helpers import get_repos, get_request, get_server
 
 
 def main(args, parser, extra, subparser):
@@ -14,10 +15,21 @@ def main(args, parser, extra, subparser):
     """
     utils.ensure_no_extra(extra)
 
+    server = get_server(args)
+    if server:
+        try:
+            server.request("stop", tutorial=args.tutorial_name, **get_request(args))
+        except ValueError as e:
+            logger.exit(f"Issue with stop: {e}")
+        return
+
+    from playground.main import Playground
+
     cli = Playground(
-        args.repo,
+        get_repos(args),
         quiet=args.quiet,
         settings_file=args.settings_file,
+        offline=args.offline,
         backend=args.backend,
     )
 
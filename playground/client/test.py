@@ -6,7 +6,7 @@
 import playground.utils as utils
 from playground.main import Playground
 
-from .helpers import parse_options
+from .helpers import get_repos, parse_options
 
 
 def main(args, parser, extra, subparser):
@@ -16,9 +16,10 @@ def main(args, parser, extra, subparser):
     utils.ensure_no_extra(extra)
 
     client = Playground(
-        args.repo,
+        get_repos(args),
         quiet=args.quiet,
         settings_file=args.settings_file,
+        offline=args.offline,
         backend=args.backend,
     )
     options = parse_options(args.deploy_options)
@@ -20,8 +20,82 @@ userhome = os.path.expanduser("~/.playground")
 # The user settings file can be created to over-ride default
 user_settings_file = os.path.join(userhome, "settings.yml")
 cache_dir = os.path.join(userhome, "cache")
+
+# The socket for playground serve (the same for commands forwarded to it), and
+# seconds to wait to connect to it
+socket_path = os.environ.get("PLAYGROUND_SOCKET") or os.path.join(
+    userhome, "playground.sock"
+)
+socket_connect_timeout = 1
 cache_expire = 128  # one week is 128 hours
 
+# Seconds to allow a background metadata refresh to finish, and (in total) to
+# wait for those still running when a command exits
+cache_refresh_timeout = 10
+cache_refresh_exit = 0.5
+
+# Shared HTTP session: hosts to keep pools for, connections per host,
+# and the (connect, read) timeout in seconds
+http_pool_hosts = 10
+http_pool_size = 10
+http_timeout = (5, 30)
+
+# When docker and podman pull a tutorial container, and the hours an image is
+# fresh for with if-stale
+pull_policies = ["always", "if-not-present", "if-stale", "never"]
+pull_expire = 24
+
+# Repositories to fetch at once when loading more than one
+repository_workers = 8
+
+# Tutorials to deploy at once from a manifest, and seconds to wait for all
+# of them to be ready
+deploy_workers = 4
+deploy_timeout = 900
+
+# Seconds to wait for the docker or podman engine API to answer, and to create,
+# start, stop (a container has 10 seconds to exit before it is killed) or remove
+# a container. Pulls and events are not limited once they start streaming.
+engine_timeout = 5
+engine_container_timeout = 60
+
+# Images to pull at once with prefetch
+prefetch_workers = 3
+
+# Host ports handed out to tutorial containers that can't use their own (e.g.,
+# more than one instance on a host), and seconds other processes skip a port
+# that was just handed out
+port_range = (20000, 29999)
+port_reserve = 60
+
+# Waiting for a tutorial url: seconds to wait in total, the first and most
+# seconds between checks (doubling, less up to a jitter fraction), and the
+# (connect, read) timeout of a check. A url is ready with a success, redirect
+# or auth challenge (a 502 or 503 is a proxy in front of a server starting)
+ready_timeout = 1800
+ready_backoff = (0.5, 5)
+ready_jitter = 0.25
+ready_request_timeout = (3, 10)
+ready_statuses = list(range(200, 400)) + [401, 403]
+
+# For docker and podman, seconds between checks of a generated health check
+# (for an image without one)
+healthcheck_interval = 2
+
+# What to do with a docker or podman deploy the host doesn't have room for,
+# and seconds to wait (and between checks) for room with queue
+admission_policies = ["off", "reject", "queue"]
+admission_timeout = 600
+admission_interval = 5
+
+# Warm pools: containers to keep ready, seconds a ready container can sit
+# unclaimed before it is stopped, seconds to wait for one to be ready, and
+# seconds between checks for idle containers (in playground serve)
+pool_size = 2
+pool_ttl = 3600
+pool_timeout = 300
+pool_reap_interval = 30
+
 # variables in settings that allow environment variable expansion
 allowed_envars = ["HOME"]
 
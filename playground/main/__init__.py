@@ -1 +1,9 @@
-from .client import Playground
+def __getattr__(name):
+    """
+    Import the client on demand, so importing a submodule stays cheap.
+    """
+    if name == "Playground":
+        from .client import Playground
+
+        return Playground
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,145 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+
+import playground.defaults as defaults
+import playground.utils as utils
+from playground.logger import logger
+
+# Container states that hold (or are about to hold) their resources
+active_states = ["created", "running", "restarting"]
+
+
+class Admission:
+    """
+    Admit tutorial containers to a host only when it has room for them.
+
+    The host has the cpus and memory (MB) the container engine reports,
+    unless set with host_cpus and host_memory. Containers playground started
+    record what they asked for in labels, and those that are running have
+    committed it. Admission is off unless asked for. With the reject policy
+    a deploy that doesn't fit is an error, and with queue we wait (up to
+    admission_timeout) for room.
+    Checks are serialized with a file lock (held until a headless container
+    is started) so deploys at the same time can't both take the last room.
+    """
+
+    def __init__(self, client, policy=None):
+        self.client = client
+        self.policy = policy or client._settings.get("admission") or "off"
+        if self.policy not in defaults.admission_policies:
+            raise ValueError(
+                f"{self.policy} is not a valid admission policy, choose from {defaults.admission_policies}"
+            )
+        self.path = os.path.join(defaults.cache_dir, "admission.lock")
+
+    def __str__(self):
+        return f"[playground-admission:{self.policy}]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def capacity(self):
+        """
+        The cpus and memory (MB) of the host.
+        """
+        capacity = self.client.host_capacity()
+        for key in capacity:
+            if self.client._settings.get(f"host_{key}"):
+                capacity[key] = float(self.client._settings[f"host_{key}"])
+        return capacity
+
+    def committed(self):
+        """
+        The cpus and memory (MB) committed to running playground containers.
+        """
+        committed = {"cpus": 0, "memory": 0}
+        for container in self.client.list_containers():
+            state = (container.get("State") or "").lower()
+            if state not in active_states:
+                continue
+            labels = self.client.get_labels(container)
+            for key in committed:
+                try:
+                    committed[key] += float(labels.get(f"playground.{key}") or 0)
+                except ValueError:
+                    continue
+        return committed
+
+    def check(self, limits):
+        """
+        Return why containers with these limits don't fit, or None if they do.
+        """
+        capacity = self.capacity()
+        committed = self.committed()
+        reasons = []
+        for key, unit in [("cpus", " cpus"), ("memory", " MB memory")]:
+            if not limits.get(key) or not capacity.get(key):
+                continue
+            if committed[key] + limits[key] > capacity[key]:
+                reasons.append(
+                    f"{limits[key]:g}{unit} requested with {committed[key]:g} "
+                    f"of {capacity[key]:g} committed"
+                )
+        return "; ".join(reasons) or None
+
+    def acquire(self):
+        utils.mkdir_p(os.path.dirname(self.path))
+        fd = open(self.path, "a")
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def release(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        fd.close()
+
+    @contextmanager
+    def admit(self, tutorial, limits, hold=True):
+        """
+        Wait for (or reject) room for a tutorial, and start it in the context.
+
+        Without hold (e.g., an interactive container that runs until it is
+        stopped) the lock is not held while it runs.
+        """
+        if self.policy == "off" or not any(limits.values()):
+            yield
+            return
+
+        # A tutorial bigger than the host will never fit
+        capacity = self.capacity()
+        for key, value in limits.items():
+            if value and capacity.get(key) and value > capacity[key]:
+                raise ValueError(
+                    f"{tutorial.uid} needs {value:g} {key}, and the host has {capacity[key]:g}"
+                )
+
+        deadline = time.time() + defaults.admission_timeout
+        while True:
+            fd = self.acquire()
+            try:
+                reason = self.check(limits)
+                if reason is None:
+                    if not hold:
+                        self.release(fd)
+                        fd = None
+                    yield
+                    return
+            finally:
+                if fd is not None:
+                    self.release(fd)
+            if self.policy != "queue":
+                raise ValueError(
+                    f"There is not room to deploy {tutorial.uid}: {reason}"
+                )
+            if time.time() > deadline:
+                raise ValueError(
+                    f"There was not room to deploy {tutorial.uid} within {defaults.admission_timeout} seconds: {reason}"
+                )
+            logger.info(f"Waiting for room to deploy {tutorial.uid}: {reason}")
+            time.sleep(defaults.admission_interval)
@@ -1,18 +1,38 @@
-from .aws import AmazonCloud
-from .docker import DockerClient
-from .google import GoogleCloud
-from .podman import PodmanClient
+import importlib
 
-# backends = {"aws": AmazonCloud}
+# Backends are imported only when used, since cloud SDKs are slow to import
 backends = {
-    "aws": AmazonCloud,
-    "docker": DockerClient,
-    "gcp": GoogleCloud,
-    "google": GoogleCloud,
-    "podman": PodmanClient,
+    "aws": "playground.main.backends.aws:AmazonCloud",
+    "docker": "playground.main.backends.docker:DockerClient",
+    "gcp": "playground.main.backends.google:GoogleCloud",
+    "google": "playground.main.backends.google:GoogleCloud",
+    "podman": "playground.main.backends.podman:PodmanClient",
 }
 backend_names = list(backends)
 
+# Other packages can provide backends with this entry point group
+plugin_group = "playground.backends"
+
+
+def get_plugin(name):
+    """
+    Find a backend provided by an installed package (entry point).
+    """
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=plugin_group):
+        if entry_point.name == name:
+            return entry_point.load()
+
 
 def get_backend(name):
-    return backends.get(name)
+    """
+    Import and return a backend class by name.
+    """
+    if not name:
+        return
+    path = backends.get(name)
+    if not path:
+        return get_plugin(name)
+    module, classname = path.split(":")
+    return getattr(importlib.import_module(module), classname)
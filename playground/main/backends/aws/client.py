@@ -30,7 +30,7 @@ class AmazonCloud(Backend):
 
         # This currently has two pieces - billing and instances (different APIs)
         self._set_services()
-        super(AmazonCloud, self).__init__()
+        super(AmazonCloud, self).__init__(settings=kwargs.get("settings"))
 
     def _set_services(self):
         """
@@ -56,6 +56,39 @@ class AmazonCloud(Backend):
         """
         return self.ec2_client.describe_instances()
 
+    def instances(self):
+        """
+        List tutorial instances (tagged with playground-tutorial, the uid)
+        """
+        instances = []
+        for group in self.list_instances().get("Reservations", {}):
+            for instance in group.get("Instances", []):
+                tags = {x["Key"]: x["Value"] for x in instance.get("Tags", [])}
+                if "playground-tutorial" not in tags:
+                    continue
+
+                # Terminated instances are listed for a while after they are gone
+                if instance["State"]["Name"] in ["shutting-down", "terminated"]:
+                    continue
+                url = None
+                if instance.get("PublicIpAddress"):
+                    url = self.format_url(
+                        instance["PublicIpAddress"],
+                        tags.get("playground-port"),
+                        tags.get("playground-https", "true") == "true",
+                    )
+                created = instance.get("LaunchTime")
+                instances.append(
+                    {
+                        "name": tags["playground-tutorial"],
+                        "backend": self.name,
+                        "state": instance["State"]["Name"],
+                        "url": url,
+                        "created": created.timestamp() if created else None,
+                    }
+                )
+        return instances
+
     def ensure_vpc(self, tutorial):
         """
         Ensure we have a VPC.
@@ -639,9 +672,16 @@ class AmazonCloud(Backend):
 
         # Create the instance
         res = self.ec2_resources.create_instances(**params, MinCount=1, MaxCount=1)[0]
-        res.create_tags(Tags=[{"Key": "Name", "Value": tutorial.uid}])
+        tags = [{"Key": "Name", "Value": tutorial.uid}]
+        tags.append(
+            {"Key": "playground-https", "Value": str(tutorial.container_https).lower()}
+        )
+        if tutorial.expose_port:
+            tags.append({"Key": "playground-port", "Value": str(tutorial.expose_port)})
+        res.create_tags(Tags=tags)
         res.wait_until_running()
         url = res.public_ip_address
 
         # Show the ip address, and give a warning about startup time
-        self.show_ip_address(url, tutorial)
+        url = self.show_ip_address(url, tutorial, wait=kwargs.get("wait", True))
+        return {"url": url}
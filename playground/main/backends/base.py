@@ -3,13 +3,13 @@
 #
 # SPDX-License-Identifier: (MIT)
 
-import time
-
 import requests
 from rich.live import Live
 from rich.spinner import Spinner
 from rich.text import Text
 
+import playground.defaults as defaults
+import playground.main.readiness as readiness
 from playground.logger import logger
 
 # Even self signed certificates will issue a warning with verify=False
@@ -24,13 +24,16 @@ class Backend:
     name = "backend"
 
     def __init__(self, settings=None):
-        self._settings = settings
+        from playground.main.settings import Settings
 
         # If we weren't created with settings, add empty
-        if not self._settings:
-            from playground.main.settings import Settings
+        if not settings:
+            settings = Settings()
 
-            self._settings = Settings()
+        # Backends read from a frozen, pre-resolved view of settings
+        if isinstance(settings, Settings):
+            settings = settings.resolve_all()
+        self._settings = settings
 
     @property
     def settings(self):
@@ -43,65 +46,78 @@ class Backend:
         return str(self.__class__.__name__)
 
     def wait_until_available(
-        self, url, sleep=2, spin=None, text="Waiting for tutorial to be ready..."
+        self,
+        url,
+        spin=None,
+        text="Waiting for tutorial to be ready...",
+        tutorial=None,
+        timeout=None,
     ):
         """
-        Wait until a URL is available, updating the status message.
+        Wait until a URL (or tutorial) is available, updating the status message.
         """
-        # Wait until the page does not 404
         spin = Spinner("dots", text=Text(text, style="green"))
+        if timeout is None:
+            timeout = defaults.ready_timeout
 
         # Show a spinner until ready
         with Live(spin, refresh_per_second=20):
-            self._wait_until_available(url, spin=spin, sleep=sleep)
-
-    def _wait_until_available(self, url, sleep=2, spin=None):
-        """
-        Wait until an ip address returns a non-404 response.
-        """
-        ready = False
-
-        def update_message(text):
-            if spin:
-                spin.update(text=text, style="green")
-            else:
-                logger.debug(text)
-
-        while not ready:
-            # Second round of tries won't work until instance service is running
-            try:
-                # We can't verify because even self signed are not good enough!
-                response = requests.get(url, verify=False)
-                if response.status_code == 404:
-                    update_message(
-                        f"{url} is not ready yet: response code {response.status_code}. Sleeping {sleep} seconds"
-                    )
-                    time.sleep(sleep)
-                    sleep = sleep + 2
-                elif response.status_code != 404:
-                    update_message(
-                        f"{url} is ready: response code {response.status_code}"
-                    )
-                    ready = True
-                    break
-
-            # First tries will just fail
-            except Exception:
-                update_message(f"{url} is not ready yet. Sleeping {sleep} seconds")
-                time.sleep(sleep)
-                sleep = sleep + 2
-
-    def show_ip_address(self, url, tutorial):
+            if tutorial is not None:
+                return self.wait_until_ready(tutorial, url, timeout=timeout, spin=spin)
+            return self._wait_until_available(url, spin=spin, timeout=timeout)
+
+    def wait_until_ready(self, tutorial, url, timeout=None, spin=None):
         """
-        Show the ip address and warn the user things take a bit to start up.
+        Wait until a tutorial is ready at its url (True) or the timeout passes.
+
+        A backend can know more than the url (e.g., a container's health).
+        """
+        return self._wait_until_available(
+            url, spin=spin, timeout=timeout, predicate=tutorial.ready
+        )
+
+    def is_available(self, url, predicate=None):
+        """
+        Determine if a url is available (ready with a single check).
+        """
+        return readiness.Poller(url, predicate).check()
+
+    def _wait_until_available(self, url, spin=None, timeout=None, predicate=None):
+        """
+        Wait until a url is ready (with a predicate, by default a good response).
+
+        With a timeout (seconds) give up and return False when it passes.
         """
-        prefix = "https://" if tutorial.container_https else "http://"
-        url = f"{prefix}{url}"
-        if tutorial.expose_port:
-            url = f"{url}:{tutorial.expose_port}"
+        poller = readiness.Poller(url, predicate, timeout=timeout)
+        return poller.wait(spin=spin)
 
-        self.wait_until_available(url)
-        logger.c.print(f"Ready: {url}")
+    def show_ip_address(self, url, tutorial, wait=True):
+        """
+        Show the ip address and warn the user things take a bit to start up.
+
+        Without wait, return the url without waiting for it to be ready.
+        """
+        url = self.format_url(url, tutorial.host_port, tutorial.container_https)
+        if not wait:
+            return url
+
+        if self.wait_until_available(url, tutorial=tutorial):
+            logger.c.print(f"Ready: {url}")
+        else:
+            logger.warning(
+                f"{url} was not ready within {defaults.ready_timeout} seconds."
+            )
+        return url
+
+    def format_url(self, address, port=None, https=True):
+        """
+        The url for a tutorial at an address (ip or hostname)
+        """
+        prefix = "https://" if https else "http://"
+        url = f"{prefix}{address}"
+        if port:
+            url = f"{url}:{port}"
+        return url
 
     def ensure_firewall(self, tutorial):
         """
@@ -121,6 +137,10 @@ class Backend:
         raise NotImplementedError
 
     def instances(self, *args, **kwargs):
+        """
+        List tutorial instances. Each has a name (the tutorial uid), the
+        backend, a state, a url (or None) and created (seconds since epoch).
+        """
         raise NotImplementedError(
             "The instances function is not implemented for this class."
         )
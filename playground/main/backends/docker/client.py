@@ -3,12 +3,23 @@
 #
 # SPDX-License-Identifier: (MIT)
 
+import http.client
+import json
+import os
 import shutil
+import time
+from datetime import datetime
 
+import playground.defaults as defaults
+import playground.main.cache as cache
+import playground.main.readiness as readiness
 import playground.utils as utils
 from playground.logger import logger
+from playground.main.admission import Admission
 
 from ..base import Backend
+from .engine import Engine, EngineError, registry_auth
+from .events import EventWatcher
 
 
 class DockerClient(Backend):
@@ -18,27 +29,253 @@ class DockerClient(Backend):
 
     name = "docker"
 
+    # Engine API sockets, after one in this environment variable (unix://)
+    host_envar = "DOCKER_HOST"
+    sockets = ["/var/run/docker.sock"]
+
     def __init__(self, **kwargs):
+        super(DockerClient, self).__init__(settings=kwargs.get("settings"))
+
+        # The container (id or name) and start time of tutorials we started
+        self.started = {}
         self.check()
-        super(DockerClient, self).__init__()
 
     def check(self):
         """
-        Ensure the client is installed.
+        Find the engine API socket and (or) ensure the client is installed.
         """
+        transport = self._settings.get("container_transport") or "auto"
         self.cli = shutil.which(self.name)
-        if not self.cli:
+        self.engine = None
+        if transport != "cli":
+            self.engine = Engine.find(self.get_sockets())
+        if transport == "api" and not self.engine:
+            raise ValueError(f"There is no {self.name} engine socket to connect to.")
+        if not self.engine and not self.cli:
             raise ValueError(
                 f"The executable '{self.name}' is not available on this system."
             )
 
+    def get_sockets(self):
+        """
+        Paths where the engine API might be listening.
+        """
+        sockets = []
+        host = os.environ.get(self.host_envar) or ""
+        if host.startswith("unix://"):
+            sockets.append(host[len("unix://") :])
+        return sockets + self.sockets
+
     def stop(self, tutorial):
         """
         When run in headless mode, we can stop the container by name.
         """
+        if self.engine:
+            try:
+                self.engine.stop(tutorial.uid)
+            except EngineError as e:
+                return {"message": str(e), "return_code": 1}
+            return {"message": f"Stopped {tutorial.uid}", "return_code": 0}
         cmd = [self.cli, "stop", tutorial.uid]
         return utils.run_command(cmd, stream=True)
 
+    def inspect_image(self, image):
+        """
+        Get the id, size and repository digests of a local image, or None.
+        """
+        if self.engine:
+            data = self.engine.inspect_image(image)
+        else:
+            res = utils.run_command([self.cli, "image", "inspect", image])
+            if res["return_code"] != 0:
+                return
+            try:
+                data = json.loads(res["message"])[0]
+            except (ValueError, IndexError):
+                return
+        if not data:
+            return
+        config = data.get("Config") or {}
+        return {
+            "id": data.get("Id"),
+            "size": data.get("Size"),
+            "digests": data.get("RepoDigests") or [],
+            "healthcheck": config.get("Healthcheck") or data.get("HealthCheck"),
+        }
+
+    def image_id(self, image):
+        """
+        Get the id (digest) of a local image, or None if we don't have it.
+        """
+        info = self.inspect_image(image)
+        return info and info["id"]
+
+    def remote_digest(self, image):
+        """
+        The digest the registry has for an image, if the engine can tell us.
+        """
+        if not self.engine:
+            return
+        try:
+            return self.engine.distribution(image)
+        except (OSError, http.client.HTTPException, EngineError, KeyError) as e:
+            logger.debug(f"Cannot get the registry digest for {image}: {e}")
+
+    def is_current(self, image, info=None):
+        """
+        Determine if we have the image the registry has (by digest).
+
+        When the registry digest is not known (e.g., we are using the command
+        line, or are offline) an image we have is considered current.
+        """
+        info = info or self.inspect_image(image)
+        if not info:
+            return False
+        if "@" in image:
+            return True
+        digest = self.remote_digest(image)
+        return digest is None or any(x.endswith(f"@{digest}") for x in info["digests"])
+
+    def pull(self, image, policy=None, stream=True):
+        """
+        Pull an image, according to the pull policy.
+
+        always: pull every time
+        if-not-present: only pull an image we don't have
+        if-stale: pull if we haven't in pull_expire hours
+        never: never pull, and the image must be present
+
+        Without stream, command line output is not shown (e.g., when we pull
+        more than one image at once).
+        """
+        policy = policy or self._settings.get("pull_policy") or "always"
+        if policy not in defaults.pull_policies:
+            raise ValueError(
+                f"{policy} is not a valid pull policy, choose from {defaults.pull_policies}"
+            )
+
+        images = cache.ImageCache()
+        if policy != "always":
+            present = self.image_id(image)
+            if policy == "never" and not present:
+                raise ValueError(f"{image} is not present, and pull_policy is never.")
+            expire = self._settings.get("pull_expire", defaults.pull_expire)
+            if present and (
+                policy in ["never", "if-not-present"] or images.is_fresh(image, expire)
+            ):
+                logger.info(f"Using {image} present locally (pull_policy {policy})")
+                return
+
+        if self.engine:
+            self.pull_engine(image, stream)
+        else:
+            self.pull_command(image, stream)
+        images.save(image, self.image_id(image))
+
+    def pull_engine(self, image, stream=True):
+        """
+        Pull an image with the engine API.
+
+        We send credentials from the docker config, and the command line
+        can use credential helpers we can't, so a pull the registry refuses
+        is tried again with it.
+        """
+        logger.info(f"Pulling {image}")
+        try:
+            progress = self.engine.pull(image, auth=registry_auth(image))
+        except EngineError as e:
+            message = str(e).lower()
+            denied = e.status in [401, 403, 404] or any(
+                x in message for x in ["unauthorized", "denied", "authentication"]
+            )
+            if not self.cli or not denied:
+                raise ValueError(f"Issue pulling container: {e}")
+            logger.info(f"Pulling {image} with {self.name} ({e})")
+            return self.pull_command(image, stream)
+        size = utils.print_bytes(progress["bytes"])
+        logger.info(f"{progress['status']} ({progress['layers']} layers, {size})")
+
+    def pull_command(self, image, stream=True):
+        """
+        Pull an image with the command line client.
+        """
+        res = utils.run_command([self.cli, "pull", image], stream=stream)
+        if res["return_code"] != 0:
+            raise ValueError(
+                f"Issue pulling container, return code {res['return_code']}"
+            )
+
+    def list_containers(self):
+        """
+        List (json) containers with a playground label, running or not.
+        """
+        if self.engine:
+            return self.engine.containers(label="playground.tutorial")
+        cmd = [self.cli, "ps", "--all", "--filter", "label=playground.tutorial"]
+        res = utils.run_command(cmd + ["--format", "{{json .}}"])
+        if res["return_code"] != 0:
+            raise ValueError(f"Issue listing containers: {res['message']}")
+        return [json.loads(x) for x in res["message"].splitlines() if x.startswith("{")]
+
+    def instances(self):
+        """
+        List tutorial containers.
+        """
+        instances = []
+        for container in self.list_containers():
+            labels = self.get_labels(container)
+            name = container.get("Names")
+            if isinstance(name, list):
+                name = name[0]
+            instances.append(
+                {
+                    "name": labels.get("playground.tutorial") or name,
+                    "backend": self.name,
+                    "state": container.get("State") or container.get("Status"),
+                    "url": labels.get("playground.url"),
+                    "created": self.get_created(container),
+                }
+            )
+        return instances
+
+    def get_labels(self, container):
+        """
+        Labels for a listed container (the command line gives a string).
+        """
+        labels = container.get("Labels") or {}
+        if isinstance(labels, str):
+            labels = dict(x.split("=", 1) for x in labels.split(",") if "=" in x)
+        return labels
+
+    def host_capacity(self):
+        """
+        The cpus and memory (MB) of the host containers run on.
+        """
+        if self.engine:
+            try:
+                info = self.engine.info()
+                return {"cpus": info["NCPU"], "memory": info["MemTotal"] / 1048576}
+            except (OSError, http.client.HTTPException, EngineError, KeyError) as e:
+                logger.debug(f"Cannot get host capacity from the engine: {e}")
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        return {"cpus": os.cpu_count(), "memory": memory / 1048576}
+
+    def get_created(self, container):
+        """
+        Seconds since the epoch a container was created, if we can tell.
+        """
+        created = container.get("Created")
+        if isinstance(created, (int, float)):
+            return created
+
+        # e.g., 2023-04-01 10:20:30 -0600 MDT
+        try:
+            return datetime.strptime(
+                container["CreatedAt"][:25], "%Y-%m-%d %H:%M:%S %z"
+            ).timestamp()
+        except (KeyError, ValueError):
+            return None
+
     def deploy(self, tutorial, envars=None, **kwargs):
         """
         Deploy via a docker container (locally)
@@ -46,20 +283,147 @@ class DockerClient(Backend):
         headless = kwargs.get("headless", False) or False
         envars = envars or {}
 
-        # Right now always pull, in future can do check/skip
-        res = utils.run_command([self.cli, "pull", tutorial.container], stream=True)
-        if res["return_code"] != 0:
+        # An interactive container needs our terminal, and the command line
+        if not headless and not self.cli:
             raise ValueError(
-                f"Issue pulling container, return code {res['return_code']}"
+                f"An interactive deploy needs the '{self.name}' executable."
+            )
+        self.pull(tutorial.container, kwargs.get("pull_policy"))
+
+        # Labels let us find our containers (playground status) and the
+        # resources they have committed (admission)
+        url = self.format_url("127.0.0.1", tutorial.host_port, tutorial.container_https)
+        labels = {"playground.tutorial": tutorial.uid, "playground.url": url}
+        limits = tutorial.limits
+        for key, value in limits.items():
+            if value:
+                labels[f"playground.{key}"] = str(value)
+
+        # A headless container we wait for gets a health check if it has none
+        healthcheck = headless and self.get_healthcheck(tutorial)
+
+        admission = Admission(self, kwargs.get("admission"))
+        with admission.admit(tutorial, limits, hold=headless):
+            started = time.time()
+            if headless and self.engine:
+                res = self.run(tutorial, envars, labels, healthcheck)
+            else:
+                res = self.run_command(tutorial, envars, labels, headless, healthcheck)
+        # If running headless, wait for the container to be ready
+        if headless and res["return_code"] == 0:
+            container = res.get("id") or (res.get("message") or "").strip()
+            self.started[tutorial.uid] = (container or tutorial.uid, started)
+            res["url"] = self.show_ip_address(
+                "127.0.0.1", tutorial, wait=kwargs.get("wait", True)
             )
+        return res
+
+    def get_healthcheck(self, tutorial):
+        """
+        A health check for the exposed port, unless the image has its own.
+        """
+        if not tutorial.expose_port:
+            return
+        info = self.inspect_image(tutorial.container) or {}
+        test = (info.get("healthcheck") or {}).get("Test") or []
+        if test and test[0] != "NONE":
+            return
+        url = self.format_url(
+            "localhost", tutorial.container_port, tutorial.container_https
+        )
+        return {
+            "test": f"curl -fsk -o /dev/null {url} || "
+            f"wget -q -O /dev/null --no-check-certificate {url} || exit 1",
+            "interval": defaults.healthcheck_interval,
+            "timeout": defaults.healthcheck_interval * 2,
+            "start_period": 0,
+            "retries": 3,
+        }
 
-        # start to assemble command
+    def events_command(self, name, since=None, until=None):
+        """
+        The command to stream events for a container as json lines.
+        """
+        cmd = [self.cli, "events", "--filter", f"container={name}"]
+        cmd += ["--filter", "type=container", "--format", "{{json .}}"]
+        if since is not None:
+            cmd += ["--since", str(int(since))]
+        if until is not None:
+            cmd += ["--until", str(int(until))]
+        return cmd
+
+    def wait_until_ready(self, tutorial, url, timeout=None, spin=None):
+        """
+        Wait for a tutorial container to be ready, or fail if it exits first.
+
+        We watch the container's events, so it is ready as soon as its health
+        check passes, and an early exit is an error instead of a long wait.
+        The url is also checked (backing off between checks), for images
+        where the health check can't run (e.g., without curl or wget).
+        """
+        name, since = self.started.get(tutorial.uid, (tutorial.uid, None))
+        poller = readiness.Poller(url, tutorial.ready, timeout=timeout)
+        watcher = EventWatcher(self, name, since=since, until=poller.deadline).start()
+        try:
+            while True:
+                if watcher.state == "healthy" or poller.check():
+                    return True
+                if watcher.state == "died":
+                    raise ValueError(
+                        f"{tutorial.uid} exited (code {watcher.exit_code}) before it was ready."
+                    )
+                if poller.expired:
+                    logger.debug(f"{url} was not ready within {timeout} seconds")
+                    return False
+                poller.update(spin, f"{url} is {watcher.state or 'starting'}")
+                watcher.wait(poller.delay())
+        finally:
+            watcher.stop()
+
+    def run(self, tutorial, envars, labels, healthcheck=None):
+        """
+        Start a (headless) tutorial container with the engine API.
+        """
+        logger.info(f"Starting {tutorial.container} as {tutorial.uid}")
+        limits = tutorial.limits
+        try:
+            container = self.engine.run(
+                tutorial.uid,
+                tutorial.container,
+                ports=tutorial.container_ports,
+                envars=envars,
+                labels=labels,
+                cpus=limits["cpus"],
+                memory=limits["memory"] and utils.mb_to_bytes(limits["memory"]),
+                healthcheck=healthcheck,
+            )
+        except EngineError as e:
+            return {"message": str(e), "return_code": 1}
+        container.update({"message": container["id"], "return_code": 0})
+        return container
+
+    def run_command(self, tutorial, envars, labels, headless=False, healthcheck=None):
+        """
+        Start a tutorial container with the command line client.
+        """
         if headless:
             cmd = [self.cli, "run", "-d", "--rm", "--name", tutorial.uid]
         else:
             cmd = [self.cli, "run", "-it", "--rm", "--name", tutorial.uid]
+        for key, value in labels.items():
+            cmd += ["--label", f"{key}={value}"]
 
-        # Add ports and environment variables
+        # Add resource limits, ports and environment variables
+        limits = tutorial.limits
+        if limits["cpus"]:
+            cmd += ["--cpus", str(limits["cpus"])]
+        if limits["memory"]:
+            cmd += ["--memory", f"{int(limits['memory'])}m"]
+        if healthcheck:
+            cmd += ["--health-cmd", healthcheck["test"]]
+            cmd += ["--health-interval", f"{healthcheck['interval']}s"]
+            cmd += ["--health-timeout", f"{healthcheck['timeout']}s"]
+            cmd += ["--health-retries", str(healthcheck["retries"])]
         for port in tutorial.container_ports:
             cmd += ["-p", port]
         for key, val in envars.items():
@@ -68,9 +432,4 @@ class DockerClient(Backend):
         # Add the remainder of the commands
         cmd += [tutorial.container]
         logger.info(" ".join(cmd))
-
-        # If running headless, wait for the url to be ready
-        res = utils.run_command(cmd, stream=not headless)
-        if headless:
-            self.show_ip_address("127.0.0.1", tutorial)
-        return res
+        return utils.run_command(cmd, stream=not headless)
@@ -0,0 +1,390 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import base64
+import http.client
+import json
+import os
+import socket
+import threading
+from urllib.parse import quote, urlencode
+
+import playground.defaults as defaults
+from playground.logger import logger
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    An HTTP connection over a Unix domain socket.
+    """
+
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self.sock = sock
+
+
+class EngineError(Exception):
+    """
+    An error response from the container engine.
+    """
+
+    def __init__(self, status, message):
+        self.status = status
+        super().__init__(f"{status}: {message}")
+
+
+def get_registry(image):
+    """
+    The registry an image is pulled from (docker.io without one).
+    """
+    first = image.split("/", 1)[0]
+    if "/" in image and ("." in first or ":" in first or first == "localhost"):
+        return first
+    return "docker.io"
+
+
+def registry_auth(image, path=None):
+    """
+    Get an X-Registry-Auth header for an image from the docker config.
+
+    Only credentials stored in the config (docker login without a credential
+    helper) can be read, and otherwise we return None.
+    """
+    if path is None:
+        config_dir = os.environ.get("DOCKER_CONFIG") or os.path.expanduser("~/.docker")
+        path = os.path.join(config_dir, "config.json")
+    try:
+        with open(path, "r") as fd:
+            auths = json.load(fd).get("auths") or {}
+    except (OSError, ValueError):
+        return
+
+    registry = get_registry(image)
+    names = [registry]
+    if registry == "docker.io":
+        names += ["index.docker.io", "registry-1.docker.io"]
+    for key, value in auths.items():
+        host = key.split("://", 1)[-1].split("/", 1)[0]
+        if host not in names or not (value or {}).get("auth"):
+            continue
+        try:
+            username, password = (
+                base64.b64decode(value["auth"]).decode("utf-8").split(":", 1)
+            )
+        except ValueError:
+            continue
+        auth = {"username": username, "password": password, "serveraddress": key}
+        return base64.urlsafe_b64encode(json.dumps(auth).encode("utf-8")).decode(
+            "utf-8"
+        )
+
+
+class Engine:
+    """
+    A client for the Docker Engine API (also served by podman) on a socket.
+
+    We keep one connection open and reuse it for each request, and return
+    parsed (json) responses instead of command output. A request that the
+    engine doesn't answer within the timeout raises socket.timeout (an
+    OSError), but once a stream (a pull or events) has started it can take
+    as long as it needs.
+    """
+
+    def __init__(self, path, timeout=None):
+        self.path = path
+        self.timeout = timeout or defaults.engine_timeout
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def __str__(self):
+        return f"[playground-engine:{self.path}]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def find(cls, paths):
+        """
+        Get an engine for the first socket that answers a ping, if any.
+        """
+        for path in paths:
+            if not path or not os.path.exists(path):
+                continue
+            engine = cls(path)
+            try:
+                engine.ping()
+            except (OSError, http.client.HTTPException, EngineError) as e:
+                logger.debug(f"Container engine at {path} is not available: {e}")
+                engine.close()
+                continue
+            return engine
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def abort(self):
+        """
+        Interrupt a request (e.g., a stream of events) from another thread.
+        """
+        connection = self.connection
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def request(
+        self,
+        method,
+        path,
+        params=None,
+        body=None,
+        stream=None,
+        headers=None,
+        timeout=None,
+    ):
+        """
+        Make a request, returning the status and parsed response.
+
+        A streamed (json lines) response is passed line by line to stream.
+        """
+        timeout = timeout or self.timeout
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        headers = dict(headers or {})
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        with self.lock:
+            # A connection the engine closed is opened again, once
+            for attempt in range(2):
+                if self.connection is None:
+                    self.connection = UnixHTTPConnection(self.path, timeout)
+                self.connection.timeout = timeout
+                if self.connection.sock is not None:
+                    self.connection.sock.settimeout(timeout)
+                try:
+                    self.connection.request(method, path, body=body, headers=headers)
+                    sock = self.connection.sock
+                    response = self.connection.getresponse()
+                    break
+                except socket.timeout:
+                    # An engine that doesn't answer won't when we ask again
+                    self.close()
+                    raise
+                except (OSError, http.client.HTTPException):
+                    self.close()
+                    if attempt:
+                        raise
+
+            try:
+                if stream is not None and response.status < 400:
+                    sock.settimeout(None)
+                    for line in response:
+                        if line.strip():
+                            stream(json.loads(line))
+                    response.read()
+                    return response.status, None
+                content = response.read()
+            except Exception:
+                # The rest of the response is unread, so we can't reuse it
+                self.close()
+                raise
+
+        data = None
+        if content:
+            try:
+                data = json.loads(content)
+            except ValueError:
+                data = content.decode("utf-8", errors="replace")
+        if response.status >= 400:
+            message = data.get("message") if isinstance(data, dict) else data
+            raise EngineError(response.status, message)
+        return response.status, data
+
+    def ping(self):
+        return self.request("GET", "/_ping")[1]
+
+    def inspect_image(self, image):
+        """
+        Get metadata for a local image, or None if we don't have it.
+        """
+        try:
+            path = f"/images/{quote(image, safe='/:@')}/json"
+            return self.request("GET", path)[1]
+        except EngineError as e:
+            if e.status == 404:
+                return
+            raise
+
+    def image_id(self, image):
+        """
+        Get the id of a local image, or None if we don't have it.
+        """
+        data = self.inspect_image(image)
+        return data and data["Id"]
+
+    def distribution(self, image):
+        """
+        Get the digest the registry has for an image (without pulling it).
+        """
+        path = f"/distribution/{quote(image, safe='/:@')}/json"
+        return self.request("GET", path)[1]["Descriptor"]["digest"]
+
+    def pull(self, image, auth=None):
+        """
+        Pull an image, returning a summary of the progress we were sent.
+
+        The tag can be a digest (e.g., repo@sha256:...), and auth is an
+        encoded X-Registry-Auth header for a private registry.
+        """
+        name, tag = image, "latest"
+        if "@" in image:
+            name, tag = image.split("@", 1)
+        elif ":" in image.rsplit("/", 1)[-1]:
+            name, tag = image.rsplit(":", 1)
+
+        progress = {"status": None, "layers": set(), "bytes": {}}
+
+        def update(event):
+            if "error" in event:
+                raise EngineError(500, event["error"])
+            progress["status"] = event.get("status", progress["status"])
+            if event.get("id") and "progressDetail" in event:
+                progress["layers"].add(event["id"])
+                total = event["progressDetail"].get("total")
+                if total:
+                    progress["bytes"][event["id"]] = total
+
+        self.request(
+            "POST",
+            "/images/create",
+            params={"fromImage": name, "tag": tag},
+            stream=update,
+            headers={"X-Registry-Auth": auth} if auth else None,
+        )
+        return {
+            "status": progress["status"],
+            "layers": len(progress["layers"]),
+            "bytes": sum(progress["bytes"].values()),
+        }
+
+    def info(self):
+        """
+        Get system information (e.g., NCPU and MemTotal) from the engine.
+        """
+        return self.request("GET", "/info")[1]
+
+    def events(self, callback, since=None, until=None, **filters):
+        """
+        Stream events (e.g., for a container) to a callback until until.
+        """
+        params = {"filters": json.dumps({k: [v] for k, v in filters.items()})}
+        if since is not None:
+            params["since"] = str(int(since))
+        if until is not None:
+            params["until"] = str(int(until))
+        self.request("GET", "/events", params=params, stream=callback)
+
+    def run(
+        self,
+        name,
+        image,
+        ports=None,
+        envars=None,
+        labels=None,
+        cpus=None,
+        memory=None,
+        healthcheck=None,
+    ):
+        """
+        Create and start a container (removed when it stops).
+
+        Ports are host:container strings, as in a tutorial, and the container
+        can be limited to cpus and memory (bytes). A healthcheck has a shell
+        command (test) and an interval, timeout and start_period in seconds.
+        """
+        exposed = {}
+        bindings = {}
+        for port in ports or []:
+            host, container = port.split(":", 1)
+            exposed[f"{container}/tcp"] = {}
+            bindings.setdefault(f"{container}/tcp", []).append({"HostPort": host})
+        config = {
+            "Image": image,
+            "Env": [f"{key}={value}" for key, value in (envars or {}).items()],
+            "Labels": labels or {},
+            "ExposedPorts": exposed,
+            "HostConfig": {"PortBindings": bindings, "AutoRemove": True},
+        }
+        if cpus:
+            config["HostConfig"]["NanoCpus"] = int(cpus * 1e9)
+        if memory:
+            config["HostConfig"]["Memory"] = int(memory)
+        if healthcheck:
+            config["Healthcheck"] = {
+                "Test": ["CMD-SHELL", healthcheck["test"]],
+                "Interval": int(healthcheck["interval"] * 1e9),
+                "Timeout": int(healthcheck["timeout"] * 1e9),
+                "StartPeriod": int(healthcheck["start_period"] * 1e9),
+                "Retries": healthcheck["retries"],
+            }
+        container = self.request(
+            "POST",
+            "/containers/create",
+            params={"name": name},
+            body=config,
+            timeout=defaults.engine_container_timeout,
+        )[1]
+
+        # A container that doesn't start (e.g., its host port is taken) is not
+        # removed automatically, and would keep its name from the next deploy
+        try:
+            self.request(
+                "POST",
+                f"/containers/{container['Id']}/start",
+                timeout=defaults.engine_container_timeout,
+            )
+        except EngineError:
+            try:
+                self.remove(container["Id"])
+            except EngineError as e:
+                logger.warning(f"Issue removing container {name}: {e}")
+            raise
+        return {"id": container["Id"], "ports": bindings}
+
+    def remove(self, name):
+        """
+        Remove a container, running or not.
+        """
+        path = f"/containers/{quote(name, safe='')}"
+        return self.request(
+            "DELETE",
+            path,
+            params={"force": "true"},
+            timeout=defaults.engine_container_timeout,
+        )[0]
+
+    def stop(self, name):
+        path = f"/containers/{quote(name, safe='')}/stop"
+        return self.request("POST", path, timeout=defaults.engine_container_timeout)[0]
+
+    def containers(self, label=None):
+        """
+        List containers (running or not), optionally with a label.
+        """
+        params = {"all": "true"}
+        if label:
+            params["filters"] = json.dumps({"label": [label]})
+        return self.request("GET", "/containers/json", params=params)[1]
@@ -0,0 +1,143 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import http.client
+import json
+import subprocess
+import threading
+
+from playground.logger import logger
+
+from .engine import Engine, EngineError
+
+
+class Stop(Exception):
+    """
+    Raised by an event callback to end a stream.
+    """
+
+
+def parse_event(event):
+    """
+    Get the state (healthy, unhealthy, starting or died) and exit code (for
+    died) of a container event, or None if it doesn't change readiness.
+
+    Docker (and the engine API) give an Action like "health_status: healthy"
+    or "die", and the podman command line a Status of health_status or died.
+    """
+    action = event.get("Action") or event.get("status") or event.get("Status") or ""
+    if action.startswith("health_status"):
+        health = event.get("HealthStatus") or action.split(":", 1)[-1].strip()
+        return health or None, None
+    if action in ["die", "died"]:
+        attributes = (event.get("Actor") or {}).get("Attributes") or {}
+        code = event.get("ContainerExitCode", attributes.get("exitCode"))
+        return "died", code
+    return None, None
+
+
+class EventWatcher:
+    """
+    Watch a container's events (in a thread) for it turning healthy or dying.
+
+    With the engine API we stream events on a connection of our own, and
+    otherwise read them from the command line (docker or podman events).
+    Events since a time are included, so we don't miss a container that
+    died before we started watching.
+    """
+
+    def __init__(self, client, name, since=None, until=None):
+        self.client = client
+        self.name = name
+        self.since = since
+        self.until = until
+        self.state = None
+        self.exit_code = None
+        self.changed = threading.Event()
+        self.engine = None
+        self.process = None
+        self.stopped = False
+        self.thread = threading.Thread(target=self.watch, daemon=True)
+
+    def __str__(self):
+        return f"[playground-events:{self.name}]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def update(self, event):
+        """
+        Record a container event, ending the stream when it is final.
+        """
+        state, code = parse_event(event)
+        if not state:
+            return
+        logger.debug(f"{self.name} is {state}")
+        self.state = state
+        self.exit_code = code
+        self.changed.set()
+        if state in ["healthy", "died"]:
+            raise Stop()
+
+    def watch(self):
+        try:
+            if self.client.engine:
+                self.engine = Engine(self.client.engine.path)
+                self.engine.events(
+                    self.update,
+                    since=self.since,
+                    until=self.until,
+                    container=self.name,
+                    type="container",
+                )
+            elif self.client.cli:
+                self.watch_command()
+        except Stop:
+            pass
+        except (OSError, ValueError, http.client.HTTPException, EngineError) as e:
+            if not self.stopped:
+                logger.debug(f"Stopped watching events for {self.name}: {e}")
+        finally:
+            if self.engine is not None:
+                self.engine.close()
+
+    def watch_command(self):
+        """
+        Read events from the command line, one json object per line.
+        """
+        cmd = self.client.events_command(self.name, self.since, self.until)
+        self.process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        try:
+            for line in self.process.stdout:
+                if line.strip().startswith("{"):
+                    self.update(json.loads(line))
+        finally:
+            if self.process.poll() is None:
+                self.process.terminate()
+            self.process.wait()
+
+    def wait(self, timeout):
+        """
+        Wait up to timeout seconds for a state change, returning the state.
+        """
+        self.changed.wait(timeout)
+        self.changed.clear()
+        return self.state
+
+    def stop(self):
+        """
+        Stop watching (the stream or command is interrupted).
+        """
+        self.stopped = True
+        if self.engine is not None:
+            self.engine.abort()
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
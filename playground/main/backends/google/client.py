@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: (MIT)
 
 import time
+from datetime import datetime
 
 from cloud_select.main.selectors import InstanceSelector
 
@@ -73,10 +74,55 @@ class GoogleCloud(Backend):
         List running GCP instances.
         """
         request = self.compute_cli.instances().list(
-            project=self.project, zone=self.zone
+            project=self.project, zone=self.settings.get("zone") or self.zone
         )
         return self._retry_request(request)
 
+    def get_labels(self, tutorial):
+        """
+        Labels for a tutorial instance.
+        """
+        labels = {
+            "playground-tutorial": tutorial.slug,
+            "playground-user": tutorial.user.lower(),
+            "playground-https": str(tutorial.container_https).lower(),
+        }
+        if tutorial.expose_port:
+            labels["playground-port"] = str(tutorial.expose_port)
+        return labels
+
+    def instances(self):
+        """
+        List tutorial instances (labeled with playground-tutorial)
+
+        Instances are named by the tutorial slug, and we list them by the
+        uid (with the user that deployed them) as the other backends do.
+        """
+        instances = []
+        for item in self.list_instances().get("items", []):
+            labels = item.get("labels") or {}
+            if "playground-tutorial" not in labels:
+                continue
+            access = item["networkInterfaces"][0].get("accessConfigs") or [{}]
+            url = None
+            if access[0].get("natIP"):
+                url = self.format_url(
+                    access[0]["natIP"],
+                    labels.get("playground-port"),
+                    labels.get("playground-https", "true") == "true",
+                )
+            created = datetime.fromisoformat(item["creationTimestamp"])
+            instances.append(
+                {
+                    "name": labels.get("playground-user", "") + item["name"],
+                    "backend": self.name,
+                    "state": item["status"],
+                    "url": url,
+                    "created": created.timestamp(),
+                }
+            )
+        return instances
+
     def firewall_exists(self, name):
         """
         Determine if a firewall exists.
@@ -252,6 +298,8 @@ class GoogleCloud(Backend):
             "machineType": f"projects/{self.project}/zones/{zone}/machineTypes/{instance}",
             "name": tutorial.slug,
             "canIpForward": True,
+            # Labels let us find our instances later (playground status)
+            "labels": self.get_labels(tutorial),
             # We add the firewall name here so it appears as a network tag
             "tags": {"items": ["http-server", "https-server", tutorial.slug]},
             "disks": [
@@ -286,7 +334,8 @@ class GoogleCloud(Backend):
             url = response["networkInterfaces"][0]["accessConfigs"][0]["natIP"]
 
         # If we have two default ports, assume there
-        self.show_ip_address(url, tutorial)
+        url = self.show_ip_address(url, tutorial, wait=kwargs.get("wait", True))
+        return {"url": url}
 
     def _retry_request(self, request, timeout=2, attempts=3):
         """
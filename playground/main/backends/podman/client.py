@@ -3,6 +3,10 @@
 #
 # SPDX-License-Identifier: (MIT)
 
+import json
+import os
+
+import playground.utils as utils
 from playground.main.backends.docker import DockerClient
 
 
@@ -12,3 +16,46 @@ class PodmanClient(DockerClient):
     """
 
     name = "podman"
+
+    # The rootless socket (podman system service) and then the system one
+    host_envar = "CONTAINER_HOST"
+    sockets = ["/run/podman/podman.sock"]
+
+    def get_sockets(self):
+        """
+        Paths where the engine API might be listening.
+        """
+        sockets = []
+        host = os.environ.get(self.host_envar) or ""
+        if host.startswith("unix://"):
+            sockets.append(host[len("unix://") :])
+
+        # The rootless socket is only where we expect it with a runtime directory
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        if runtime_dir:
+            sockets.append(os.path.join(runtime_dir, "podman", "podman.sock"))
+        return sockets + self.sockets
+
+    def events_command(self, name, since=None, until=None):
+        """
+        The command to stream events for a container as json lines.
+        """
+        cmd = [self.cli, "events", "--filter", f"container={name}"]
+        cmd += ["--filter", "type=container", "--format", "json"]
+        if since is not None:
+            cmd += ["--since", str(int(since))]
+        if until is not None:
+            cmd += ["--until", str(int(until))]
+        return cmd
+
+    def list_containers(self):
+        """
+        List (json) containers with a playground label, running or not.
+        """
+        if self.engine:
+            return self.engine.containers(label="playground.tutorial")
+        cmd = [self.cli, "ps", "--all", "--filter", "label=playground.tutorial"]
+        res = utils.run_command(cmd + ["--format", "json"])
+        if res["return_code"] != 0:
+            raise ValueError(f"Issue listing containers: {res['message']}")
+        return json.loads(res["message"] or "[]")
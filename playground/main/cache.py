@@ -0,0 +1,477 @@
+# Copyright 2022-2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import atexit
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+import requests
+
+import playground.defaults as defaults
+import playground.main.session as session
+import playground.utils as utils
+from playground.logger import logger
+from playground.version import __version__ as version
+
+# Background refreshes still running when the process exits
+refreshes = []
+refreshes_lock = threading.Lock()
+
+
+@atexit.register
+def finish_refreshes():
+    """
+    Give background refreshes a short chance to finish before exit.
+
+    We wait at most cache_refresh_exit seconds for all of them. A refresh
+    still running is a daemon thread that ends with us, and since the cache
+    is only written (atomically) when one completes, the entry stays stale
+    for the next command to refresh.
+    """
+    deadline = time.time() + defaults.cache_refresh_exit
+    for thread in list(refreshes):
+        thread.join(timeout=max(0, deadline - time.time()))
+
+
+def write_atomic(content, filename, mode="w"):
+    """
+    Write content to a temporary file and move it into place.
+
+    Concurrent readers will either see the old or the new file, never half.
+    """
+    dirname = os.path.dirname(filename)
+    utils.mkdir_p(dirname)
+    fd, tmpfile = tempfile.mkstemp(dir=dirname, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, mode) as filey:
+            filey.write(content)
+        os.replace(tmpfile, filename)
+    except Exception:
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+        raise
+    return filename
+
+
+class MetadataCache:
+    """
+    An on-disk cache of remote repository metadata (tutorials.json).
+
+    Each entry is keyed by repository and stores the response body along
+    with the ETag and Last-Modified headers so we can ask the server if the
+    catalog changed (a conditional GET) instead of downloading it again.
+    Within cache_expire (hours) we don't go to the network at all.
+
+    When offline, we only use the cache. With stale_while_revalidate, an
+    expired entry is returned right away and refreshed in the background
+    for the next invocation. If the network is not reachable (or the server
+    has an error) we also fall back to a stale entry when we have one.
+    """
+
+    def __init__(
+        self, cache_dir=None, expire=None, offline=False, stale_while_revalidate=False
+    ):
+        self.cache_dir = cache_dir or defaults.cache_dir
+        self.expire = defaults.cache_expire if expire is None else expire
+        self.offline = offline
+        self.stale_while_revalidate = stale_while_revalidate
+
+    def __str__(self):
+        return "[playground-metadata-cache]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def path(self, name):
+        """
+        Get the cache file for a named repository (e.g., org/repo)
+        """
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(
+            self.cache_dir, "repos", f"{utils.slugify(name)}-{digest}.json"
+        )
+
+    def entries(self):
+        """
+        Yield the path and modified time of each cache entry.
+        """
+        dirname = os.path.join(self.cache_dir, "repos")
+        if not os.path.exists(dirname):
+            return
+        for filename in sorted(os.listdir(dirname)):
+            if not filename.endswith(".json") or filename.startswith("."):
+                continue
+            path = os.path.join(dirname, filename)
+            yield path, os.stat(path).st_mtime
+
+    def load(self, name):
+        """
+        Load a cache entry, returning None if missing or unreadable.
+        """
+        path = self.path(name)
+        if not os.path.exists(path):
+            return
+        try:
+            return utils.read_json(path)
+        except Exception as e:
+            logger.debug(f"Cache entry {path} is not readable, ignoring: {e}")
+
+    def save(self, name, entry):
+        """
+        Save a cache entry. A failure to write is not fatal.
+        """
+        try:
+            write_atomic(json.dumps(entry), self.path(name))
+        except Exception as e:
+            logger.debug(f"Unable to write cache entry for {name}: {e}")
+        return entry
+
+    def is_fresh(self, entry):
+        """
+        An entry is fresh if it was checked within the expiration (in hours)
+        """
+        return (time.time() - entry.get("checked", 0)) < self.expire * 3600
+
+    def headers(self, entry):
+        """
+        Conditional request headers to revalidate an entry.
+        """
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get(self, name, url):
+        """
+        Get metadata for a repository, only going to the network when needed.
+        """
+        body = self.get_body(name, url)
+        if body is not None:
+            return json.loads(body)
+
+    def get_body(self, name, url):
+        """
+        Get the (unparsed) metadata body for a repository.
+        """
+        entry = self.load(name)
+        if self.offline:
+            if not entry:
+                logger.warning(
+                    f"There is no cached metadata for {name} to use offline."
+                )
+                return
+            logger.debug(f"Offline, using cached metadata for {name}")
+            return entry["body"]
+
+        if entry and self.is_fresh(entry):
+            logger.debug(f"Using cached metadata for {name}")
+            return entry["body"]
+
+        # Serve the stale entry now, and refresh it for next time
+        if entry and self.stale_while_revalidate:
+            logger.debug(f"Using stale metadata for {name}, refreshing in background")
+            thread = threading.Thread(
+                target=self.refresh,
+                args=(name, url, entry),
+                kwargs={"timeout": defaults.cache_refresh_timeout},
+                daemon=True,
+            )
+            thread.start()
+
+            # A long running process (playground serve) only keeps those running
+            with refreshes_lock:
+                refreshes[:] = [x for x in refreshes if x.is_alive()]
+                refreshes.append(thread)
+            return entry["body"]
+
+        body = self.refresh(name, url, entry)
+        if body is None and entry:
+            logger.warning(f"Unable to update metadata for {name}, using cache.")
+            return entry["body"]
+        return body
+
+    def refresh(self, name, url, entry=None, timeout=None):
+        """
+        Revalidate (or retrieve) metadata from the server and update the cache.
+        """
+        try:
+            res = session.get(url, headers=self.headers(entry), timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Issue retrieving {url}: {e}")
+            return
+
+        # The catalog has not changed, renew the entry and use it
+        if res.status_code == 304 and entry:
+            logger.debug(f"Metadata for {name} has not changed, using cache")
+            entry["checked"] = time.time()
+            self.save(name, entry)
+            return entry["body"]
+
+        if res.status_code != 200:
+            logger.warning(res.text)
+            return
+
+        self.save(
+            name,
+            {
+                "name": name,
+                "url": url,
+                "body": res.text,
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified"),
+                "checked": time.time(),
+            },
+        )
+        return res.text
+
+
+class SnapshotCache:
+    """
+    Validated catalogs saved with pickle for fast loading.
+
+    There is one snapshot per repository, keyed by a hash of the content it
+    was created from and the playground version. A snapshot that matches
+    can be used as is, without parsing or schema validation.
+    """
+
+    format = 1
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir or defaults.cache_dir, "snapshots")
+
+    def __str__(self):
+        return "[playground-snapshot-cache]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def path(self, name):
+        """
+        Get the snapshot file for a named repository.
+        """
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.cache_dir, f"{utils.slugify(name)}-{digest}.pickle")
+
+    def key(self, content):
+        """
+        A key for content (bytes) and the version of playground reading it.
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        hasher = hashlib.sha256(f"{version}:{self.format}:".encode("utf-8"))
+        hasher.update(content)
+        return hasher.hexdigest()
+
+    def load(self, name, content):
+        """
+        Load a snapshot if it was created from the same content.
+        """
+        path = self.path(name)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "rb") as fd:
+                snapshot = pickle.load(fd)
+        except Exception as e:
+            logger.debug(f"Snapshot {path} is not readable, ignoring: {e}")
+            return
+        if snapshot.get("key") == self.key(content):
+            logger.debug(f"Using snapshot for {name}")
+            return snapshot["metadata"]
+
+    def save(self, name, content, metadata):
+        """
+        Save a snapshot of validated metadata. A failure to write is not fatal.
+        """
+        snapshot = {"key": self.key(content), "metadata": metadata}
+        try:
+            write_atomic(pickle.dumps(snapshot), self.path(name), mode="wb")
+        except Exception as e:
+            logger.debug(f"Unable to write snapshot for {name}: {e}")
+
+
+class DirectoryManifest:
+    """
+    A manifest of the tutorial files found under a local directory.
+
+    For each file we record the path, modified time, size and hash along
+    with the parsed (and validated) metadata, so a rescan only needs to
+    parse files that changed.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir or defaults.cache_dir, "directories")
+
+    def __str__(self):
+        return "[playground-directory-manifest]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def path(self, name):
+        """
+        Get the manifest file for a directory.
+        """
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+        basename = utils.slugify(os.path.basename(name.rstrip(os.sep)))
+        return os.path.join(self.cache_dir, f"{basename}-{digest}.json")
+
+    def load(self, name):
+        """
+        Load the manifest for a directory, empty if we don't have one.
+        """
+        path = self.path(name)
+        if not os.path.exists(path):
+            return {}
+        try:
+            manifest = utils.read_json(path)
+        except Exception as e:
+            logger.debug(f"Manifest {path} is not readable, ignoring: {e}")
+            return {}
+        if manifest.get("version") != version:
+            return {}
+        return manifest.get("files", {})
+
+    def save(self, name, files):
+        """
+        Save the manifest for a directory. A failure to write is not fatal.
+        """
+        manifest = {"version": version, "files": files}
+        try:
+            write_atomic(json.dumps(manifest), self.path(name))
+        except Exception as e:
+            logger.debug(f"Unable to write manifest for {name}: {e}")
+
+
+class SettingsCache:
+    """
+    Merged and validated settings, saved with pickle.
+
+    The cache is keyed by the path, modified time and size of each settings
+    file and the playground version, so an unchanged configuration can be
+    loaded without parsing or validation.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir or defaults.cache_dir, "settings")
+
+    def __str__(self):
+        return "[playground-settings-cache]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def path(self, filenames):
+        """
+        Get the cache file for a set of settings files.
+        """
+        paths = "|".join(os.path.abspath(x) for x in filenames)
+        digest = hashlib.sha256(paths.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"settings-{digest}.pickle")
+
+    def key(self, filenames):
+        """
+        A key for the current state of the settings files.
+        """
+        parts = [version]
+        for filename in filenames:
+            stat = os.stat(filename)
+            parts.append(
+                f"{os.path.abspath(filename)}:{stat.st_mtime_ns}:{stat.st_size}"
+            )
+        return "|".join(parts)
+
+    def load(self, filenames):
+        """
+        Load settings if the files have not changed since they were cached.
+        """
+        path = self.path(filenames)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "rb") as fd:
+                cached = pickle.load(fd)
+            if cached.get("key") == self.key(filenames):
+                return cached["settings"]
+        except Exception as e:
+            logger.debug(f"Settings cache {path} is not readable, ignoring: {e}")
+
+    def save(self, filenames, settings):
+        """
+        Save validated settings. A failure to write is not fatal.
+        """
+        try:
+            cached = {"key": self.key(filenames), "settings": settings}
+            write_atomic(pickle.dumps(cached), self.path(filenames), mode="wb")
+        except Exception as e:
+            logger.debug(f"Unable to write settings cache: {e}")
+
+
+class ImageCache:
+    """
+    A record of container images we have pulled, for pull policies.
+
+    For each image we keep the local image id (digest) and when we last
+    checked it with the registry (pulled), in one json file.
+    """
+
+    lock = threading.Lock()
+
+    def __init__(self, cache_dir=None):
+        self.path = os.path.join(cache_dir or defaults.cache_dir, "images.json")
+
+    def __str__(self):
+        return "[playground-image-cache]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def load(self):
+        """
+        Load all image records, empty if we don't have any.
+        """
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            return utils.read_json(self.path)
+        except Exception as e:
+            logger.debug(f"Image cache {self.path} is not readable, ignoring: {e}")
+            return {}
+
+    def get(self, image):
+        """
+        Get the record for an image.
+        """
+        return self.load().get(image)
+
+    def save(self, image, digest):
+        """
+        Record that an image was just pulled. A failure to write is not fatal.
+        """
+        with self.lock:
+            images = self.load()
+            images[image] = {"digest": digest, "checked": time.time()}
+            try:
+                write_atomic(json.dumps(images, indent=4), self.path)
+            except Exception as e:
+                logger.debug(f"Unable to write image cache: {e}")
+
+    def is_fresh(self, image, expire):
+        """
+        An image is fresh if it was checked within the expiration (in hours)
+        """
+        record = self.get(image)
+        if not record:
+            return False
+        return (time.time() - record.get("checked", 0)) < expire * 3600
@@ -3,13 +3,20 @@
 #
 # SPDX-License-Identifier: (MIT)
 
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
-
+import playground.defaults as defaults
 import playground.main.backends as backends
+import playground.main.cache as cache
 import playground.main.decorators as decorators
+import playground.main.ports as ports
 import playground.main.repository as repository
+import playground.main.schemas as schemas
+import playground.main.search as search
+import playground.main.session as session
+import playground.utils as utils
 from playground.logger import logger
 
 from .settings import Settings
@@ -17,17 +24,19 @@ from .settings import Settings
 
 class Playground:
     """
-    A playground is a tutorial repository + backend
+    A playground is a tutorial repository (or several) + backend
     """
 
     def __init__(self, repo=None, backend="docker", **kwargs):
         validate = kwargs.get("validate", True)
         self.quiet = kwargs.get("quiet", False)
+        self.offline = kwargs.get("offline", False)
         self.settings = Settings(kwargs.get("settings_file"), validate)
         self.repo = None
         if repo is not None:
-            self.repo = repository.Repository(repo)
-        self.backend = backends.get_backend(backend)
+            self.load(repo, workers=kwargs.get("workers"))
+        self.backend_name = backend
+        self._clients = {}
 
     def __repr__(self):
         return str(self)
@@ -35,6 +44,34 @@ class Playground:
     def __str__(self):
         return "[playground-client]"
 
+    @property
+    def backend(self):
+        """
+        The backend class, imported the first time it is needed.
+        """
+        backend = backends.get_backend(self.backend_name)
+        if self.backend_name and not backend:
+            raise ValueError(f"{self.backend_name} is not a known backend.")
+        return backend
+
+    @property
+    def client(self):
+        """
+        The backend client, created once and reused for later commands.
+        """
+        return self.get_client(self.backend_name)
+
+    def get_client(self, name):
+        """
+        Get a client for a named backend, created once and reused.
+        """
+        if name not in self._clients:
+            backend = backends.get_backend(name)
+            if not backend:
+                raise ValueError(f"{name} is not a known backend.")
+            self._clients[name] = backend(settings=self.settings)
+        return self._clients[name]
+
     @decorators.repository
     def list(self):
         """
@@ -43,17 +80,74 @@ class Playground:
         for tutorial in self.repo.tutorials:
             print("🍓 %s\n" % tutorial.name)
 
-    def load(self, repo):
+    @property
+    def cache(self):
         """
-        Load a repository
+        The metadata cache to use when loading repositories.
         """
-        self.repo = repository.Repository(repo)
+        return cache.MetadataCache(
+            offline=self.offline,
+            stale_while_revalidate=self.settings.stale_while_revalidate,
+        )
+
+    def load(self, repo, workers=None):
+        """
+        Load a repository, or a list of repositories (fetched concurrently)
+        """
+        if isinstance(repo, (list, tuple)) and len(repo) == 1:
+            repo = repo[0]
+        if isinstance(repo, (list, tuple)):
+            self.repo = repository.Repositories(repo, workers=workers, cache=self.cache)
+        else:
+            self.repo = repository.Repository(repo, cache=self.cache)
+
+    def search(self, query):
+        """
+        Search tutorials in cached repository metadata (no network).
+        """
+        index = search.SearchIndex()
+        index.sync()
+        return index.search(query)
 
     def instances(self):
         """
         List running instances on the backend
         """
-        return self.backend.instances()
+        return self.client.instances()
+
+    def status(self, names=None):
+        """
+        List tutorial instances on many backends (settings.backends) at once.
+
+        Returns the instances, and the error for any backend we could not list.
+        """
+        names = list(names or self.settings.backends or [])
+        errors = {}
+
+        # Aliases (e.g., gcp and google) are only listed once
+        classes = {}
+        for name in names:
+            backend = backends.get_backend(name)
+            if not backend:
+                errors[name] = f"{name} is not a known backend."
+                continue
+            classes.setdefault(backend, name)
+
+        instances = []
+        if not classes:
+            return instances, errors
+        with ThreadPoolExecutor(max_workers=len(classes)) as executor:
+            futures = {
+                executor.submit(lambda x: self.get_client(x).instances(), name): name
+                for name in classes.values()
+            }
+            for future in as_completed(futures):
+                try:
+                    instances += future.result()
+                except Exception as e:
+                    errors[futures[future]] = str(e)
+        instances.sort(key=lambda x: (x["backend"], x["name"]))
+        return instances, errors
 
     @decorators.repository
     def test(self, name, sleep=5, http_code=200, **options):
@@ -70,7 +164,7 @@ class Playground:
         assert res["return_code"] == 0
         time.sleep(sleep)
         logger.c.print("Testing for successful HTTP response...", style="yellow")
-        response = requests.get("https://127.0.0.1:8000", verify=False)
+        response = session.get("https://127.0.0.1:8000", verify=False)
         assert response.status_code == http_code
         logger.c.print("Testing stop...", style="yellow")
         res = self.stop(name)
@@ -105,11 +199,16 @@ class Playground:
                     f"Environment variable {envar['name']} is required but not present. Add with --env"
                 )
 
-    def deploy(self, name, envars=None, **kwargs):
+    def deploy(self, name, envars=None, dry_run=False, count=None, **kwargs):
         """
         Deploy a playground
+
+        With dry_run, return what would be deployed without using the backend.
+        With a count of more than one, deploy that many instances (each named
+        and, for docker and podman, given host ports of its own) and return
+        the result for each, and their urls.
         """
-        if not self.backend:
+        if not self.backend_name:
             raise ValueError("A backend is required to deploy a tutorial to.")
         envars = envars or {}
         tutorial = self.get_tutorial(name)
@@ -117,7 +216,296 @@ class Playground:
             logger.error(f"There is no tutorial found named {name} for {self.repo}")
             return
         self.check_envars(tutorial, envars)
-        return self.backend(settings=self.settings).deploy(tutorial, envars, **kwargs)
+        if dry_run:
+            return self.plan(tutorial, envars, count=count, **kwargs)
+        if not count or count == 1:
+            return self.client.deploy(tutorial, envars, **kwargs)
+
+        wait = kwargs.pop("wait", True)
+        item = {"tutorial": name, "count": count, "envars": envars, "options": kwargs}
+        results = self.deploy_many([item], wait=wait)
+        return {
+            "tutorial": name,
+            "backend": self.backend_name,
+            "count": count,
+            "urls": [x["url"] for x in results if x["url"]],
+            "failed": len([x for x in results if x["status"] == "failed"]),
+            "instances": results,
+        }
+
+    def get_host_ports(self, tutorial):
+        """
+        Free host ports (by container port) for another instance of a tutorial.
+
+        Ports are reserved until they are given back to the allocator.
+        """
+        allocator = ports.get_allocator(self.settings.get("port_range"))
+        host_ports = {}
+        try:
+            for port in tutorial.container_ports:
+                host_ports[int(port.rsplit(":", 1)[1])] = allocator.allocate()
+        except ValueError:
+            allocator.release(*host_ports.values())
+            raise
+        return host_ports
+
+    def plan(self, tutorial, envars=None, count=None, **kwargs):
+        """
+        Describe a deploy of a tutorial, hiding environment variable values.
+        """
+        envars = envars or {}
+        return {
+            "backend": self.backend_name,
+            "tutorial": tutorial.name,
+            "title": tutorial.title,
+            "container": tutorial.container,
+            "ports": tutorial.container_ports,
+            "count": count or 1,
+            "envars": {key: len(value) * "*" for key, value in envars.items()},
+            "options": kwargs,
+        }
+
+    def deploy_manifest(self, filename, workers=None, wait=True):
+        """
+        Deploy the tutorials listed in a manifest file.
+
+        The manifest can set a repo and backend for all tutorials, and the
+        number to deploy at once (parallel).
+        """
+        manifest = utils.read_yaml(filename) or {}
+        schemas.validate(manifest, "manifest")
+        items = []
+        for item in manifest["tutorials"]:
+            item = dict(item)
+            for key in "repo", "backend":
+                if key in manifest:
+                    item.setdefault(key, manifest[key])
+            items.append(item)
+        workers = workers or manifest.get("parallel")
+        return self.deploy_many(items, workers=workers, wait=wait)
+
+    def deploy_many(self, items, workers=None, wait=True):
+        """
+        Deploy many tutorials, with at most workers deploying at once.
+
+        Each item names a tutorial, and can have a repo and backend (ours by
+        default), envars, deploy options and a count of instances. There is a
+        result for each instance, and one failing does not stop the others.
+        With wait, we also wait for all of them to be ready (one deadline).
+        """
+        workers = workers or defaults.deploy_workers
+        deadline = time.time() + defaults.deploy_timeout
+        playgrounds = {}
+        local = threading.local()
+        jobs = []
+        results = []
+
+        # Instances of a tutorial (across items) are numbered together, so two
+        # items for the same tutorial don't share a name or host ports
+        totals = {}
+        for item in items:
+            key = (item.get("repo"), item.get("backend") or self.backend_name)
+            name = (key, item["tutorial"])
+            totals[name] = totals.get(name, 0) + item.get("count", 1)
+        numbers = {}
+
+        for item in items:
+            key = (item.get("repo"), item.get("backend") or self.backend_name)
+            name = (key, item["tutorial"])
+            for _ in range(item.get("count", 1)):
+                result = {
+                    "tutorial": item["tutorial"],
+                    "repo": key[0] or str(self.repo),
+                    "backend": key[1],
+                    "name": None,
+                    "status": "failed",
+                    "url": None,
+                    "error": None,
+                }
+                results.append(result)
+                try:
+                    if key not in playgrounds:
+                        playgrounds[key] = self.get_playground(*key)
+                    playground = playgrounds[key]
+                    tutorial = playground.get_tutorial(item["tutorial"])
+                    if not tutorial:
+                        raise ValueError(f"There is no tutorial {item['tutorial']}")
+                    envars = item.get("envars") or {}
+                    playground.check_envars(tutorial, envars)
+                    if totals[name] > 1:
+                        # Instances on this host can't share host ports
+                        numbers[name] = numbers.get(name, 0) + 1
+                        host_ports = None
+                        if hasattr(playground.backend, "pull"):
+                            host_ports = playground.get_host_ports(tutorial)
+                        tutorial = tutorial.get_replica(numbers[name], host_ports)
+                except (Exception, SystemExit) as e:
+                    result["error"] = str(e)
+                    continue
+                result["name"] = tutorial.uid
+                jobs.append((key, playground, tutorial, envars, item, result))
+
+        def deploy(key, playground, tutorial, envars, item, result):
+            # Backend clients are not shared between threads
+            clients = local.__dict__.setdefault("clients", {})
+            if key not in clients:
+                clients[key] = playground.backend(settings=playground.settings)
+            client = clients[key]
+
+            options = dict(item.get("options") or {})
+            options["wait"] = False
+            if playground.backend_name in ["docker", "podman"]:
+                options["headless"] = True
+            try:
+                res = client.deploy(tutorial, envars, **options) or {}
+            finally:
+                # A started container has its ports, and a failed one doesn't need them
+                if tutorial.host_ports:
+                    allocator = ports.get_allocator(self.settings.get("port_range"))
+                    allocator.release(*tutorial.host_ports.values())
+            if res.get("return_code"):
+                raise ValueError(
+                    res.get("message") or f"return code {res['return_code']}"
+                )
+            result["url"] = res.get("url")
+            result["status"] = "deployed"
+            if wait and result["url"]:
+                remaining = max(0, deadline - time.time())
+                ready = client.wait_until_ready(
+                    tutorial, result["url"], timeout=remaining
+                )
+                result["status"] = "ready" if ready else "not ready"
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(deploy, *job): job[-1] for job in jobs}
+            for future in as_completed(futures):
+                result = futures[future]
+                try:
+                    future.result()
+                except (Exception, SystemExit) as e:
+                    result["error"] = str(e)
+                if result["error"]:
+                    logger.warning(f"{result['name']} failed: {result['error']}")
+                else:
+                    logger.info(f"{result['name']} is {result['status']}")
+        return results
+
+    def prefetch(self, names=None, workers=None, force=False):
+        """
+        Pull the containers for tutorials (all by default) ahead of a deploy.
+
+        An image shared by tutorials is pulled once, with at most workers
+        pulling at once. An image we already have (with the digest the
+        registry has, when the engine can tell us) is skipped unless force.
+        There is a result for each image, and progress is logged as they finish.
+        """
+        if not hasattr(self.backend, "pull"):
+            raise ValueError(
+                f"The {self.backend_name} backend does not pull containers, use docker or podman."
+            )
+        tutorials = self.get_tutorials()
+        if names:
+            # Short names are resolved, as they are for a deploy
+            found = {x: tutorials.get(x) for x in names}
+            missing = [x for x, tutorial in found.items() if tutorial is None]
+            if missing:
+                raise ValueError(f"There is no tutorial {', '.join(missing)}")
+            tutorials = list(found.values())
+
+        images = {}
+        for tutorial in tutorials:
+            if tutorial is None:
+                continue
+            image = tutorial.container
+            if image not in images:
+                images[image] = {
+                    "image": image,
+                    "tutorials": [],
+                    "status": "failed",
+                    "digest": None,
+                    "size": None,
+                    "seconds": None,
+                    "error": None,
+                }
+            images[image]["tutorials"].append(tutorial.name)
+
+        local = threading.local()
+
+        def prefetch(result):
+            # Each thread has a client (and engine connection) of its own
+            if not hasattr(local, "client"):
+                local.client = self.backend(settings=self.settings)
+            client = local.client
+            start = time.time()
+            info = client.inspect_image(result["image"])
+            if info and not force and client.is_current(result["image"], info):
+                result["status"] = "present"
+            else:
+                client.pull(result["image"], "always", stream=False)
+                info = client.inspect_image(result["image"]) or {}
+                result["status"] = "pulled"
+            result["digest"] = info.get("id")
+            result["size"] = info.get("size")
+            result["seconds"] = time.time() - start
+            return result
+
+        start = time.time()
+        pulled = 0
+        results = list(images.values())
+        workers = workers or defaults.prefetch_workers
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(prefetch, x): x for x in results}
+            for count, future in enumerate(as_completed(futures), start=1):
+                result = futures[future]
+                try:
+                    future.result()
+                except (Exception, SystemExit) as e:
+                    result["error"] = str(e)
+                progress = f"[{count}/{len(results)}] {result['image']}"
+                if result["error"]:
+                    logger.warning(f"{progress} failed: {result['error']}")
+                    continue
+                if result["status"] == "pulled":
+                    pulled += result["size"] or 0
+                rate = pulled / max(time.time() - start, 0.001)
+                logger.info(
+                    f"{progress} {result['status']} "
+                    f"({utils.print_bytes(pulled)} pulled, {utils.print_bytes(rate)}/s)"
+                )
+        return results
+
+    def get_pool(self, name, size=None, envars=None, ttl=None):
+        """
+        A warm pool of containers for a tutorial (started with fill).
+        """
+        from .pool import Pool
+
+        tutorial = self.get_tutorial(name)
+        if not tutorial:
+            raise ValueError(f"There is no tutorial {name}")
+        envars = envars or {}
+        self.check_envars(tutorial, envars)
+        return Pool(self, tutorial, size=size, envars=envars, ttl=ttl)
+
+    def get_playground(self, repo=None, backend=None):
+        """
+        A playground for another repository and backend, sharing our settings.
+        """
+        if not repo and backend == self.backend_name:
+            return self
+        playground = Playground(
+            backend=backend,
+            settings_file=self.settings.settings_file,
+            quiet=self.quiet,
+            offline=self.offline,
+            validate=False,
+        )
+        playground.settings = self.settings
+        playground.repo = self.repo
+        if repo:
+            playground.load(repo)
+        return playground
 
     def stop(self, name):
         """
@@ -129,4 +517,4 @@ class Playground:
         if not tutorial:
             logger.error(f"There is no tutorial found named {name} for {self.repo}")
             return
-        return self.backend(settings=self.settings).stop(tutorial)
+        return self.client.stop(tutorial)
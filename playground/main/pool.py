@@ -0,0 +1,259 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import itertools
+import threading
+import time
+
+import playground.defaults as defaults
+import playground.main.ports as ports
+from playground.logger import logger
+
+
+class Pool:
+    """
+    Containers for a tutorial, started ahead of time to hand out right away.
+
+    A pool keeps size containers ready, each with its own name and host
+    ports, and ready when it is healthy (or its url answers). Claiming one
+    hands it out and starts a replacement in the background. A ready
+    container that is not claimed within ttl seconds is stopped when the
+    pool is reaped (and not replaced until the next claim or fill) so an
+    unused pool winds down.
+    """
+
+    def __init__(self, playground, tutorial, size=None, envars=None, ttl=None):
+        if not hasattr(playground.backend, "pull"):
+            raise ValueError(
+                f"The {playground.backend_name} backend does not run containers here, use docker or podman."
+            )
+        self.playground = playground
+        self.tutorial = tutorial
+        self.size = size or defaults.pool_size
+        self.envars = envars or {}
+        self.ttl = ttl or defaults.pool_ttl
+        self.ports = ports.get_allocator(playground.settings.get("port_range"))
+        self.ready = []
+        self.claimed = {}
+        self.starting = 0
+        self.errors = []
+        self.pulled = False
+        self.closed = False
+        self.lock = threading.Lock()
+        self.pull_lock = threading.Lock()
+        self.local = threading.local()
+        self.counter = None
+
+    def __str__(self):
+        return f"[playground-pool:{self.tutorial.name}]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def client(self):
+        """
+        A backend client for the current thread.
+        """
+        if not hasattr(self.local, "client"):
+            self.local.client = self.playground.backend(
+                settings=self.playground.settings
+            )
+        return self.local.client
+
+    def start(self):
+        """
+        Start a container with its own name and host ports, and wait for it.
+        """
+        # The image is pulled once (with the pull policy) for the pool
+        with self.pull_lock:
+            if not self.pulled:
+                self.client.pull(self.tutorial.container)
+                self.pulled = True
+
+        host_ports = self.playground.get_host_ports(self.tutorial)
+        try:
+            tutorial = self.tutorial.get_replica(self.next_replica(), host_ports)
+            res = self.client.deploy(
+                tutorial, self.envars, headless=True, wait=False, pull_policy="never"
+            )
+            if res.get("return_code"):
+                raise ValueError(
+                    res.get("message") or f"return code {res['return_code']}"
+                )
+            ready = self.client.wait_until_ready(
+                tutorial, res["url"], timeout=defaults.pool_timeout
+            )
+            if not ready:
+                self.client.stop(tutorial)
+                raise ValueError(
+                    f"{tutorial.uid} was not ready within {defaults.pool_timeout} seconds"
+                )
+        except Exception:
+            self.ports.release(*host_ports.values())
+            raise
+        return {
+            "name": tutorial.uid,
+            "url": res["url"],
+            "ports": tutorial.container_ports,
+            "since": time.time(),
+            "tutorial": tutorial,
+        }
+
+    def next_replica(self):
+        """
+        A name for a container, after those of earlier pools for the tutorial
+        (e.g., claimed containers are left running when a pool is drained).
+        """
+        with self.lock:
+            if self.counter is None:
+                self.counter = itertools.count(self.last_replica() + 1)
+            return f"pool-{next(self.counter)}"
+
+    def last_replica(self):
+        """
+        The highest number of a pool container for the tutorial that exists.
+        """
+        prefix = f"{self.tutorial.uid}-pool-"
+        try:
+            instances = self.client.instances()
+        except (NotImplementedError, ValueError) as e:
+            logger.debug(f"Cannot list containers for {self}: {e}")
+            return 0
+        numbers = [0]
+        for instance in instances:
+            name = instance.get("name") or ""
+            if name.startswith(prefix) and name[len(prefix) :].isdigit():
+                numbers.append(int(name[len(prefix) :]))
+        return max(numbers)
+
+    def add(self):
+        """
+        Start a container and add it to the pool (run in a thread by fill).
+        """
+        item = None
+        try:
+            item = self.start()
+            logger.debug(f"{item['name']} is ready in the pool at {item['url']}")
+        except (Exception, SystemExit) as e:
+            logger.warning(f"Issue starting a container for {self}: {e}")
+            with self.lock:
+                self.errors = (self.errors + [str(e)])[-5:]
+        with self.lock:
+            self.starting -= 1
+            if item and not self.closed:
+                self.ready.append(item)
+                return
+
+        # A container that was ready after the pool was drained is not needed
+        if item:
+            self.remove(item)
+
+    def fill(self, wait=True):
+        """
+        Start containers until the pool has size ready (or starting).
+        """
+        with self.lock:
+            self.closed = False
+            needed = max(0, self.size - len(self.ready) - self.starting)
+            self.starting += needed
+        threads = [
+            threading.Thread(target=self.add, daemon=True) for _ in range(needed)
+        ]
+        for thread in threads:
+            thread.start()
+        if wait:
+            for thread in threads:
+                thread.join()
+        return self.status()
+
+    def is_healthy(self, item):
+        """
+        Determine if a ready container is still ready at its url.
+        """
+        return self.client.is_available(item["url"], item["tutorial"].ready)
+
+    def claim(self):
+        """
+        Hand out a ready container (or None if none are ready) and refill.
+        """
+        while True:
+            with self.lock:
+                item = self.ready.pop(0) if self.ready else None
+            if item is None or self.is_healthy(item):
+                break
+            logger.warning(f"{item['name']} in {self} is not healthy, removing it.")
+            self.remove(item)
+
+        if item is not None:
+            item["since"] = time.time()
+            with self.lock:
+                self.claimed[item["name"]] = item
+        self.fill(wait=False)
+        return item and self.describe(item)
+
+    def remove(self, item):
+        """
+        Stop a container, and give back its ports.
+        """
+        try:
+            self.client.stop(item["tutorial"])
+        except Exception as e:
+            logger.warning(f"Issue stopping {item['name']}: {e}")
+        self.ports.release(*item["tutorial"].host_ports.values())
+
+    def release(self, name):
+        """
+        Stop a claimed container that is no longer needed.
+        """
+        with self.lock:
+            item = self.claimed.pop(name, None)
+        if item is None:
+            raise ValueError(f"{name} is not a claimed container in {self}")
+        self.remove(item)
+        return self.describe(item)
+
+    def reap(self):
+        """
+        Stop ready containers that have not been claimed within the ttl.
+        """
+        now = time.time()
+        with self.lock:
+            idle = [x for x in self.ready if now - x["since"] > self.ttl]
+            self.ready = [x for x in self.ready if x not in idle]
+        for item in idle:
+            logger.info(f"Stopping {item['name']}, unclaimed for {self.ttl} seconds")
+            self.remove(item)
+        return [x["name"] for x in idle]
+
+    def drain(self):
+        """
+        Stop all ready containers, and any still starting when they are ready.
+        Claimed containers are left running.
+        """
+        with self.lock:
+            self.closed = True
+            items, self.ready = self.ready, []
+        for item in items:
+            self.remove(item)
+        return [x["name"] for x in items]
+
+    def describe(self, item):
+        return {key: item[key] for key in ["name", "url", "ports", "since"]}
+
+    def status(self):
+        """
+        Describe the pool.
+        """
+        with self.lock:
+            return {
+                "tutorial": self.tutorial.name,
+                "size": self.size,
+                "ttl": self.ttl,
+                "starting": self.starting,
+                "ready": [self.describe(x) for x in self.ready],
+                "claimed": [self.describe(x) for x in self.claimed.values()],
+                "errors": list(self.errors),
+            }
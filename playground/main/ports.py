@@ -0,0 +1,125 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import playground.defaults as defaults
+import playground.utils as utils
+
+# Allocators (by port range) are shared by the process
+allocators = {}
+lock = threading.Lock()
+
+
+def is_free(port):
+    """
+    Determine if a host port is free, by binding to it.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(("", port))
+        except OSError:
+            return False
+    return True
+
+
+class PortAllocator:
+    """
+    Hand out free host ports from a range.
+
+    A port is free if we can bind to it, but a container that was just given
+    a port might not have bound to it yet. So a port we hand out is reserved
+    (for this process) until it is released, and recorded in a file shared
+    with other playground processes (under a file lock) which skip it for
+    port_reserve seconds, enough time for its container to start.
+    """
+
+    def __init__(self, start=None, end=None, path=None):
+        self.start = int(start or defaults.port_range[0])
+        self.end = int(end or defaults.port_range[1])
+        if self.start > self.end:
+            raise ValueError(f"Port range {self.start}-{self.end} is empty.")
+        self.path = path or os.path.join(defaults.cache_dir, "ports.json")
+        self.reserved = set()
+        self.lock = threading.Lock()
+
+    def __str__(self):
+        return f"[playground-ports:{self.start}-{self.end}]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @contextmanager
+    def reservations(self):
+        """
+        Hold the file lock, yielding recent reservations (port to time) to update.
+        """
+        utils.mkdir_p(os.path.dirname(self.path))
+        with open(self.path, "a+") as fd:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                fd.seek(0)
+                try:
+                    reserved = json.loads(fd.read() or "{}")
+                except ValueError:
+                    reserved = {}
+                now = time.time()
+                reserved = {
+                    port: stamp
+                    for port, stamp in reserved.items()
+                    if now - stamp < defaults.port_reserve
+                }
+                yield reserved
+                fd.seek(0)
+                fd.truncate()
+                fd.write(json.dumps(reserved))
+                fd.flush()
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def allocate(self):
+        """
+        Reserve and return a free port.
+        """
+        with self.lock, self.reservations() as reserved:
+            for port in range(self.start, self.end + 1):
+                if port in self.reserved or str(port) in reserved:
+                    continue
+                if is_free(port):
+                    self.reserved.add(port)
+                    reserved[str(port)] = time.time()
+                    return port
+        raise ValueError(f"There are no free ports in {self.start}-{self.end}")
+
+    def release(self, *ports):
+        """
+        Return ports to the range (e.g., when a container is running or stopped)
+        """
+        if not ports:
+            return
+        with self.lock, self.reservations() as reserved:
+            for port in ports:
+                self.reserved.discard(port)
+                reserved.pop(str(port), None)
+
+
+def get_allocator(port_range=None):
+    """
+    Get the port allocator for a range (e.g., 20000-29999) for the process.
+    """
+    port_range = port_range or defaults.port_range
+    if isinstance(port_range, str):
+        port_range = port_range.split("-", 1)
+    port_range = tuple(int(x) for x in port_range)
+    with lock:
+        if port_range not in allocators:
+            allocators[port_range] = PortAllocator(*port_range)
+    return allocators[port_range]
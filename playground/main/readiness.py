@@ -0,0 +1,195 @@
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import random
+import re
+import time
+
+import requests
+
+import playground.defaults as defaults
+import playground.main.session as session
+from playground.logger import logger
+
+# Named ready checks a tutorial can use (ready: jupyter). The Jupyter status
+# endpoint needs a token, so its auth answering also means the server is up.
+presets = {
+    "jupyter": {"path": "/api/status", "status": [200, 401, 403], "match": "started"},
+}
+
+
+class Predicate:
+    """
+    Decide if a response means a tutorial is ready.
+
+    A response is ready when its status is in a set (by default a success,
+    redirect, or an auth challenge, but not a 404 or an error from a proxy
+    in front of a server that is still starting). With match, the body of a
+    successful response must also match a regular expression. The check can
+    be made on a path under the tutorial url (e.g., /api/status).
+    """
+
+    def __init__(self, status=None, match=None, path=None):
+        self.status = set(status or defaults.ready_statuses)
+        self.match = re.compile(match) if match else None
+        self.path = path
+
+    def __str__(self):
+        return f"[playground-predicate:{self.path or '/'}]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def get_url(self, url):
+        if not self.path:
+            return url
+        return url.rstrip("/") + "/" + self.path.lstrip("/")
+
+    def __call__(self, response):
+        """
+        Return why a response is not ready, or None if it is.
+        """
+        if response.status_code not in self.status:
+            return f"response code {response.status_code}"
+        if self.match and response.status_code < 300:
+            if not self.match.search(response.text):
+                return (
+                    f"response code {response.status_code} without {self.match.pattern}"
+                )
+
+
+def get_predicate(ready=None):
+    """
+    Get a predicate for a tutorial's ready setting (a preset name or a dict).
+    """
+    if isinstance(ready, Predicate):
+        return ready
+    if isinstance(ready, str):
+        if ready not in presets:
+            raise ValueError(
+                f"{ready} is not a known ready check, choose from {list(presets)}"
+            )
+        ready = presets[ready]
+    return Predicate(**(ready or {}))
+
+
+class Poller:
+    """
+    Poll a url until it is ready, or a total deadline passes.
+
+    The wait between checks starts small and doubles up to a cap, with
+    jitter so many pollers (e.g., a pool filling) don't check in lockstep,
+    and never sleeps past the deadline. We record the checks made, and the
+    time from the last check that was not ready to the one that was (the
+    most it could have been ready before we noticed).
+    """
+
+    def __init__(self, url, predicate=None, timeout=None, initial=None, maximum=None):
+        self.predicate = get_predicate(predicate)
+        self.url = self.predicate.get_url(url)
+        self.timeout = timeout
+        self.initial = initial or defaults.ready_backoff[0]
+        self.maximum = maximum or defaults.ready_backoff[1]
+        self.start = time.time()
+        self.deadline = None if timeout is None else self.start + timeout
+        self.attempts = 0
+        self.reason = None
+        self.last_checked = None
+        self.detected = None
+        self.lag = None
+
+    def __str__(self):
+        return f"[playground-poller:{self.url}]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.time() >= self.deadline
+
+    @property
+    def remaining(self):
+        if self.deadline is None:
+            return None
+        return max(0, self.deadline - time.time())
+
+    def check(self):
+        """
+        Check the url once, returning True if it is ready.
+        """
+        self.attempts += 1
+        try:
+            # We can't verify because even self signed are not good enough!
+            response = session.get(
+                self.url, verify=False, timeout=defaults.ready_request_timeout
+            )
+            self.reason = self.predicate(response)
+        except requests.RequestException as e:
+            self.reason = e.__class__.__name__
+        now = time.time()
+        if self.reason is None:
+            self.detected = now
+            self.lag = now - (self.last_checked or self.start)
+            logger.debug(
+                f"{self.url} is ready after {self.attempts} checks in "
+                f"{self.elapsed:.1f} seconds (up to {self.lag:.1f} seconds unnoticed)"
+            )
+            return True
+        self.last_checked = now
+        return False
+
+    @property
+    def elapsed(self):
+        return (self.detected or time.time()) - self.start
+
+    def delay(self):
+        """
+        The seconds to wait before the next check.
+        """
+        delay = min(self.maximum, self.initial * 2 ** max(0, self.attempts - 1))
+        delay *= random.uniform(1 - defaults.ready_jitter, 1)
+        if self.deadline is not None:
+            delay = min(delay, self.remaining)
+        return delay
+
+    def wait(self, spin=None):
+        """
+        Wait until the url is ready (True) or the deadline passes (False).
+        """
+        while True:
+            if self.check():
+                self.update(spin, f"{self.url} is ready")
+                return True
+            if self.expired:
+                self.update(
+                    spin, f"{self.url} was not ready within {self.timeout} seconds"
+                )
+                return False
+            delay = self.delay()
+            self.update(
+                spin,
+                f"{self.url} is not ready yet: {self.reason}. Sleeping {delay:.1f} seconds",
+            )
+            time.sleep(delay)
+
+    def update(self, spin, text):
+        if spin:
+            spin.update(text=text, style="green")
+        else:
+            logger.debug(text)
+
+    def metrics(self):
+        """
+        How long it took to see the url ready, for logs and benchmarks.
+        """
+        return {
+            "url": self.url,
+            "ready": self.detected is not None,
+            "attempts": self.attempts,
+            "elapsed": self.elapsed,
+            "lag": self.lag,
+            "reason": self.reason,
+        }
@@ -3,12 +3,13 @@
 #
 # SPDX-License-Identifier: (MIT)
 
+import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 
-import jsonschema
-import requests
-
+import playground.defaults as defaults
+import playground.main.cache as cache
 import playground.main.schemas as schemas
 import playground.main.tutorial as tutorials
 import playground.utils as utils
@@ -17,6 +18,9 @@ from playground.logger import logger
 
 class Repository:
     def __init__(self, repo, **kwargs):
+        self.cache = kwargs.get("cache") or cache.MetadataCache()
+        self.snapshots = kwargs.get("snapshots", cache.SnapshotCache())
+        self.manifests = kwargs.get("manifests") or cache.DirectoryManifest()
         self.tutorials = None
         self.name = None
         self.fullname = None
@@ -29,12 +33,33 @@ class Repository:
                 f"Repository uri {repo} does not have valid tutorial metadata."
             )
 
+    def __str__(self):
+        return self.raw
+
+    def __repr__(self):
+        return f"[playground-repository:{self.raw}]"
+
+    @property
+    def namespace(self):
+        """
+        The namespace for tutorials when combined with other repositories.
+        """
+        if self.vcs in ["local", "directory"]:
+            return self.raw
+        return self.fullname
+
     def parse(self, repo):
         """
         Parse the repository URI to ensure it matches
         """
         self.raw = repo
 
+        # A local directory of tutorials is valid
+        if os.path.isdir(repo):
+            self.vcs = "directory"
+            self.fullname = os.path.abspath(repo)
+            return True
+
         # A local tutorial file is valid
         if os.path.exists(repo):
             self.vcs = "local"
@@ -68,33 +93,158 @@ class Repository:
         self.name = repo
         return True
 
+    @property
+    def url(self):
+        """
+        The url of the remote tutorials metadata.
+        """
+        return f"https://{self.username}.github.io/{self.name}/api/tutorials.json"
+
     def load_tutorials(self):
         """
         load and validate tutorial metadata
         """
-        tset = tutorials.Tutorials()
+        if self.vcs == "directory":
+            return self.load_directory()
+        if self.vcs == "local":
+            content = utils.read_file(self.fullname, "rb")
+        else:
+            content = self.cache.get_body(self.fullname, self.url)
+            if content is None:
+                return False
+
+        # A snapshot for this content is already validated
+        metadata = self.snapshots.load(self.fullname, content)
+        if metadata is not None:
+            self.tutorials = tutorials.Tutorials(trusted=True)
+            for name, tutorial in metadata.items():
+                self.tutorials.add_tutorial(name, tutorial)
+            return True
+
         # These don't technically have a name without context
         if self.vcs == "local":
             metadata = {"local": {"tutorial": utils.read_yaml(self.fullname)}}
         else:
-            res = requests.get(
-                f"https://{self.username}.github.io/{self.name}/api/tutorials.json"
-            )
-            if res.status_code != 200:
-                logger.warning(res.text)
-                return False
-            metadata = res.json()
+            metadata = json.loads(content)
 
         # Validate tutorials on the top level
-        if jsonschema.validate(metadata, schema=schemas.tutorials) is not None:
-            return False
+        tset = tutorials.Tutorials()
+        schemas.validate(metadata, "tutorials")
         for name, tutorial in metadata.items():
             # This shouldn't happen with validation above
             if "tutorial" not in tutorial:
                 logger.warning(f"Tutorial {name} is missing tutorial block.")
                 continue
 
-            # Validation of further inner content done here
+            # Validation of further inner content is done on first use
             tset.add_tutorial(name, tutorial)
         self.tutorials = tset
+
+        # Unless we are saving a snapshot, then validate all now
+        if self.snapshots:
+            for name, error in tset.validate_all().items():
+                logger.warning(f"Tutorial {name} is not valid, skipping: {error}")
+            self.snapshots.save(
+                self.fullname, content, json.loads(json.dumps(tset.metadata))
+            )
+        return True
+
+    def load_directory(self):
+        """
+        Load every tutorial.yaml in a directory, named by relative path.
+
+        Files that have not changed since the last scan (by modified time and
+        size, or hash) are loaded from the manifest without parsing.
+        """
+        previous = self.manifests.load(self.fullname)
+        files = {}
+        tset = tutorials.Tutorials()
+        for path in utils.recursive_find(self.fullname, "(^|/)tutorial[.]ya?ml$"):
+            relpath = os.path.relpath(path, self.fullname)
+            name = os.path.dirname(relpath) or "local"
+            stat = os.stat(path)
+            entry = previous.get(relpath)
+            if not entry or (entry["mtime"], entry["size"]) != (
+                stat.st_mtime,
+                stat.st_size,
+            ):
+                digest = utils.get_file_hash(path)
+                if not entry or entry["hash"] != digest:
+                    entry = self.load_directory_tutorial(name, path, digest)
+                entry.update({"mtime": stat.st_mtime, "size": stat.st_size})
+            files[relpath] = entry
+
+            # Invalid tutorials are remembered so we don't parse them again
+            if "error" in entry:
+                logger.warning(
+                    f"Tutorial {name} is not valid, skipping: {entry['error']}"
+                )
+                continue
+            tset.add_tutorial(name, entry["metadata"], trusted=True)
+
+        self.manifests.save(self.fullname, files)
+        self.tutorials = tset
         return True
+
+    def load_directory_tutorial(self, name, path, digest):
+        """
+        Parse and validate one tutorial file in a directory.
+        """
+        logger.debug(f"Parsing {path}")
+        entry = {"hash": digest}
+        try:
+            metadata = {"tutorial": utils.read_yaml(path)}
+            tutorials.Tutorial(name, metadata)
+            entry["metadata"] = json.loads(json.dumps(metadata))
+        except Exception as e:
+            entry["error"] = str(e)
+        return entry
+
+
+class Repositories:
+    """
+    A group of repositories, loaded concurrently.
+
+    Tutorials are combined into one view, namespaced by repository
+    (e.g., rse-ops/flux-tutorials:radiuss-aws-2022). A repository that
+    cannot be loaded is reported in errors and does not affect the others.
+    """
+
+    def __init__(self, repos, workers=None, **kwargs):
+        self.repos = {}
+        self.errors = {}
+        self.tutorials = tutorials.NamespacedTutorials()
+        self.load(repos, workers or defaults.repository_workers, **kwargs)
+
+    def __str__(self):
+        return ", ".join(self.repos)
+
+    def __repr__(self):
+        return f"[playground-repositories:{len(self.repos)}]"
+
+    def load(self, repos, workers, **kwargs):
+        """
+        Fetch repositories with a bounded thread pool and merge tutorials.
+        """
+        repos = list(dict.fromkeys(repos))
+        with ThreadPoolExecutor(max_workers=min(workers, len(repos))) as executor:
+            futures = {uri: executor.submit(Repository, uri, **kwargs) for uri in repos}
+
+        # Merge in the order given so the view is stable
+        for uri, future in futures.items():
+            try:
+                repo = future.result()
+            except Exception as e:
+                logger.warning(f"Repository {uri} cannot be loaded, skipping: {e}")
+                self.errors[uri] = str(e)
+                continue
+            self.repos[uri] = repo
+            for name, metadata in repo.tutorials.metadata.items():
+                self.tutorials.add_tutorial(
+                    f"{repo.namespace}:{name}",
+                    metadata,
+                    trusted=repo.tutorials.is_trusted(name),
+                )
+
+        if not self.repos:
+            raise ValueError(f"None of the repositories {repos} could be loaded.")
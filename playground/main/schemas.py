@@ -5,6 +5,9 @@
 
 ## ContainerConfig Schema
 
+import jsonschema
+
+import playground.defaults as defaults
 import playground.main.backends as backends
 
 schema_url = "http://json-schema.org/draft-07/schema"
@@ -36,6 +39,20 @@ tutorial_resources = {
         "cpus": {"type": "number"},
     },
 }
+tutorial_ready = {
+    "oneOf": [
+        {"type": "string", "enum": ["jupyter"]},
+        {
+            "type": "object",
+            "properties": {
+                "status": {"type": "array", "items": {"type": "integer"}},
+                "match": {"type": "string"},
+                "path": {"type": "string"},
+            },
+            "additionalProperties": False,
+        },
+    ]
+}
 tutorial_container = {
     "type": "object",
     "properties": {
@@ -44,6 +61,7 @@ tutorial_container = {
         "ports": {"type": "array", "items": {"type": "string"}},
         "expose": {"type": ["string", "number"]},
         "https": {"type": "boolean", "default": True},
+        "ready": tutorial_ready,
     },
     "required": ["name"],
 }
@@ -91,6 +109,14 @@ settings_properties = {
     "default_backend": {"type": "string"},
     "config_editor": {"type": "string"},
     "disable_cloud_select": {"type": "boolean"},
+    "stale_while_revalidate": {"type": "boolean"},
+    "pull_policy": {"type": "string", "enum": defaults.pull_policies},
+    "pull_expire": {"type": "number", "minimum": 0},
+    "container_transport": {"type": "string", "enum": ["auto", "api", "cli"]},
+    "port_range": {"type": "string", "pattern": "^[0-9]+-[0-9]+$"},
+    "admission": {"type": "string", "enum": defaults.admission_policies},
+    "host_cpus": {"type": ["number", "null"], "minimum": 0},
+    "host_memory": {"type": ["number", "null"], "minimum": 0},
     "aws": {
         "type": "object",
         "properties": backend_properties,
@@ -117,3 +143,63 @@ settings = {
     "properties": settings_properties,
     "additionalProperties": False,
 }
+
+
+# A manifest of tutorials to deploy together (playground deploy --manifest)
+manifest_item = {
+    "type": "object",
+    "properties": {
+        "repo": {"type": "string"},
+        "tutorial": {"type": "string"},
+        "backend": {"type": "string"},
+        "count": {"type": "integer", "minimum": 1},
+        "envars": keyvals,
+        "options": {"type": "object"},
+    },
+    "required": ["tutorial"],
+    "additionalProperties": False,
+}
+
+manifest = {
+    "$schema": schema_url,
+    "title": "Deploy Manifest Schema",
+    "type": "object",
+    "properties": {
+        "repo": {"type": "string"},
+        "backend": {"type": "string"},
+        "parallel": {"type": "integer", "minimum": 1},
+        "tutorials": {"type": "array", "items": manifest_item, "minItems": 1},
+    },
+    "required": ["tutorials"],
+    "additionalProperties": False,
+}
+
+
+# Validators compiled once per process, looked up by schema name
+validators = {}
+
+
+def get_validator(name, trusted=False):
+    """
+    Get a compiled validator for a named schema in this module.
+
+    The schema is checked against its metaschema only the first time it is
+    compiled, and not at all if it is trusted.
+    """
+    validator = validators.get(name)
+    if validator is not None:
+        return validator
+    schema = globals()[name]
+    cls = jsonschema.validators.validator_for(schema)
+    if not trusted:
+        cls.check_schema(schema)
+    validator = cls(schema)
+    validators[name] = validator
+    return validator
+
+
+def validate(instance, name, trusted=False):
+    """
+    Validate an instance against a named schema, raising a ValidationError.
+    """
+    get_validator(name, trusted=trusted).validate(instance)
@@ -0,0 +1,204 @@
+# Copyright 2022-2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import hashlib
+import json
+import os
+import re
+
+import playground.defaults as defaults
+import playground.main.cache as cache
+import playground.utils as utils
+from playground.logger import logger
+
+
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric terms.
+    """
+    return re.findall("[a-z0-9]+", str(text).lower())
+
+
+def get_dict(metadata, key):
+    """
+    Get a field that should be a dict, empty if it is missing or is not one.
+    """
+    value = metadata.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+def get_document(repository, name, metadata):
+    """
+    Get the searchable fields for a tutorial in a catalog.
+    """
+    tutorial = get_dict(metadata, "tutorial")
+    container = get_dict(tutorial, "container")
+    project = get_dict(tutorial, "project")
+    notebooks = tutorial.get("notebooks")
+    if not isinstance(notebooks, list):
+        notebooks = []
+    return {
+        "name": name,
+        "repository": repository,
+        "title": tutorial.get("title"),
+        "project": project.get("github"),
+        "container": container.get("name"),
+        "notebooks": [
+            " ".join([str(x.get("name", "")), str(x.get("title", ""))])
+            for x in notebooks
+            if isinstance(x, dict)
+        ],
+    }
+
+
+class SearchIndex:
+    """
+    An on-disk inverted index of tutorials in cached catalogs.
+
+    We index the tutorial name, title, project, notebooks and container. Each
+    catalog is recorded with a digest (and the mtime of its cache entry) so
+    a sync only re-indexes catalogs that changed.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or defaults.cache_dir
+        self.path = os.path.join(self.cache_dir, "search-index.json")
+        self.catalogs = {}
+        self.documents = {}
+        self.terms = {}
+        self.load()
+
+    def __str__(self):
+        return "[playground-search-index]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def load(self):
+        """
+        Load the index from disk, starting fresh if it is missing or unreadable.
+        """
+        if not os.path.exists(self.path):
+            return
+        try:
+            index = utils.read_json(self.path)
+        except Exception as e:
+            logger.debug(f"Search index {self.path} is not readable, rebuilding: {e}")
+            return
+        self.catalogs = index.get("catalogs", {})
+        self.documents = index.get("documents", {})
+        self.terms = index.get("terms", {})
+
+    def save(self):
+        index = {
+            "catalogs": self.catalogs,
+            "documents": self.documents,
+            "terms": self.terms,
+        }
+        cache.write_atomic(json.dumps(index), self.path)
+
+    def update(self, repository, metadata, digest=None):
+        """
+        Index (or re-index) the tutorials in a catalog if it changed.
+        """
+        digest = (
+            digest
+            or hashlib.sha256(
+                json.dumps(metadata, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        )
+        if self.catalogs.get(repository, {}).get("digest") == digest:
+            return False
+
+        self.remove(repository)
+        uids = []
+        for name, entry in metadata.items():
+            if not isinstance(entry, dict):
+                logger.warning(f"Skipping malformed tutorial {name} in {repository}")
+                continue
+            uid = f"{repository}:{name}"
+            document = get_document(repository, name, entry)
+            self.documents[uid] = document
+            uids.append(uid)
+            terms = set()
+            for value in document.values():
+                values = value if isinstance(value, list) else [value]
+                for item in values:
+                    terms.update(tokenize(item or ""))
+            for term in terms:
+                self.terms.setdefault(term, []).append(uid)
+        self.catalogs[repository] = {"digest": digest, "documents": uids}
+        return True
+
+    def remove(self, repository):
+        """
+        Remove a catalog (and its tutorials) from the index.
+        """
+        catalog = self.catalogs.pop(repository, None)
+        if not catalog:
+            return
+        removed = set(catalog["documents"])
+        for uid in removed:
+            self.documents.pop(uid, None)
+        for term in list(self.terms):
+            kept = [x for x in self.terms[term] if x not in removed]
+            if kept:
+                self.terms[term] = kept
+            else:
+                del self.terms[term]
+
+    def sync(self, metadata_cache=None):
+        """
+        Bring the index up to date with the cached catalogs.
+
+        Only cache entries that changed since they were indexed are read.
+        """
+        metadata_cache = metadata_cache or cache.MetadataCache(self.cache_dir)
+        paths = {x.get("path"): name for name, x in self.catalogs.items()}
+        changed = False
+        seen = set()
+        for path, mtime in metadata_cache.entries():
+            repository = paths.get(path)
+            if repository and self.catalogs[repository].get("mtime") == mtime:
+                seen.add(repository)
+                continue
+            try:
+                entry = utils.read_json(path)
+                repository = entry.get("name") or entry["url"]
+                digest = hashlib.sha256(entry["body"].encode("utf-8")).hexdigest()
+                metadata = json.loads(entry["body"])
+            except Exception as e:
+                logger.debug(f"Cannot index cache entry {path}: {e}")
+                continue
+            if not isinstance(metadata, dict):
+                logger.warning(f"Skipping malformed catalog for {repository}")
+                continue
+            seen.add(repository)
+            self.update(repository, metadata, digest)
+            self.catalogs[repository]["mtime"] = mtime
+            self.catalogs[repository]["path"] = path
+            changed = True
+
+        for repository in set(self.catalogs) - seen:
+            self.remove(repository)
+            changed = True
+        if changed:
+            self.save()
+        return changed
+
+    def search(self, query):
+        """
+        Find tutorials that match all terms in a query.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        matches = None
+        for term in terms:
+            found = set(self.terms.get(term, []))
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        return [self.documents[uid] for uid in sorted(matches)]
@@ -0,0 +1,334 @@
+# Copyright 2022-2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import copy
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+import playground.defaults as defaults
+import playground.utils as utils
+from playground.logger import logger
+
+# Commands the server will answer
+commands = ["deploy", "instances", "list", "pool", "status", "stop", "shutdown"]
+
+# Actions for a warm pool
+pool_actions = ["fill", "claim", "release", "drain", "status"]
+
+
+def encode(message):
+    """
+    Encode a message as one line of json.
+    """
+    return (json.dumps(message, default=str) + "\n").encode("utf-8")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answer one json line request with one json line response.
+    """
+
+    def handle(self):
+        line = self.rfile.readline()
+
+        # A connection without a request is only checking that we are up
+        if not line.strip():
+            return
+        try:
+            request = json.loads(line)
+            result = self.server.playground.handle(request)
+            response = {"result": result}
+        except (Exception, SystemExit) as e:
+            logger.debug(f"Issue with request {line}: {e}")
+            response = {"error": str(e)}
+        self.wfile.write(encode(response))
+
+        # Stop only after answering, so the client gets its response
+        if self.server.playground.stopping:
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Server:
+    """
+    A long running playground that keeps clients warm between commands.
+
+    Settings, loaded repositories and backend clients (e.g., the cloud
+    service clients that authenticate when created) are kept for each
+    combination of settings file, backend and offline mode, so a forwarded
+    command does not need to import, load or authenticate again. Warm pools
+    of tutorial containers also live here, and are reaped while we serve.
+    """
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or defaults.socket_path
+        self.clients = {}
+        self.locks = {}
+        self.stamps = {}
+        self.pools = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.server = None
+        self.stopping = False
+
+    def __str__(self):
+        return "[playground-server]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def get_client(self, request):
+        """
+        Get (or create) a warm client and its lock for a request.
+        """
+        from .client import Playground
+
+        key = (
+            request.get("settings_file"),
+            request.get("backend") or "docker",
+            bool(request.get("offline")),
+        )
+        with self.lock:
+            # A client is replaced when its settings files change
+            client = self.clients.get(key)
+            if client and self.stamps[key] != self.stamp(client):
+                logger.debug(f"Settings changed for {key}, creating a new client")
+                client = None
+            if not client:
+                client = Playground(
+                    settings_file=key[0], backend=key[1], offline=key[2], quiet=True
+                )
+                self.clients[key] = client
+                self.stamps[key] = self.stamp(client)
+                self.locks.setdefault(key, threading.Lock())
+            return client, self.locks[key]
+
+    def stamp(self, client):
+        """
+        The state (modified time and size) of a client's settings files.
+        """
+        from .cache import SettingsCache
+
+        return SettingsCache().key(client.settings.settings_files)
+
+    def handle(self, request):
+        """
+        Run a command for a request, returning the result.
+        """
+        command = request.get("command")
+        if command not in commands:
+            raise ValueError(f"{command} is not a known command.")
+        self.requests += 1
+        if command == "status":
+            return self.status()
+        if command == "shutdown":
+            self.stopping = True
+            return "shutting down"
+
+        if command == "pool":
+            return self.pool(request)
+
+        client, lock = self.get_client(request)
+        if command == "instances":
+            instances, errors = client.status(request.get("backends"))
+            return {"instances": instances, "errors": errors}
+
+        # The lock is only held to load repositories and create the backend
+        # client. A deploy (that can wait a long time for its tutorial to be
+        # ready) or stop uses a copy pinned to the repositories it loaded, so
+        # other commands for the same client are not held up behind it.
+        with lock:
+            client.load(request["repos"])
+            if command == "list":
+                return [tutorial.name for tutorial in client.get_tutorials()]
+            playground = copy.copy(client)
+            if command == "stop" or not request.get("dry_run"):
+                playground.client
+        if command == "stop":
+            return playground.stop(request["tutorial"])
+        return playground.deploy(
+            request["tutorial"],
+            request.get("envars"),
+            dry_run=request.get("dry_run", False),
+            **(request.get("options") or {}),
+        )
+
+    def pool(self, request):
+        """
+        Fill, claim from, release to, drain or describe a warm pool.
+        """
+        action = request.get("action")
+        if action not in pool_actions:
+            raise ValueError(f"{action} is not a known pool action.")
+        if action == "status" and not request.get("tutorial"):
+            return [pool.status() for pool in list(self.pools.values())]
+
+        client, lock = self.get_client(request)
+        key = (
+            request.get("settings_file"),
+            request.get("backend") or "docker",
+            tuple(request["repos"]),
+            request["tutorial"],
+        )
+        with self.lock:
+            pool = self.pools.get(key)
+        if pool is None:
+            if action != "fill":
+                raise ValueError(
+                    f"There is no pool for {request['tutorial']}, create one with fill."
+                )
+            with lock:
+                client.load(request["repos"])
+                pool = client.get_pool(
+                    request["tutorial"],
+                    size=request.get("size"),
+                    envars=request.get("envars"),
+                    ttl=request.get("ttl"),
+                )
+            with self.lock:
+                pool = self.pools.setdefault(key, pool)
+
+        if action == "fill":
+            pool.size = request.get("size") or pool.size
+            pool.ttl = request.get("ttl") or pool.ttl
+            return pool.fill(wait=request.get("wait", True))
+        if action == "claim":
+            return pool.claim()
+        if action == "release":
+            return pool.release(request["name"])
+        if action == "drain":
+            with self.lock:
+                self.pools.pop(key, None)
+            return pool.drain()
+        return pool.status()
+
+    def reap(self, stopped):
+        """
+        Reap idle containers in warm pools until stopped is set.
+        """
+        while not stopped.wait(defaults.pool_reap_interval):
+            for pool in list(self.pools.values()):
+                try:
+                    pool.reap()
+                except Exception as e:
+                    logger.warning(f"Issue reaping {pool}: {e}")
+
+    def status(self):
+        """
+        Describe the server and the clients it keeps warm.
+        """
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "clients": [
+                {"settings_file": key[0], "backend": key[1], "offline": key[2]}
+                for key in self.clients
+            ],
+            "pools": [
+                {"tutorial": key[3], "backend": key[1]} for key in list(self.pools)
+            ],
+        }
+
+    def serve(self):
+        """
+        Listen on the socket until shut down.
+        """
+        if Client(self.socket_path).is_running():
+            raise ValueError(f"A server is already listening on {self.socket_path}")
+
+        # A socket left behind by a server that did not exit cleanly
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        utils.mkdir_p(os.path.dirname(self.socket_path))
+
+        # The socket is only ever accessible to us (a umask, not a chmod after
+        # binding, so another user can't connect before we restrict it)
+        umask = os.umask(0o177)
+        try:
+            self.server = UnixServer(self.socket_path, RequestHandler)
+        finally:
+            os.umask(umask)
+        self.server.playground = self
+        logger.info(f"Playground server listening on {self.socket_path}")
+        stopped = threading.Event()
+        threading.Thread(target=self.reap, args=(stopped,), daemon=True).start()
+        try:
+            self.server.serve_forever()
+        finally:
+            stopped.set()
+            self.server.server_close()
+
+            # Containers waiting in pools are only useful while we serve
+            for pool in list(self.pools.values()):
+                pool.drain()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+class Client:
+    """
+    Send commands to a running playground server.
+    """
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or defaults.socket_path
+
+    def __str__(self):
+        return "[playground-server-client]"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def connect(self):
+        """
+        Connect to the server socket.
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(defaults.socket_connect_timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(None)
+        return sock
+
+    def is_running(self):
+        """
+        Determine if a server is listening (without sending a command)
+        """
+        if not os.path.exists(self.socket_path):
+            return False
+        try:
+            self.connect().close()
+        except OSError:
+            return False
+        return True
+
+    def request(self, command, **kwargs):
+        """
+        Send a command and return the result, raising ValueError on error.
+        """
+        kwargs["command"] = command
+        with self.connect() as sock:
+            sock.sendall(encode(kwargs))
+            with sock.makefile("rb") as fd:
+                line = fd.readline()
+        if not line:
+            raise ValueError("The server closed the connection without a response.")
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response.get("result")
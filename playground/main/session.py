@@ -0,0 +1,47 @@
+# Copyright 2022-2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import playground.defaults as defaults
+
+# One session (and connection pool) shared by the process
+session = None
+lock = threading.Lock()
+
+
+def get_session():
+    """
+    Get the shared HTTP session, creating it on first use.
+
+    Connections are kept alive and reused, with a pool per host. When the
+    pool for a host is in use, a request waits for a connection instead
+    of opening a new one.
+    """
+    global session
+    with lock:
+        if session is None:
+            new_session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=defaults.http_pool_hosts,
+                pool_maxsize=defaults.http_pool_size,
+                pool_block=True,
+            )
+            new_session.mount("http://", adapter)
+            new_session.mount("https://", adapter)
+            session = new_session
+    return session
+
+
+def get(url, timeout=None, **kwargs):
+    """
+    GET a url with the shared session and a default (connect, read) timeout.
+    """
+    if timeout is None:
+        timeout = defaults.http_timeout
+    return get_session().get(url, timeout=timeout, **kwargs)
@@ -9,6 +9,7 @@ import playground.defaults as defaults
 import playground.main.schemas
 import playground.utils as utils
 from playground.logger import logger
+from playground.main.cache import SettingsCache
 
 try:
     from ruamel_yaml.comments import CommentedSeq
@@ -17,6 +18,7 @@ except ImportError:
 
 import os
 import re
+import types
 
 import jsonschema
 
@@ -30,17 +32,50 @@ def OrderedList(*listing):
     return ret
 
 
+def freeze(value):
+    """
+    Return a read-only copy of a settings value (dicts and lists are frozen)
+    """
+    if isinstance(value, dict):
+        return types.MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def update_roundtrip(original, updated):
+    """
+    Update settings loaded round-trip (with comments) with changed values.
+    """
+    for key in list(original):
+        if key not in updated:
+            del original[key]
+    for key, value in updated.items():
+        current = original.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            update_roundtrip(current, value)
+        elif current != value:
+            original[key] = OrderedList(*value) if isinstance(value, list) else value
+
+
 class Settings:
-    def __init__(self, settings_file=None, validate=True):
+    def __init__(self, settings_file=None, validate=True, cache=True):
         """
         Create a new settings object not requiring a settings file.
         """
+        self._resolved = {}
         self._settings = {}
         self.settings_file = settings_file
         self.user_settings = None
+        if cache is True:
+            cache = SettingsCache()
+        self.cache = cache or None
+        self.validated = False
         self.load(settings_file)
-        if validate:
+        if validate and not self.validated:
             self.validate()
+            if self.cache:
+                self.cache.save(self.settings_files, self._settings)
 
     def __str__(self):
         return "[playground-settings]"
@@ -52,9 +87,7 @@ class Settings:
         """
         Validate the loaded settings with jsonschema
         """
-        jsonschema.validate(
-            instance=self._settings, schema=playground.main.schemas.settings
-        )
+        playground.main.schemas.validate(self._settings, "settings")
 
     def inituser(self):
         """
@@ -130,29 +163,52 @@ class Settings:
         """
         # Get the preferred settings flie
         self.settings_file = self.get_settings_file(settings_file)
+        self.invalidate()
 
         # Exit quickly if the settings file does not exist
         if not os.path.exists(self.settings_file):
             logger.exit("%s does not exist." % self.settings_file)
 
-        # Always load default settings first
-        self._settings = utils.read_yaml(defaults.default_settings_file)
+        # Always load default settings first, then user or custom settings
+        self.settings_files = [defaults.default_settings_file]
+        if self.settings_file != defaults.default_settings_file:
+            self.settings_files.append(self.settings_file)
+
+        # Unchanged settings files were already merged and validated
+        settings = self.cache.load(self.settings_files) if self.cache else None
+        self.validated = settings is not None
+        if settings is not None:
+            self._settings = settings
+            return
 
-        # Update with user or custom settings if not equal to default
+        self._settings = utils.read_yaml(defaults.default_settings_file)
         if self.settings_file != defaults.default_settings_file:
             self._settings.update(utils.read_yaml(self.settings_file))
 
     def get(self, key, default=None):
         """
         Get a settings value, doing appropriate substitution and expansion.
+
+        Substituted values are remembered until the settings are changed, and
+        environment variables are expanded on each get (they can change, e.g.,
+        for a long running server).
         """
-        # This is a reference to a dictionary (object) setting
+        lookup = key
         if ":" in key:
-            key, subkey = key.split(":")
-            value = self._settings[key][subkey]
+            key = key.split(":")[0]
+        if lookup in self._resolved:
+            value = self._resolved[lookup]
         else:
-            value = self._settings.get(key, default)
-        value = self._substitutions(value)
+            # This is a reference to a dictionary (object) setting
+            if ":" in lookup:
+                value = self._settings[key][lookup.split(":")[1]]
+            elif key not in self._settings:
+                return default
+            else:
+                value = self._settings[key]
+            value = self._substitutions(value)
+            self._resolved[lookup] = value
+
         # If we allow environment substitution, do it
         if key in defaults.allowed_envars and value:
             if isinstance(value, list):
@@ -161,6 +217,20 @@ class Settings:
                 value = os.path.expandvars(value)
         return value
 
+    def resolve_all(self):
+        """
+        Get a frozen snapshot of all resolved settings, e.g., for a backend.
+
+        This is read-only and does not change if the settings do.
+        """
+        return freeze({key: self.get(key) for key in self._settings})
+
+    def invalidate(self):
+        """
+        Forget resolved values, done whenever the settings change.
+        """
+        self._resolved = {}
+
     def __getattr__(self, key):
         """
         A direct get of an attribute, but default to None if doesn't exist
@@ -182,7 +252,9 @@ class Settings:
         if value not in current:
             # Add to the beginning of the list
             current = [value] + current
-            self.set(key, current)
+            self._settings[key] = current
+            self.invalidate()
+            self.change_validate(key, current)
             logger.warning(
                 "Warning: Check with playground config edit - ordering of list can change."
             )
@@ -198,6 +270,7 @@ class Settings:
             logger.exit("%s is not in %s" % (value, key))
         current.pop(current.index(value))
         self._settings[key] = current
+        self.invalidate()
         self.change_validate(key, current)
         logger.warning(
             "Warning: Check with playground config edit - ordering of list can change."
@@ -250,6 +323,7 @@ class Settings:
             value = self.parse_boolean(value)
             value = self.parse_null(value)
             self._settings[key] = value
+        self.invalidate()
 
         # Validate and catch error message cleanly
         self.change_validate(key, value)
@@ -299,13 +373,15 @@ class Settings:
         if isinstance(value, bool) or not value:
             return value
 
-        # Currently dicts only support boolean or null so we return as is
-        elif isinstance(value, dict):
+        # Currently dicts only support boolean or null, and numbers are as is
+        elif not isinstance(value, (str, list)):
             return value
 
         for rep, repvalue in defaults.reps.items():
             if isinstance(value, list):
-                value = [x.replace(rep, repvalue) for x in value]
+                value = [
+                    x.replace(rep, repvalue) if isinstance(x, str) else x for x in value
+                ]
             else:
                 value = value.replace(rep, repvalue)
 
@@ -314,6 +390,7 @@ class Settings:
     def delete(self, key):
         if key in self._settings:
             del self._settings[key]
+        self.invalidate()
 
     def save(self, filename=None):
         """
@@ -322,7 +399,13 @@ class Settings:
         filename = filename or self.settings_file
         if not filename:
             logger.exit("A filename is required to save to.")
-        utils.write_yaml(self._settings, filename)
+
+        # Settings are loaded read-only, so update the original to keep comments
+        settings = self._settings
+        if os.path.exists(filename):
+            settings = utils.read_yaml(filename, roundtrip=True) or {}
+            update_roundtrip(settings, self._settings)
+        utils.write_yaml(settings, filename)
 
     def __iter__(self):
         for key, value in self.__dict__.items():
@@ -341,6 +424,7 @@ class Settings:
         # Cut out early if params not provided
         if not params:
             return
+        self.invalidate()
 
         for param in params:
             if not re.search("^(add|set|rm)", param, re.IGNORECASE) or ":" not in param:
@@ -3,10 +3,10 @@
 #
 # SPDX-License-Identifier: (MIT)
 
+import copy
 import json
 
-import jsonschema
-
+import playground.main.readiness as readiness
 import playground.main.schemas as schemas
 import playground.main.templates as templates
 import playground.utils as utils
@@ -37,45 +37,144 @@ class TutorialsEncoder(json.JSONEncoder):
 class Tutorials:
     """
     A grouping of tutorials.
+
+    We keep the raw metadata, and only create (and validate) a Tutorial
+    the first time it is asked for, so looking up one tutorial in a large
+    catalog does not require validating all of them.
     """
 
     Encoder = TutorialsEncoder
 
-    def __init__(self):
-        self.tutorials = {}
+    def __init__(self, trusted=False):
+        self.metadata = {}
+        self.trusted = trusted
+        self._trusted = set()
+        self._tutorials = {}
 
     def __iter__(self):
         """
         Generate a list of tutorial attributes.
         """
-        for _, tutorial in self.tutorials.items():
-            yield tutorial
+        for name in list(self.metadata):
+            tutorial = self.get(name)
+            if tutorial is not None:
+                yield tutorial
+
+    def __contains__(self, name):
+        return name in self.metadata
+
+    def __len__(self):
+        return len(self.metadata)
+
+    @property
+    def tutorials(self):
+        """
+        Named lookup of all valid tutorials (each is created and validated)
+        """
+        return {tutorial.name: tutorial for tutorial in self}
 
-    def add_tutorial(self, name, tutorial):
+    def names(self):
+        """
+        Names of tutorials, without creating or validating them.
+        """
+        return list(self.metadata)
+
+    def add_tutorial(self, name, tutorial, trusted=None):
         """
         add to the named lookup of tutorials
+
+        A trusted tutorial (e.g., from a validated snapshot) is not validated.
+        """
+        self.metadata[name] = tutorial
+        self._tutorials.pop(name, None)
+        if trusted or (trusted is None and self.trusted):
+            self._trusted.add(name)
+        else:
+            self._trusted.discard(name)
+
+    def load_tutorial(self, name):
+        """
+        Create and validate a tutorial, removing it if it is not valid.
         """
         try:
-            new_tutorial = Tutorial(name, tutorial)
+            tutorial = Tutorial(
+                name, self.metadata[name], validate=name not in self._trusted
+            )
         except Exception as e:
-            logger.warning(f"Tutorial {name} is not valid, skipping: {e}")
-            return
-        self.tutorials[name] = new_tutorial
+            self.metadata.pop(name, None)
+            raise e
+        self._tutorials[name] = tutorial
+        self._trusted.add(name)
+        return tutorial
+
+    def is_trusted(self, name):
+        """
+        A tutorial is trusted if it came from a snapshot or was validated.
+        """
+        return name in self._trusted
 
     def get(self, name):
         """
         Get a tutorial by name
         """
-        return self.tutorials.get(name)
+        tutorial = self._tutorials.get(name)
+        if tutorial is not None or name not in self.metadata:
+            return tutorial
+        try:
+            return self.load_tutorial(name)
+        except Exception as e:
+            logger.warning(f"Tutorial {name} is not valid, skipping: {e}")
+
+    def validate_all(self):
+        """
+        Create and validate every tutorial, returning errors for invalid ones.
+        """
+        errors = {}
+        for name in list(self.metadata):
+            if name in self._tutorials:
+                continue
+            try:
+                self.load_tutorial(name)
+            except Exception as e:
+                errors[name] = str(e)
+        return errors
+
+
+class NamespacedTutorials(Tutorials):
+    """
+    Tutorials from several repositories, named <repository>:<tutorial>.
+
+    A tutorial can also be asked for by its short name when it is unique.
+    """
+
+    def get(self, name):
+        """
+        Get a tutorial by full or (unique) short name
+        """
+        if name not in self.metadata:
+            matches = [x for x in self.metadata if x.rsplit(":", 1)[-1] == name]
+            if len(matches) > 1:
+                logger.warning(f"Tutorial {name} is ambiguous, choose from {matches}")
+                return
+            if matches:
+                name = matches[0]
+        return super().get(name)
 
 
 class Tutorial:
     Encoder = TutorialEncoder
 
-    def __init__(self, name, metadata):
+    def __init__(self, name, metadata, validate=True):
         self._config = metadata
         self.name = name
-        self.validate()
+
+        # When deploying more than one, the number of this instance
+        self.replica = None
+
+        # Host ports (by container port) to use instead of the ones asked for
+        self.host_ports = {}
+        if validate:
+            self.validate()
         self.user = utils.get_user()
         if not self.user:
             raise ValueError("Cannot determine username, set USER in the environment.")
@@ -85,11 +184,26 @@ class Tutorial:
         """
         A slug based on the tutorial and UID (for cloud resources)
         """
-        return f"{self.user}{utils.slugify(self.title)}"
+        return f"{self.user}{self.slug}"
 
     @property
     def slug(self):
-        return utils.slugify(self.title)
+        slug = utils.slugify(self.title)
+        if self.replica is not None:
+            slug = f"{slug}-{self.replica}"
+        return slug
+
+    def get_replica(self, replica, host_ports=None):
+        """
+        A copy of the tutorial for one of several instances, named uniquely.
+
+        Host ports (by container port) can be given so instances on one host
+        don't ask for the same ports.
+        """
+        tutorial = copy.copy(self)
+        tutorial.replica = replica
+        tutorial.host_ports = dict(host_ports or self.host_ports)
+        return tutorial
 
     def prepare_startup_script(self, envars=None, interactive=False):
         """
@@ -117,14 +231,10 @@ class Tutorial:
         """
         Validate the individual tutorial (and details about properties)
         """
-        if (
-            jsonschema.validate(self._config, schema=schemas.tutorial_properties)
-            is not None
-        ):
-            raise ValueError(f"Tutorial {self.name} is not valid")
+        schemas.validate(self._config, "tutorial_properties")
         # Ensure ports parse to two ints
         ports = set()
-        for portset in self.container_ports:
+        for portset in self.data["container"].get("ports") or []:
             if ":" not in portset:
                 raise ValueError(
                     f'Port set {portset} is missing ":" separator, and is not valid.'
@@ -200,10 +310,25 @@ class Tutorial:
             https = True
         return https
 
+    @property
+    def ready(self):
+        """
+        When the tutorial is ready (e.g., jupyter, or a status, match and path)
+        """
+        return readiness.get_predicate(self.data["container"].get("ready"))
+
     @property
     def resources(self):
         return self.data.get("resources")
 
+    @property
+    def limits(self):
+        """
+        The cpus and memory (MB) a container for the tutorial is limited to.
+        """
+        resources = self.resources or {}
+        return {"cpus": resources.get("cpus"), "memory": resources.get("memory")}
+
     @property
     def flexible_resources(self):
         """
@@ -226,7 +351,38 @@ class Tutorial:
 
     @property
     def container_ports(self):
-        return self.data["container"].get("ports") or []
+        ports = []
+        for port in self.data["container"].get("ports") or []:
+            host, container = port.rsplit(":", 1)
+            host = self.host_ports.get(int(container), host)
+            ports.append(f"{host}:{container}")
+        return ports
+
+    @property
+    def container_port(self):
+        """
+        The container port for the exposed port (e.g., for a health check)
+        """
+        if not self.expose_port:
+            return self.expose_port
+        for port in self.data["container"].get("ports") or []:
+            host, container = port.rsplit(":", 1)
+            if int(self.expose_port) in [int(host), int(container)]:
+                return container
+        return self.expose_port
+
+    @property
+    def host_port(self):
+        """
+        The host port for the exposed port (e.g., for a url)
+        """
+        if not self.expose_port:
+            return self.expose_port
+        for port in self.data["container"].get("ports") or []:
+            host, container = port.rsplit(":", 1)
+            if int(self.expose_port) in [int(host), int(container)]:
+                return self.host_ports.get(int(container), host)
+        return self.expose_port
 
     @property
     def expose_ports(self):
@@ -242,8 +398,9 @@ class Tutorial:
     # Firewall identifiers
     @property
     def firewall_name(self):
+        # Replicas of a tutorial share a firewall
         exposed = "-".join(self.expose_ports)
-        return f"firewall-{self.slug}-{exposed}"
+        return f"firewall-{utils.slugify(self.title)}-{exposed}"
 
     @property
     def firewall_egress_name(self):
@@ -0,0 +1,40 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import pytest
+
+import playground.defaults as defaults
+import playground.main.backends as backends
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Caches (settings, snapshots, directory manifests) are written under the
+    test's temporary directory, and never to the user's cache.
+    """
+    path = str(tmp_path / "cache")
+    monkeypatch.setattr(defaults, "cache_dir", path)
+    return path
+
+
+@pytest.fixture
+def register_backend(monkeypatch):
+    """
+    Make a test backend (a Backend subclass) available by its name
+    """
+    get_backend = backends.get_backend
+
+    def register(backend):
+        monkeypatch.setattr(
+            backends,
+            "get_backend",
+            lambda name: backend if name == backend.name else get_backend(name),
+        )
+        return backend
+
+    return register
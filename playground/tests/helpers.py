@@ -9,8 +9,11 @@
 import os
 import shlex
 import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from playground.client import get_parser
+from playground.main.backends.docker import DockerClient
 from playground.main.client import Playground
 
 here = os.path.dirname(os.path.abspath(__file__))
@@ -49,3 +52,37 @@ def init_client(tmpdir, backend=None):
         backend=backend,
     )
     return client
+
+
+class ReadyHandler(BaseHTTPRequestHandler):
+    """
+    A tutorial server that is always ready
+    """
+
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(port=0):
+    """
+    Serve the ready handler on a port (any free one by default) in a thread
+    """
+    server = ThreadingHTTPServer(("", port), ReadyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_docker_client(settings=None, cli="docker", engine=None):
+    """
+    Get a docker client without looking for the engine or executable
+    """
+    client = DockerClient.__new__(DockerClient)
+    client.cli = cli
+    client.engine = engine
+    client.started = {}
+    client._settings = settings or {}
+    return client
@@ -5,6 +5,7 @@
 #
 # SPDX-License-Identifier: (MIT)
 
+import os
 import time
 
 import jsonschema
@@ -13,7 +14,7 @@ import requests
 
 import playground.main.schemas as schemas
 
-from .helpers import init_client
+from .helpers import here, init_client
 
 
 # We can't easily test AWS/GCP at this point
@@ -53,3 +54,16 @@ def test_instance_command(tmp_path, backend, tutorial_name):
     response = requests.get("https://127.0.0.1:8000", verify=False)
     assert response.status_code == 200
     client.stop(tutorial_name)
+
+
+def test_deploy_dry_run(tmp_path):
+    """
+    A dry run describes the deploy without creating the backend
+    """
+    client = init_client(str(tmp_path), backend="docker")
+    client.load(os.path.join(here, "testdata", "tutorial.yaml"))
+    plan = client.deploy("local", {"password": "secret"}, dry_run=True)
+    assert plan["backend"] == "docker"
+    assert plan["container"] == "ghcr.io/rse-ops/flux-radiuss-aws-2022:jupyter-3.0.0"
+    assert plan["ports"] == ["8000:8000"]
+    assert plan["envars"] == {"password": "******"}
@@ -0,0 +1,167 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import playground.main.cache as cache
+from playground.main.cache import MetadataCache
+from playground.main.search import SearchIndex
+
+catalog = {"local": {"tutorial": {"title": "Cached Tutorial"}}}
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """
+    Serve a catalog with an ETag, honoring If-None-Match
+    """
+
+    etag = '"catalog-v1"'
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(catalog).encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), CatalogHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+
+
+def test_conditional_get(tmp_path, server):
+    """
+    An expired entry is revalidated with If-None-Match, and a 304 uses the cache
+    """
+    url = f"http://127.0.0.1:{server.server_port}/api/tutorials.json"
+    metadata = MetadataCache(str(tmp_path), expire=0)
+    assert metadata.get("org/repo", url) == catalog
+    assert metadata.get("org/repo", url) == catalog
+    assert server.requests == [None, CatalogHandler.etag]
+
+
+def test_fresh_entry(tmp_path, server):
+    """
+    A fresh entry is served from disk without a network request
+    """
+    url = f"http://127.0.0.1:{server.server_port}/api/tutorials.json"
+    metadata = MetadataCache(str(tmp_path), expire=1)
+    assert metadata.get("org/repo", url) == catalog
+    assert metadata.get("org/repo", url) == catalog
+    assert len(server.requests) == 1
+    assert metadata.load("org/repo")["etag"] == CatalogHandler.etag
+
+
+def test_offline_and_stale(tmp_path, server, monkeypatch):
+    """
+    Offline and stale-while-revalidate both answer from the cache right away
+    """
+    url = f"http://127.0.0.1:{server.server_port}/api/tutorials.json"
+    assert MetadataCache(str(tmp_path), offline=True).get("org/repo", url) is None
+    assert MetadataCache(str(tmp_path)).get("org/repo", url) == catalog
+    assert len(server.requests) == 1
+
+    offline = MetadataCache(str(tmp_path), expire=0, offline=True)
+    assert offline.get("org/repo", url) == catalog
+    assert len(server.requests) == 1
+
+    stale = MetadataCache(str(tmp_path), expire=0, stale_while_revalidate=True)
+    assert stale.get("org/repo", url) == catalog
+    for thread in cache.refreshes:
+        thread.join()
+    assert server.requests[-1] == CatalogHandler.etag
+
+    # Finished refreshes are not kept
+    assert stale.get("org/repo", url) == catalog
+    assert len(cache.refreshes) == 1
+    cache.refreshes[0].join()
+
+    # A refresh that is slow to finish doesn't hold up exit
+    slow = threading.Thread(target=time.sleep, args=(5,), daemon=True)
+    slow.start()
+    monkeypatch.setattr(cache, "refreshes", [slow])
+    start = time.time()
+    cache.finish_refreshes()
+    assert time.time() - start < 1
+
+    # A server that cannot be reached falls back to the stale entry
+    unreachable = "http://127.0.0.1:1/api/tutorials.json"
+    assert (
+        MetadataCache(str(tmp_path), expire=0).get("org/repo", unreachable) == catalog
+    )
+
+
+def test_search_index(tmp_path, server):
+    """
+    Cached catalogs are indexed, and only changed catalogs are re-indexed
+    """
+    url = f"http://127.0.0.1:{server.server_port}/api/tutorials.json"
+    MetadataCache(str(tmp_path)).get("org/repo", url)
+
+    index = SearchIndex(str(tmp_path))
+    assert index.sync()
+    results = index.search("cached TUTORIAL")
+    assert [x["name"] for x in results] == ["local"]
+    assert results[0]["repository"] == "org/repo"
+    assert not index.search("cached missing")
+
+    # A new index loads from disk, and has nothing to update
+    index = SearchIndex(str(tmp_path))
+    assert not index.sync()
+    assert index.search("cached")
+
+
+def test_search_malformed(tmp_path):
+    """
+    Malformed catalogs and tutorials are skipped, and don't stop a sync
+    """
+    metadata = MetadataCache(str(tmp_path))
+    catalogs = {
+        "org/list": ["not", "a", "catalog"],
+        "org/mixed": {
+            "broken": "not a tutorial",
+            "odd": {"tutorial": ["not", "a", "tutorial"]},
+            "good": {
+                "tutorial": {
+                    "title": "Good tutorial",
+                    "container": "not a container",
+                    "notebooks": {"name": "not a list"},
+                }
+            },
+        },
+    }
+    for name, catalog in catalogs.items():
+        metadata.save(
+            name,
+            {"name": name, "url": name, "body": json.dumps(catalog), "checked": 0},
+        )
+
+    index = SearchIndex(str(tmp_path))
+    assert index.sync()
+    assert list(index.catalogs) == ["org/mixed"]
+    assert [x["name"] for x in index.search("tutorial")] == ["good"]
+    assert [x["name"] for x in index.search("org odd")] == ["odd"]
@@ -0,0 +1,153 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import os
+
+import pytest
+
+import playground.defaults as defaults
+import playground.utils as utils
+from playground.main.backends.base import Backend
+from playground.main.cache import ImageCache
+
+from .helpers import here, init_client, make_docker_client, start_server
+
+tutorial_file = os.path.join(here, "testdata", "tutorial.yaml")
+
+
+@pytest.fixture
+def server():
+    server = start_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fake(register_backend, server):
+    """
+    A backend that "deploys" to the local server, recording what it was asked
+    """
+
+    class FakeBackend(Backend):
+        name = "fake"
+        deployed = []
+
+        def deploy(self, tutorial, envars=None, **kwargs):
+            if envars.get("password") == "fail":
+                raise ValueError("This deploy fails")
+            self.deployed.append((tutorial.uid, kwargs))
+            return {"url": f"http://127.0.0.1:{server.server_port}"}
+
+    return register_backend(FakeBackend)
+
+
+def test_deploy_many(tmp_path, fake):
+    """
+    Items are expanded by count, deployed concurrently and waited for
+    """
+    client = init_client(str(tmp_path), backend="fake")
+    client.load(tutorial_file)
+    results = client.deploy_many(
+        [
+            {"tutorial": "local", "count": 3},
+            {"tutorial": "local", "envars": {"password": "fail"}},
+            {"tutorial": "local", "envars": {"password": "other"}},
+            {"tutorial": "missing"},
+        ],
+        workers=2,
+    )
+    assert len(results) == 6
+    assert [x["status"] for x in results[:3]] == ["ready"] * 3
+    assert results[0]["name"].endswith("-1")
+    assert results[3]["status"] == "failed"
+    assert results[3]["error"] == "This deploy fails"
+    assert results[5]["status"] == "failed"
+
+    # Instances from different items are numbered together
+    assert results[4]["status"] == "ready"
+    assert results[4]["name"].endswith("-5")
+    assert len({x["name"] for x in results[:5]}) == 5
+
+    # Readiness is waited for once, together, and not by each deploy
+    assert len(fake.deployed) == 4
+    assert all(kwargs["wait"] is False for _, kwargs in fake.deployed)
+
+
+def test_deploy_manifest(tmp_path, fake):
+    """
+    A manifest sets defaults for its tutorials, and is validated
+    """
+    client = init_client(str(tmp_path), backend="docker")
+    manifest = str(tmp_path / "fleet.yaml")
+    utils.write_yaml(
+        {
+            "repo": tutorial_file,
+            "backend": "fake",
+            "parallel": 2,
+            "tutorials": [{"tutorial": "local", "count": 2}],
+        },
+        manifest,
+    )
+    results = client.deploy_manifest(manifest, wait=False)
+    assert [x["status"] for x in results] == ["deployed", "deployed"]
+    assert all(x["backend"] == "fake" for x in results)
+
+    utils.write_yaml({"tutorials": [{"name": "local"}]}, manifest)
+    with pytest.raises(Exception):
+        client.deploy_manifest(manifest)
+
+
+@pytest.mark.parametrize(
+    "policy,present,fresh,pulled",
+    [
+        ("always", True, True, True),
+        ("if-not-present", True, False, False),
+        ("if-not-present", False, False, True),
+        ("if-stale", True, True, False),
+        ("if-stale", True, False, True),
+        ("never", True, False, False),
+    ],
+)
+def test_pull_policy(tmp_path, monkeypatch, policy, present, fresh, pulled):
+    """
+    An image is only pulled when the pull policy asks for it
+    """
+    monkeypatch.setattr(defaults, "cache_dir", str(tmp_path))
+    image = "ghcr.io/rse-ops/flux-radiuss-aws-2022:jupyter-3.0.0"
+    if fresh:
+        ImageCache().save(image, "sha256:abc")
+
+    commands = []
+
+    def run_command(cmd, stream=False):
+        commands.append(cmd[1])
+        if cmd[1] == "image" and not present and "pull" not in commands:
+            return {"message": "No such image", "return_code": 1}
+        return {"message": '[{"Id": "sha256:abc"}]\n', "return_code": 0}
+
+    monkeypatch.setattr(utils, "run_command", run_command)
+    client = make_docker_client()
+    client.pull(image, policy)
+    assert ("pull" in commands) == pulled
+    if pulled:
+        assert ImageCache().get(image)["digest"] == "sha256:abc"
+
+
+def test_pull_never(tmp_path, monkeypatch):
+    """
+    With pull_policy never, a missing image is an error
+    """
+    monkeypatch.setattr(defaults, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(
+        utils,
+        "run_command",
+        lambda cmd, stream=False: {"message": "", "return_code": 1},
+    )
+    client = make_docker_client({"pull_policy": "never"})
+    with pytest.raises(ValueError):
+        client.pull("ghcr.io/rse-ops/missing:latest")
@@ -0,0 +1,420 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import base64
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import playground.defaults as defaults
+import playground.utils as utils
+from playground.main.backends.docker import DockerClient
+from playground.main.backends.docker.engine import Engine, EngineError, registry_auth
+from playground.main.backends.docker.events import parse_event
+from playground.main.backends.podman import PodmanClient
+
+from .helpers import here, init_client
+
+tutorial_file = os.path.join(here, "testdata", "tutorial.yaml")
+
+
+class EngineHandler(BaseHTTPRequestHandler):
+    """
+    Enough of the Docker Engine API to deploy, list and stop a container
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def reply(self, status, data=None, lines=None):
+        body = b""
+        if lines is not None:
+            body = b"".join(json.dumps(x).encode("utf-8") + b"\n" for x in lines)
+        elif data is not None:
+            body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        state = self.server.state
+        if url.path == "/_ping":
+            return self.reply(200, "OK")
+        if url.path == "/info":
+            return self.reply(200, {"NCPU": 4, "MemTotal": 16 * 1024**3})
+        if url.path.startswith("/images/"):
+            if state["images"]:
+                image = state["images"][-1].rsplit(":", 1)[0]
+                digests = [f"{image}@{state['digest']}"]
+                return self.reply(
+                    200, {"Id": "sha256:abc", "Size": 2048, "RepoDigests": digests}
+                )
+            return self.reply(404, {"message": "No such image"})
+        if url.path.startswith("/distribution/"):
+            return self.reply(200, {"Descriptor": {"digest": state["registry"]}})
+        if url.path == "/containers/json":
+            return self.reply(200, list(state["containers"].values()))
+        if url.path == "/events":
+            return self.reply(200, lines=state["events"])
+        self.reply(404, {"message": "page not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        state = self.server.state
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        if url.path == "/images/create":
+            state["auth"] = self.headers.get("X-Registry-Auth")
+            if state.get("private"):
+                return self.reply(
+                    401, {"message": "unauthorized: authentication required"}
+                )
+            state["images"].append(f"{query['fromImage'][0]}:{query['tag'][0]}")
+            state["digest"] = state["registry"]
+            events = [
+                {"status": "Pulling fs layer", "id": "a1", "progressDetail": {}},
+                {
+                    "status": "Downloading",
+                    "id": "a1",
+                    "progressDetail": {"current": 512, "total": 1024},
+                },
+                {"status": "Status: Downloaded newer image"},
+            ]
+            return self.reply(200, lines=events)
+        if url.path == "/containers/create":
+            name = query["name"][0]
+            if name in state["containers"]:
+                return self.reply(409, {"message": f"Conflict, {name} is in use"})
+            state["containers"][name] = {
+                "Id": name,
+                "Names": [f"/{name}"],
+                "Image": body["Image"],
+                "Labels": body["Labels"],
+                "State": "created",
+                "Created": int(time.time()),
+                "HostConfig": body["HostConfig"],
+                "Healthcheck": body.get("Healthcheck"),
+            }
+            return self.reply(201, {"Id": name})
+        name = url.path.split("/")[2]
+        if url.path.endswith("/start"):
+            if state.get("start_error"):
+                return self.reply(500, {"message": state["start_error"]})
+            state["containers"][name]["State"] = "running"
+            return self.reply(204)
+        if url.path.endswith("/stop"):
+            if state["containers"].pop(name, None) is None:
+                return self.reply(404, {"message": f"No such container: {name}"})
+            return self.reply(204)
+        self.reply(404, {"message": "page not found"})
+
+    def do_DELETE(self):
+        name = urlparse(self.path).path.split("/")[2]
+        if self.server.state["containers"].pop(name, None) is None:
+            return self.reply(404, {"message": f"No such container: {name}"})
+        self.reply(204)
+
+    def log_message(self, *args):
+        pass
+
+
+class UnixEngineServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = str(tmp_path / "docker.sock")
+    server = UnixEngineServer(path, EngineHandler)
+    server.connections = 0
+    server.state = {
+        "images": [],
+        "containers": {},
+        "events": [],
+        "digest": None,
+        "registry": "sha256:v1",
+    }
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_engine(engine):
+    """
+    Requests share one connection, and errors are raised with their status
+    """
+    client = Engine.find(["/does/not/exist", engine.server_address])
+    assert client.path == engine.server_address
+    assert client.image_id("ghcr.io/rse-ops/tutorial") is None
+
+    progress = client.pull("ghcr.io/rse-ops/tutorial")
+    assert engine.state["images"] == ["ghcr.io/rse-ops/tutorial:latest"]
+    assert progress == {
+        "status": "Status: Downloaded newer image",
+        "layers": 1,
+        "bytes": 1024,
+    }
+    assert client.image_id("ghcr.io/rse-ops/tutorial") == "sha256:abc"
+
+    container = client.run("tutorial", "ghcr.io/rse-ops/tutorial", ports=["80:8000"])
+    assert container["ports"] == {"8000/tcp": [{"HostPort": "80"}]}
+    with pytest.raises(EngineError) as error:
+        client.run("tutorial", "ghcr.io/rse-ops/tutorial")
+    assert error.value.status == 409
+    assert engine.connections == 1
+
+    # A digest is sent as the tag
+    digest = "sha256:" + "a" * 64
+    client.pull(f"ghcr.io/rse-ops/tutorial@{digest}")
+    assert engine.state["images"][-1] == f"ghcr.io/rse-ops/tutorial:{digest}"
+
+    # A container that doesn't start is removed, so its name is free again
+    engine.state["start_error"] = "port is already allocated"
+    with pytest.raises(EngineError):
+        client.run("tutorial-2", "ghcr.io/rse-ops/tutorial", ports=["80:8000"])
+    assert "tutorial-2" not in engine.state["containers"]
+    engine.state["start_error"] = None
+    client.run("tutorial-2", "ghcr.io/rse-ops/tutorial")
+
+
+def test_engine_timeout(tmp_path, monkeypatch):
+    """
+    An engine that accepts connections but never answers isn't waited on
+    """
+    monkeypatch.setattr(defaults, "engine_timeout", 0.2)
+    path = str(tmp_path / "docker.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(path)
+        sock.listen()
+        start = time.time()
+        assert Engine.find([path]) is None
+        with pytest.raises(OSError):
+            Engine(path).containers()
+        assert time.time() - start < 1
+
+
+def test_registry_auth(tmp_path, engine, monkeypatch):
+    """
+    Pulls send credentials from the docker config, or use the command line
+    """
+    config = tmp_path / "config.json"
+    auth = base64.b64encode(b"dinosaur:secret").decode("utf-8")
+    config.write_text(json.dumps({"auths": {"https://ghcr.io": {"auth": auth}}}))
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    assert registry_auth("python:3.11") is None
+    header = json.loads(base64.urlsafe_b64decode(registry_auth("ghcr.io/rse-ops/a")))
+    assert header["username"] == "dinosaur" and header["password"] == "secret"
+
+    client = Engine.find([engine.server_address])
+    client.pull("ghcr.io/rse-ops/tutorial", auth=registry_auth("ghcr.io/rse-ops/a"))
+    assert engine.state["auth"]
+
+    # A pull the registry refuses is tried with the command line (and its helpers)
+    monkeypatch.setattr(defaults, "cache_dir", str(tmp_path))
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+    monkeypatch.setattr(DockerClient, "sockets", [engine.server_address])
+    commands = []
+    monkeypatch.setattr(
+        utils,
+        "run_command",
+        lambda cmd, **kwargs: commands.append(cmd) or {"return_code": 0},
+    )
+    docker = DockerClient()
+    docker.cli = "docker"
+    engine.state["private"] = True
+    docker.pull("ghcr.io/rse-ops/private")
+    assert commands == [["docker", "pull", "ghcr.io/rse-ops/private"]]
+    docker.cli = None
+    with pytest.raises(ValueError):
+        docker.pull("ghcr.io/rse-ops/private")
+
+
+def test_podman_sockets(monkeypatch):
+    """
+    The rootless podman socket is only looked for with a runtime directory
+    """
+    monkeypatch.delenv("CONTAINER_HOST", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    client = PodmanClient.__new__(PodmanClient)
+    assert client.get_sockets() == ["/run/podman/podman.sock"]
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert client.get_sockets()[0] == "/run/user/1000/podman/podman.sock"
+
+
+def test_docker_engine(tmp_path, engine, monkeypatch):
+    """
+    The docker backend deploys, lists and stops with the engine API
+    """
+    monkeypatch.setattr(defaults, "cache_dir", str(tmp_path))
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+    monkeypatch.setattr(DockerClient, "sockets", [engine.server_address])
+    client = init_client(str(tmp_path), backend="docker")
+    client.settings.set("container_transport", "api")
+    client.load(tutorial_file)
+
+    res = client.deploy("local", {"password": "secret"}, headless=True, wait=False)
+    assert res["return_code"] == 0
+    assert res["url"] == "https://127.0.0.1:8000"
+    assert engine.state["images"] == [
+        "ghcr.io/rse-ops/flux-radiuss-aws-2022:jupyter-3.0.0"
+    ]
+
+    instances = client.instances()
+    assert len(instances) == 1
+    assert instances[0]["state"] == "running"
+    assert instances[0]["url"] == "https://127.0.0.1:8000"
+    assert instances[0]["name"] == client.get_tutorial("local").uid
+
+    assert client.stop("local")["return_code"] == 0
+    assert not client.instances()
+    assert engine.connections == 1
+
+
+def test_prefetch(tmp_path, engine, monkeypatch):
+    """
+    Prefetch pulls an image shared by tutorials once, and only when it changed
+    """
+    monkeypatch.setattr(defaults, "cache_dir", str(tmp_path))
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+    monkeypatch.setattr(DockerClient, "sockets", [engine.server_address])
+    client = init_client(str(tmp_path), backend="docker")
+    client.settings.set("container_transport", "api")
+    client.load(tutorial_file)
+    tutorials = client.get_tutorials()
+    tutorials.add_tutorial("local-2", tutorials.metadata["local"])
+
+    results = client.prefetch()
+    assert len(results) == 1
+    assert results[0]["status"] == "pulled"
+    assert results[0]["tutorials"] == ["local", "local-2"]
+    assert results[0]["size"] == 2048
+    assert results[0]["digest"] == "sha256:abc"
+    assert len(engine.state["images"]) == 1
+
+    # The registry has the digest we do, so there is nothing to pull
+    assert client.prefetch(["local"])[0]["status"] == "present"
+    engine.state["registry"] = "sha256:v2"
+    assert client.prefetch(["local"])[0]["status"] == "pulled"
+    assert client.prefetch(["local"], force=True)[0]["status"] == "pulled"
+    assert len(engine.state["images"]) == 3
+
+    with pytest.raises(ValueError):
+        client.prefetch(["missing"])
+
+    # Tutorials from more than one repository can be named without it
+    client.load([tutorial_file, str(tmp_path / "does-not-exist")])
+    results = client.prefetch(["local"])
+    assert results[0]["tutorials"] == [f"{tutorial_file}:local"]
+
+
+def test_admission(tmp_path, engine, monkeypatch):
+    """
+    Containers are limited to their resources, and only started if they fit
+    """
+    monkeypatch.setattr(defaults, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(defaults, "admission_timeout", 0)
+    monkeypatch.setattr(defaults, "admission_interval", 0)
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+    monkeypatch.setattr(DockerClient, "sockets", [engine.server_address])
+    client = init_client(str(tmp_path), backend="docker")
+    client.settings.set("container_transport", "api")
+    client.settings.set("pull_policy", "if-not-present")
+    client.load(tutorial_file)
+
+    # The tutorial asks for 1 cpu and 4000 MB, and the host has 4 and 16 GB
+    result = client.deploy("local", count=4, wait=False)
+    assert result["failed"] == 0
+    config = list(engine.state["containers"].values())[0]["HostConfig"]
+    assert config["NanoCpus"] == 10**9
+    assert config["Memory"] == 4000 * 1048576
+
+    # A fifth would oversubscribe the host, now or after waiting
+    tutorial = client.get_tutorial("local").get_replica(5)
+    for policy in "reject", "queue":
+        with pytest.raises(ValueError, match="not room"):
+            client.client.deploy(tutorial, headless=True, wait=False, admission=policy)
+    assert len(engine.state["containers"]) == 4
+
+    # Admission is off unless it is asked for
+    client.client.deploy(tutorial, headless=True, wait=False)
+    assert len(engine.state["containers"]) == 5
+
+    # Settings can give the host more room than the engine reports
+    client.settings.set("admission", "reject")
+    client.settings.set("host_cpus", 8)
+    client.settings.set("host_memory", 32000)
+    client.get_client("docker")._settings = client.settings.resolve_all()
+    client.client.deploy(
+        client.get_tutorial("local").get_replica(6), headless=True, wait=False
+    )
+    assert len(engine.state["containers"]) == 6
+
+
+def test_readiness(tmp_path, engine, monkeypatch):
+    """
+    A container is ready when its health check passes, and fails when it exits
+    """
+    monkeypatch.setattr(defaults, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(defaults, "ready_backoff", (0.1, 0.1))
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+    monkeypatch.setattr(DockerClient, "sockets", [engine.server_address])
+    client = init_client(str(tmp_path), backend="docker")
+    client.settings.set("container_transport", "api")
+    client.load(tutorial_file)
+    tutorial = client.get_tutorial("local")
+    assert client.deploy("local", headless=True, wait=False)["return_code"] == 0
+
+    # The image has no health check, so one checks the exposed port
+    healthcheck = engine.state["containers"][tutorial.uid]["Healthcheck"]
+    assert "https://localhost:8000" in healthcheck["Test"][1]
+
+    # Nothing answers at the url, so we can only know from events
+    url = "http://127.0.0.1:1"
+    docker = client.client
+    assert not docker.wait_until_ready(tutorial, url, timeout=0.5)
+
+    engine.state["events"] = [{"Type": "container", "Action": "exec_start: sh"}]
+    engine.state["events"].append(
+        {"Type": "container", "Action": "health_status: healthy"}
+    )
+    assert docker.wait_until_ready(tutorial, url, timeout=10)
+
+    engine.state["events"] = [
+        {
+            "Type": "container",
+            "Action": "die",
+            "Actor": {"Attributes": {"exitCode": "1"}},
+        }
+    ]
+    start = time.time()
+    with pytest.raises(ValueError, match="exited"):
+        docker.wait_until_ready(tutorial, url, timeout=10)
+    assert time.time() - start < 5
+
+    # Podman events (from the command line) have a status instead of an action
+    assert parse_event({"Status": "health_status", "HealthStatus": "healthy"}) == (
+        "healthy",
+        None,
+    )
+    assert parse_event({"Status": "died", "ContainerExitCode": 137}) == ("died", 137)
+    assert parse_event({"Status": "start"}) == (None, None)
@@ -0,0 +1,108 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import importlib.metadata
+import json
+import subprocess
+import sys
+
+import pytest
+
+import playground.main.backends as backends
+
+# Cloud SDKs should only be imported by the backends that need them
+heavy = ["boto3", "botocore", "cloud_select", "googleapiclient", "google.cloud"]
+
+# A generous budget (seconds) for importing a subcommand
+budget = 2.0
+
+check = """
+import json, sys, time
+start = time.perf_counter()
+import %s
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": list(sys.modules)}))
+"""
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "playground.client",
+        "playground.client.config",
+        "playground.client.deploy",
+        "playground.client.listing",
+        "playground.client.search",
+        "playground.client.show",
+        "playground.client.stop",
+    ],
+)
+def test_subcommand_imports(module):
+    """
+    Subcommands don't import cloud SDKs, and import within a budget
+    """
+    out = subprocess.check_output([sys.executable, "-c", check % module])
+    result = json.loads(out)
+    imported = [x for x in heavy if x in result["modules"]]
+    assert not imported
+    assert result["seconds"] < budget
+
+
+def test_get_backend(monkeypatch):
+    """
+    Builtin backends are imported on demand, and plugins found by entry point
+    """
+    assert backends.get_backend("docker").name == "docker"
+    assert backends.get_backend(None) is None
+
+    plugin = importlib.metadata.EntryPoint(
+        name="mydocker",
+        value="playground.main.backends.docker:DockerClient",
+        group=backends.plugin_group,
+    )
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda group=None: [plugin])
+    assert backends.get_backend("mydocker").name == "docker"
+    assert backends.get_backend("missing") is None
+
+
+def test_lazy_backends(monkeypatch):
+    """
+    Backends are resolved when asked for, not when playground.main is imported
+    """
+    resolve = """
+import json, sys
+import playground.main
+import playground.main.backends as backends
+before = "playground.main.backends.podman" in sys.modules
+backend = backends.get_backend("podman")
+print(json.dumps({"before": before, "name": backend.name,
+    "after": "playground.main.backends.podman" in sys.modules}))
+"""
+    result = json.loads(subprocess.check_output([sys.executable, "-c", resolve]))
+    assert result == {"before": False, "name": "podman", "after": True}
+
+    # A backend registered by path is imported by get_backend
+    monkeypatch.setitem(
+        backends.backends, "mine", "playground.main.backends.podman:PodmanClient"
+    )
+    assert backends.get_backend("mine").name == "podman"
+
+    # Only entry points in our group are plugins
+    plugins = {
+        backends.plugin_group: [
+            importlib.metadata.EntryPoint(
+                name="theirs",
+                value="playground.main.backends.podman:PodmanClient",
+                group=backends.plugin_group,
+            )
+        ]
+    }
+    monkeypatch.setattr(
+        importlib.metadata, "entry_points", lambda group=None: plugins.get(group, [])
+    )
+    assert backends.get_plugin("theirs").name == "podman"
+    assert backends.get_backend("theirs").name == "podman"
+    assert backends.get_plugin("mine") is None
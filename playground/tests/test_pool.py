@@ -0,0 +1,191 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import playground.main.ports as ports
+from playground.main.backends.base import Backend
+from playground.main.ports import PortAllocator, is_free
+from playground.main.server import Client, Server
+
+from .helpers import ReadyHandler, get_settings, here, init_client, start_server
+
+tutorial_file = os.path.join(here, "testdata", "tutorial.yaml")
+
+
+@pytest.fixture
+def local(monkeypatch, register_backend):
+    """
+    A backend that "runs" a tutorial as a server on its host port
+    """
+    monkeypatch.setattr(ports, "allocators", {})
+
+    class LocalBackend(Backend):
+        name = "local"
+        servers = {}
+        pulls = []
+
+        def pull(self, image, policy=None):
+            self.pulls.append(image)
+
+        def deploy(self, tutorial, envars=None, **kwargs):
+            server = start_server(int(tutorial.host_port))
+            self.servers[tutorial.uid] = server
+            url = self.format_url("127.0.0.1", tutorial.host_port, https=False)
+            return {"return_code": 0, "url": url}
+
+        def instances(self):
+            return [{"name": name} for name in self.servers]
+
+        def stop(self, tutorial):
+            server = self.servers.pop(tutorial.uid)
+            if server.socket.fileno() != -1:
+                server.shutdown()
+                server.server_close()
+
+    yield register_backend(LocalBackend)
+    for server in LocalBackend.servers.values():
+        server.shutdown()
+        server.server_close()
+
+
+def test_port_allocator(tmp_path):
+    """
+    Ports are not handed out twice, or when something is listening
+    """
+    path = str(tmp_path / "ports.json")
+    with ThreadingHTTPServer(("", 0), ReadyHandler) as server:
+        port = server.server_port
+        assert not is_free(port)
+        allocator = PortAllocator(port, port + 1, path=path)
+        assert allocator.allocate() == port + 1
+        with pytest.raises(ValueError):
+            allocator.allocate()
+
+        # Another process skips a port that was just handed out
+        with pytest.raises(ValueError):
+            PortAllocator(port, port + 1, path=path).allocate()
+        allocator.release(port + 1)
+        assert PortAllocator(port, port + 1, path=path).allocate() == port + 1
+
+
+def test_pool(tmp_path, local):
+    """
+    A pool hands out ready containers, refills, and reaps idle ones
+    """
+    client = init_client(str(tmp_path), backend="local")
+    client.load(tutorial_file)
+    pool = client.get_pool("local", size=2, ttl=60)
+    status = pool.fill()
+    assert len(status["ready"]) == 2
+    assert local.pulls == [client.get_tutorial("local").container]
+
+    # Each container has its own name and host port
+    names = {x["name"] for x in status["ready"]}
+    urls = {x["url"] for x in status["ready"]}
+    assert len(names) == 2 and len(urls) == 2
+    assert "http://127.0.0.1:8000" not in urls
+
+    claimed = pool.claim()
+    assert claimed["name"] in names
+    for _ in range(100):
+        if len(pool.status()["ready"]) == 2:
+            break
+        time.sleep(0.05)
+    status = pool.status()
+    assert len(status["ready"]) == 2
+    assert [x["name"] for x in status["claimed"]] == [claimed["name"]]
+    assert claimed["name"] not in {x["name"] for x in status["ready"]}
+
+    # An unhealthy container is not handed out
+    broken = pool.ready[0]
+    server = local.servers[broken["name"]]
+    server.shutdown()
+    server.server_close()
+    assert pool.claim()["name"] != broken["name"]
+
+    pool.release(claimed["name"])
+    with pytest.raises(ValueError):
+        pool.release(claimed["name"])
+
+    # Containers unclaimed past the ttl are stopped
+    for _ in range(100):
+        if not pool.starting:
+            break
+        time.sleep(0.05)
+    pool.ttl = 0
+    assert len(pool.reap()) == len(status["ready"])
+    assert not pool.status()["ready"]
+    assert len(local.servers) == 1
+
+    # A new pool doesn't reuse the name of a container left running
+    running = list(local.servers)[0]
+    pool = client.get_pool("local", size=1)
+    name = pool.fill()["ready"][0]["name"]
+    assert int(name.rsplit("-", 1)[1]) > int(running.rsplit("-", 1)[1])
+    pool.drain()
+
+
+def test_server_pool(tmp_path, local):
+    """
+    Pools live in the server, and are drained when it stops
+    """
+    server = Server(str(tmp_path / "playground.sock"))
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    client = Client(server.socket_path)
+    while not client.is_running():
+        thread.join(0.01)
+
+    request = {
+        "repos": [tutorial_file],
+        "settings_file": get_settings(str(tmp_path)),
+        "backend": "local",
+        "tutorial": "local",
+    }
+    with pytest.raises(ValueError):
+        client.request("pool", action="claim", **request)
+    status = client.request("pool", action="fill", size=1, **request)
+    assert len(status["ready"]) == 1
+    claimed = client.request("pool", action="claim", **request)
+    assert claimed["url"].startswith("http://127.0.0.1:")
+    assert [x["tutorial"] for x in client.request("pool", action="status")] == ["local"]
+
+    # The replacement for the claimed container is stopped with the server
+    for _ in range(100):
+        status = client.request("pool", action="status", **request)
+        if status["ready"]:
+            break
+        time.sleep(0.05)
+    client.request("shutdown")
+    thread.join(5)
+    assert list(local.servers) == [claimed["name"]]
+
+
+def test_deploy_count(tmp_path, local):
+    """
+    Instances of a tutorial on one host get their own names and host ports
+    """
+    client = init_client(str(tmp_path), backend="local")
+    client.settings.set("port_range", "21000-21999")
+    client.load(tutorial_file)
+    result = client.deploy("local", count=3)
+    assert result["count"] == 3
+    assert result["failed"] == 0
+    assert len(set(result["urls"])) == 3
+    assert [x["status"] for x in result["instances"]] == ["ready"] * 3
+    assert sorted(local.servers) == sorted(x["name"] for x in result["instances"])
+    for url in result["urls"]:
+        assert 21000 <= int(url.rsplit(":", 1)[1]) <= 21999
+
+    # Ports are given back once their containers have them
+    assert not ports.get_allocator("21000-21999").reserved
@@ -0,0 +1,91 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import playground.defaults as defaults
+from playground.main.readiness import Poller, get_predicate
+
+
+class SlowStartHandler(BaseHTTPRequestHandler):
+    """
+    A proxy that answers 503 until the server behind it has started
+    """
+
+    def do_GET(self):
+        if time.time() < self.server.ready_at:
+            status, body = 503, b"starting"
+        elif self.path == "/api/status":
+            status, body = 403, b"forbidden"
+        else:
+            status, body = 200, b"hello from the tutorial"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(defaults, "ready_backoff", (0.05, 0.2))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowStartHandler)
+    server.ready_at = time.time() + 0.5
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_poller(server):
+    """
+    A 503 is not ready, and we notice soon after the server starts
+    """
+    poller = Poller(server.url, timeout=10)
+    assert not poller.check()
+    assert poller.reason == "response code 503"
+    assert poller.wait()
+    metrics = poller.metrics()
+    assert metrics["ready"] and metrics["attempts"] > 2
+    assert time.time() - server.ready_at < 1
+    assert 0 < metrics["lag"] <= 0.3
+
+    # A server that doesn't start (or isn't there) gives up at the deadline
+    server.ready_at = time.time() + 60
+    for url in server.url, "http://127.0.0.1:1":
+        start = time.time()
+        assert not Poller(url, timeout=0.5).wait()
+        assert time.time() - start < 1
+
+
+def test_predicates(server):
+    """
+    Tutorials can say which responses (and paths) mean they are ready
+    """
+    server.ready_at = 0
+    assert Poller(server.url, {"match": "tutorial"}).check()
+    poller = Poller(server.url, {"match": "^notebook"})
+    assert not poller.check()
+    assert "without ^notebook" in poller.reason
+    assert not Poller(server.url, {"status": [204]}).check()
+
+    # Jupyter answers its status (even without a token) once it is up
+    poller = Poller(server.url, "jupyter")
+    assert poller.url == f"{server.url}/api/status"
+    assert poller.check()
+    server.ready_at = time.time() + 60
+    assert not Poller(server.url, "jupyter").check()
+
+    with pytest.raises(ValueError):
+        get_predicate("notebook")
@@ -0,0 +1,102 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import os
+import shutil
+
+import pytest
+
+import playground.utils as utils
+from playground.main.cache import DirectoryManifest, SnapshotCache
+from playground.main.repository import Repositories, Repository
+
+here = os.path.dirname(os.path.abspath(__file__))
+testdata = os.path.join(here, "testdata")
+
+
+def test_repositories(tmp_path):
+    """
+    Repositories are loaded together, namespaced, and errors are isolated
+    """
+    first = os.path.join(testdata, "tutorial.yaml")
+    second = str(tmp_path / "tutorial.yaml")
+    shutil.copyfile(first, second)
+
+    repos = Repositories([first, second, "does-not-exist"], workers=2)
+    assert list(repos.repos) == [first, second]
+    assert list(repos.errors) == ["does-not-exist"]
+    assert repos.tutorials.names() == [f"{first}:local", f"{second}:local"]
+
+    # The short name is ambiguous, the full name is not
+    assert repos.tutorials.get("local") is None
+    assert repos.tutorials.get(f"{second}:local").name == f"{second}:local"
+
+    single = Repositories([first, "does-not-exist"])
+    assert single.tutorials.get("local").name == f"{first}:local"
+
+    with pytest.raises(ValueError):
+        Repositories(["does-not-exist"])
+
+
+def test_snapshot(tmp_path):
+    """
+    A repository loaded a second time uses a validated snapshot
+    """
+    filename = str(tmp_path / "tutorial.yaml")
+    shutil.copyfile(os.path.join(testdata, "tutorial.yaml"), filename)
+    snapshots = SnapshotCache(str(tmp_path))
+
+    repo = Repository(filename, snapshots=snapshots)
+    assert not repo.tutorials.trusted
+    assert os.path.exists(snapshots.path(repo.fullname))
+
+    repo = Repository(filename, snapshots=snapshots)
+    assert repo.tutorials.trusted
+    assert repo.tutorials.get("local").title == "Flux Tutorial: 2022 for RADIUSS"
+
+    # Changing the file invalidates the snapshot
+    with open(filename, "a") as fd:
+        fd.write("\n# A comment\n")
+    repo = Repository(filename, snapshots=snapshots)
+    assert not repo.tutorials.trusted
+
+
+def test_directory(tmp_path, monkeypatch):
+    """
+    A directory of tutorials only re-parses files that changed
+    """
+    root = tmp_path / "tutorials"
+    for name in ["flux/basics", "flux/advanced", "other"]:
+        (root / name).mkdir(parents=True)
+        shutil.copyfile(
+            os.path.join(testdata, "tutorial.yaml"), str(root / name / "tutorial.yaml")
+        )
+    manifests = DirectoryManifest(str(tmp_path))
+
+    parsed = []
+    read_yaml = utils.read_yaml
+
+    def counting_read_yaml(filename):
+        parsed.append(filename)
+        return read_yaml(filename)
+
+    monkeypatch.setattr(utils, "read_yaml", counting_read_yaml)
+    repo = Repository(str(root), manifests=manifests)
+    assert repo.vcs == "directory"
+    assert sorted(repo.tutorials.names()) == ["flux/advanced", "flux/basics", "other"]
+    assert len(parsed) == 3
+
+    # Nothing changed, nothing is parsed
+    repo = Repository(str(root), manifests=manifests)
+    assert len(parsed) == 3
+    assert repo.tutorials.get("flux/basics").container.startswith("ghcr.io")
+
+    with open(str(root / "other" / "tutorial.yaml"), "a") as fd:
+        fd.write("\n# A comment\n")
+    repo = Repository(str(root), manifests=manifests)
+    assert len(parsed) == 4
+    assert parsed[-1].endswith(os.path.join("other", "tutorial.yaml"))
@@ -0,0 +1,31 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import os
+
+import jsonschema
+import pytest
+
+import playground.main.schemas as schemas
+import playground.utils as utils
+
+here = os.path.dirname(os.path.abspath(__file__))
+testdata = os.path.join(here, "testdata")
+
+
+def test_validators():
+    """
+    Validators are compiled once and reused
+    """
+    for name in ["tutorials", "tutorial_properties", "settings"]:
+        assert schemas.get_validator(name) is schemas.get_validator(name)
+
+    tutorial = {"tutorial": utils.read_yaml(os.path.join(testdata, "tutorial.yaml"))}
+    schemas.validate({"local": tutorial}, "tutorials")
+    schemas.validate(tutorial, "tutorial_properties")
+    with pytest.raises(jsonschema.exceptions.ValidationError):
+        schemas.validate({"backends": ["docker"]}, "settings")
@@ -0,0 +1,137 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import os
+import stat
+import threading
+
+import pytest
+
+from playground.client.helpers import get_server
+from playground.main.backends.base import Backend
+from playground.main.server import Client, Server
+
+from .helpers import get_settings, here, parse_args
+
+tutorial_file = os.path.join(here, "testdata", "tutorial.yaml")
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = Server(str(tmp_path / "playground.sock"))
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    client = Client(server.socket_path)
+    while not client.is_running():
+        thread.join(0.01)
+    yield server
+    if client.is_running():
+        client.request("shutdown")
+    thread.join(5)
+
+
+def test_server(tmp_path, server):
+    """
+    Commands are answered by a warm client that is reused between requests
+    """
+    client = Client(server.socket_path)
+    request = {"repos": [tutorial_file], "settings_file": get_settings(str(tmp_path))}
+    assert client.request("list", **request) == ["local"]
+
+    plan = client.request(
+        "deploy",
+        tutorial="local",
+        envars={"password": "secret"},
+        dry_run=True,
+        **request,
+    )
+    assert plan["container"] == "ghcr.io/rse-ops/flux-radiuss-aws-2022:jupyter-3.0.0"
+    assert plan["envars"] == {"password": "******"}
+
+    with pytest.raises(ValueError):
+        client.request("destroy", **request)
+
+    status = client.request("status")
+    assert status["requests"] == 3
+    assert len(status["clients"]) == 1
+    assert len(server.clients) == 1
+
+
+def test_socket(server):
+    """
+    Commands are forwarded to a server on another socket with --socket
+    """
+    client = get_server(parse_args(f"--socket {server.socket_path} list"))
+    assert client.socket_path == server.socket_path
+    assert (
+        get_server(parse_args(f"--socket {server.socket_path} --no-server list"))
+        is None
+    )
+
+    # serve takes it before or after the command
+    for argstr in ["--socket {} serve", "serve --socket {}"]:
+        assert (
+            parse_args(argstr.format(server.socket_path)).socket == server.socket_path
+        )
+
+
+def test_slow_deploy(tmp_path, server, register_backend):
+    """
+    A deploy waiting for its tutorial doesn't hold up other commands
+    """
+    started = threading.Event()
+    release = threading.Event()
+
+    class SlowBackend(Backend):
+        name = "slow"
+
+        def deploy(self, tutorial, envars=None, **kwargs):
+            started.set()
+            release.wait(10)
+            return {"url": "http://127.0.0.1:8000"}
+
+    register_backend(SlowBackend)
+    request = {
+        "repos": [tutorial_file],
+        "settings_file": get_settings(str(tmp_path)),
+        "backend": "slow",
+    }
+    results = []
+    deploy = threading.Thread(
+        target=lambda: results.append(
+            Client(server.socket_path).request("deploy", tutorial="local", **request)
+        )
+    )
+    deploy.start()
+    try:
+        assert started.wait(5)
+        assert Client(server.socket_path).request("list", **request) == ["local"]
+        assert not results
+    finally:
+        release.set()
+        deploy.join(5)
+    assert results == [{"url": "http://127.0.0.1:8000"}]
+
+
+def test_shutdown(server):
+    """
+    A private server answers shutdown, and removes its socket
+    """
+    # Only we can connect, and our umask is given back
+    assert stat.S_IMODE(os.stat(server.socket_path).st_mode) == 0o600
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert umask != 0o177
+
+    client = Client(server.socket_path)
+    assert client.request("shutdown") == "shutting down"
+    for _ in range(100):
+        if not os.path.exists(server.socket_path):
+            break
+        threading.Event().wait(0.01)
+    assert not client.is_running()
+    assert not os.path.exists(server.socket_path)
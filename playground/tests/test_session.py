@@ -0,0 +1,46 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import playground.main.session as session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """
+    Respond with keep-alive, recording the client port of each request
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.ports.append(self.client_address[1])
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_session_reuse():
+    """
+    The shared session reuses one connection across requests
+    """
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    httpd.ports = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    assert session.get_session() is session.get_session()
+    for _ in range(5):
+        assert session.get(f"http://127.0.0.1:{httpd.server_port}").text == "ok"
+    httpd.shutdown()
+    assert len(httpd.ports) == 5
+    assert len(set(httpd.ports)) == 1
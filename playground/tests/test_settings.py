@@ -9,6 +9,8 @@ import os
 
 import pytest
 
+import playground.defaults as defaults
+from playground.main.cache import SettingsCache
 from playground.main.settings import Settings
 
 here = os.path.dirname(os.path.abspath(__file__))
@@ -42,3 +44,80 @@ def test_set_get(tmp_path):
     assert settings.google["zone"] == zone
     assert settings.get("google:zone") == zone
     assert settings.get("google")["zone"] == zone
+
+
+def test_save(tmp_path):
+    """
+    Saving settings keeps comments, and reloads the same values
+    """
+    settings_file = get_settings(tmp_path)
+    settings = Settings(settings_file)
+    settings.set("config_editor", "code")
+    settings.set("google:zone", "us-west1-a")
+    settings.remove("backends", "aws")
+    settings.save()
+
+    with open(settings_file, "r") as fd:
+        content = fd.read()
+    assert "# config editor" in content
+    assert "backends: [docker, google, podman]" in content
+    settings = Settings(settings_file)
+    assert settings.config_editor == "code"
+    assert settings.get("google:zone") == "us-west1-a"
+    assert settings.backends == ["docker", "google", "podman"]
+
+
+def test_settings_cache(tmp_path):
+    """
+    Unchanged settings files are loaded from the cache without validation
+    """
+    settings_file = get_settings(tmp_path)
+    cache = SettingsCache(str(tmp_path))
+    settings = Settings(settings_file, cache=cache)
+    assert not settings.validated
+
+    settings = Settings(settings_file, cache=cache)
+    assert settings.validated
+    assert settings.get("google:zone") == "us-central1-a"
+
+    settings.set("config_editor", "code")
+    settings.save()
+    settings = Settings(settings_file, cache=cache)
+    assert not settings.validated
+    assert settings.config_editor == "code"
+
+
+def test_resolved(tmp_path):
+    """
+    Resolved values are remembered, forgotten on change, and can be frozen
+    """
+    settings = Settings(get_settings(tmp_path))
+    assert settings.get("google:zone") == "us-central1-a"
+    assert "google:zone" in settings._resolved
+    settings.set("google:zone", "us-west1-a")
+    assert settings.get("google:zone") == "us-west1-a"
+
+    settings.remove("backends", "aws")
+    assert "aws" not in settings.backends
+    settings.add("backends", "aws")
+    assert settings.backends[0] == "aws"
+
+    resolved = settings.resolve_all()
+    assert resolved["google"]["zone"] == "us-west1-a"
+    with pytest.raises(TypeError):
+        resolved["google"]["zone"] = "us-east1-a"
+    settings.set("google:zone", "us-east1-a")
+    assert resolved["google"]["zone"] == "us-west1-a"
+
+
+def test_resolved_envars(tmp_path, monkeypatch):
+    """
+    Environment variables are expanded when read, not when remembered
+    """
+    monkeypatch.setattr(defaults, "allowed_envars", ["config_editor"])
+    monkeypatch.setenv("PLAYGROUND_EDITOR", "vim")
+    settings = Settings(get_settings(tmp_path))
+    settings.set("config_editor", "$PLAYGROUND_EDITOR")
+    assert settings.get("config_editor") == "vim"
+    monkeypatch.setenv("PLAYGROUND_EDITOR", "emacs")
+    assert settings.get("config_editor") == "emacs"
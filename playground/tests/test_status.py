@@ -0,0 +1,145 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import json
+import time
+from datetime import datetime, timezone
+
+import playground.main.backends as backends
+import playground.utils as utils
+from playground.client.status import format_age
+from playground.main.backends.aws.client import AmazonCloud
+from playground.main.backends.base import Backend
+from playground.main.backends.google.client import GoogleCloud
+
+from .helpers import init_client, make_docker_client
+
+container = {
+    "ID": "8c3a0b0f5d2e",
+    "Names": "vanessaflux-tutorial-2022-for-radiuss",
+    "State": "running",
+    "Status": "Up 2 hours",
+    "CreatedAt": "2023-04-01 10:20:30 -0600 MDT",
+    "Labels": "playground.tutorial=vanessaflux-tutorial-2022-for-radiuss,"
+    "playground.url=https://127.0.0.1:8000",
+}
+
+
+def test_docker_instances(monkeypatch):
+    """
+    Labeled containers from docker ps are normalized
+    """
+    client = make_docker_client()
+    monkeypatch.setattr(
+        utils,
+        "run_command",
+        lambda cmd: {"message": json.dumps(container) + "\n", "return_code": 0},
+    )
+    instances = client.instances()
+    assert instances == [
+        {
+            "name": "vanessaflux-tutorial-2022-for-radiuss",
+            "backend": "docker",
+            "state": "running",
+            "url": "https://127.0.0.1:8000",
+            "created": 1680366030.0,
+        }
+    ]
+
+
+def test_cloud_instances():
+    """
+    AWS and Google list running tutorials by the same name (the uid)
+    """
+
+    def instance(state, tags):
+        return {
+            "State": {"Name": state},
+            "PublicIpAddress": "203.0.113.10",
+            "LaunchTime": datetime(2023, 4, 1, tzinfo=timezone.utc),
+            "Tags": [{"Key": key, "Value": value} for key, value in tags.items()],
+        }
+
+    tags = {"playground-tutorial": "vanessaflux-tutorial", "playground-port": "443"}
+    aws = AmazonCloud.__new__(AmazonCloud)
+    aws.list_instances = lambda: {
+        "Reservations": [
+            {
+                "Instances": [
+                    instance("running", tags),
+                    instance("terminated", tags),
+                    instance("shutting-down", tags),
+                    instance("running", {"Name": "not-a-tutorial"}),
+                ]
+            }
+        ]
+    }
+    instances = aws.instances()
+    assert len(instances) == 1
+    assert instances[0]["name"] == "vanessaflux-tutorial"
+    assert instances[0]["url"] == "https://203.0.113.10:443"
+
+    google = GoogleCloud.__new__(GoogleCloud)
+    google.list_instances = lambda: {
+        "items": [
+            {
+                "name": "flux-tutorial",
+                "status": "RUNNING",
+                "creationTimestamp": "2023-04-01T10:20:30.000-07:00",
+                "labels": {
+                    "playground-tutorial": "flux-tutorial",
+                    "playground-user": "vanessa",
+                    "playground-https": "false",
+                },
+                "networkInterfaces": [{"accessConfigs": [{"natIP": "203.0.113.20"}]}],
+            },
+            {"name": "not-a-tutorial", "status": "RUNNING", "labels": {}},
+        ]
+    }
+    instances = google.instances()
+    assert len(instances) == 1
+    assert instances[0]["name"] == "vanessaflux-tutorial"
+    assert instances[0]["url"] == "http://203.0.113.20"
+
+
+def test_status(tmp_path, monkeypatch):
+    """
+    Backends are listed together, and one failing is reported, not raised
+    """
+
+    class Cloud(Backend):
+        name = "cloud"
+
+        def instances(self):
+            time.sleep(0.1)
+            return [
+                {"name": x, "backend": "cloud", "state": "RUNNING", "url": None}
+                for x in ["b", "a"]
+            ]
+
+    class Broken(Backend):
+        name = "broken"
+
+        def instances(self):
+            raise ValueError("No credentials")
+
+    found = {"cloud": Cloud, "alias": Cloud, "broken": Broken}
+    monkeypatch.setattr(backends, "get_backend", lambda name: found.get(name))
+    client = init_client(str(tmp_path))
+    instances, errors = client.status(["cloud", "alias", "broken", "missing"])
+    assert [x["name"] for x in instances] == ["a", "b"]
+    assert errors["broken"] == "No credentials"
+    assert "missing" in errors
+    assert set(errors) == {"broken", "missing"}
+
+
+def test_format_age():
+    now = time.time()
+    assert format_age(None) == ""
+    assert format_age(now - 30).endswith("s")
+    assert format_age(now - 2 * 3600 - 120) == "2h 2m"
+    assert format_age(now - 3 * 86400) == "3d 0h"
@@ -0,0 +1,37 @@
+#!/usr/bin/python
+
+# Copyright 2023 Lawrence Livermore National Security, LLC and other
+# HPCIC DevTools Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (MIT)
+
+import os
+
+import playground.utils as utils
+from playground.main.tutorial import Tutorials
+
+here = os.path.dirname(os.path.abspath(__file__))
+testdata = os.path.join(here, "testdata")
+
+
+def test_lazy_tutorials():
+    """
+    Tutorials are only created and validated when asked for
+    """
+    tutorial = {"tutorial": utils.read_yaml(os.path.join(testdata, "tutorial.yaml"))}
+    invalid = {"tutorial": {"title": "Bad ports", "container": {"ports": ["8000"]}}}
+    tutorials = Tutorials()
+    tutorials.add_tutorial("local", tutorial)
+    tutorials.add_tutorial("invalid", invalid)
+    assert tutorials.names() == ["local", "invalid"]
+    assert not tutorials._tutorials
+
+    local = tutorials.get("local")
+    assert local.name == "local"
+    assert tutorials.get("local") is local
+    assert list(tutorials._tutorials) == ["local"]
+
+    errors = tutorials.validate_all()
+    assert list(errors) == ["invalid"]
+    assert "invalid" not in tutorials
+    assert list(tutorials.tutorials) == ["local"]
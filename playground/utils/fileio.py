@@ -11,6 +11,7 @@ import re
 import shutil
 import stat
 import tempfile
+import threading
 from contextlib import contextmanager
 
 from playground.logger import logger
@@ -20,6 +21,73 @@ try:
 except ImportError:
     from ruamel.yaml import YAML
 
+# PyYAML with libyaml is optional, and the fastest read-only loader
+try:
+    import yaml as pyyaml
+    from yaml import CSafeLoader
+except ImportError:
+    pyyaml = None
+
+if pyyaml is not None:
+
+    class FastLoader(CSafeLoader):
+        """
+        The libyaml safe loader, resolving scalars like YAML 1.2 (ruamel).
+
+        YAML 1.1 would otherwise read yes/no as booleans and 80:22 as a
+        base 60 integer.
+        """
+
+    def construct_int(loader, node):
+        value = loader.construct_scalar(node).replace("_", "")
+        if value.startswith("0o"):
+            return int(value[2:], 8)
+        if value.startswith("0x"):
+            return int(value[2:], 16)
+        return int(value)
+
+    FastLoader.yaml_implicit_resolvers = {
+        first: [
+            (tag, regexp)
+            for tag, regexp in resolvers
+            if tag.rsplit(":", 1)[-1] not in ["bool", "int", "float"]
+        ]
+        for first, resolvers in CSafeLoader.yaml_implicit_resolvers.items()
+    }
+    FastLoader.add_implicit_resolver(
+        "tag:yaml.org,2002:bool",
+        re.compile("^(?:true|True|TRUE|false|False|FALSE)$"),
+        list("tTfF"),
+    )
+    FastLoader.add_implicit_resolver(
+        "tag:yaml.org,2002:int",
+        re.compile("^(?:[-+]?[0-9][0-9_]*|0o[0-7]+|0x[0-9a-fA-F]+)$"),
+        list("-+0123456789"),
+    )
+    FastLoader.add_implicit_resolver(
+        "tag:yaml.org,2002:float",
+        re.compile(
+            "^(?:[-+]?(?:[.][0-9]+|[0-9]+(?:[.][0-9]*)?)(?:[eE][-+]?[0-9]+)?"
+            "|[-+]?[.](?:inf|Inf|INF)|[.](?:nan|NaN|NAN))$"
+        ),
+        list("-+0123456789."),
+    )
+    FastLoader.add_constructor("tag:yaml.org,2002:int", construct_int)
+
+# Parsers are reused, but are not thread safe
+parsers = threading.local()
+
+
+def get_yaml(typ="rt"):
+    """
+    Get a (cached, per thread) ruamel YAML parser of a given type.
+    """
+    yaml = getattr(parsers, typ, None)
+    if yaml is None:
+        yaml = YAML(typ=typ)
+        setattr(parsers, typ, yaml)
+    return yaml
+
 
 @contextmanager
 def workdir(dirname):
@@ -221,21 +289,27 @@ def write_yaml(obj, filename):
     """
     Save yaml to file, also preserving comments.
     """
-    yaml = YAML()
+    yaml = get_yaml("rt")
     yaml.preserve_quotes = True
 
     with open(filename, "w") as fd:
         yaml.dump(obj, fd)
 
 
-def read_yaml(filename):
+def read_yaml(filename, roundtrip=False):
     """
-    Load a yaml from file, roundtrip to preserve comments
+    Load a yaml from file.
+
+    By default we use the fastest read-only loader available (libyaml, or
+    the ruamel safe loader). Use roundtrip to preserve comments for saving.
     """
-    yaml = YAML()
     with open(filename, "r") as fd:
-        content = yaml.load(fd.read())
-    return content
+        content = fd.read()
+    if roundtrip:
+        return get_yaml("rt").load(content)
+    if pyyaml is not None:
+        return pyyaml.load(content, Loader=FastLoader)
+    return get_yaml("safe").load(content)
 
 
 def read_file(filename, mode="r"):